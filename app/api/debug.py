@@ -0,0 +1,74 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics.db.locks import ROW_LOCKS
+from app.core.metrics.db.queries import QUERY_STATS
+from app.core.profiling import ProfilerBusy, profile
+from app.core.settings import settings
+from app.core.tracing import SLOW_REQUESTS
+
+
+def require_debug_token(
+    debug_token: str | None = Header(default=None, alias="X-Debug-Token"),
+) -> None:
+    """Debug endpoints do not exist unless DEBUG_TOKEN is set and sent."""
+    if not settings.DEBUG_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if debug_token is None or not hmac.compare_digest(
+        debug_token.encode(), settings.DEBUG_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["debug"],
+    dependencies=[Depends(require_debug_token)],
+)
+
+
+@router.get("/slow-requests")
+def get_slow_requests():
+    return {
+        "threshold_ms": settings.SLOW_REQUEST_THRESHOLD_MS,
+        "requests": SLOW_REQUESTS.snapshot(),
+    }
+
+
+@router.get("/queries")
+def get_query_stats(limit: int = Query(default=50, ge=1, le=1000)):
+    return {
+        "queries": [stat.as_dict() for stat in QUERY_STATS.top(limit)],
+    }
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+def get_profile(
+    seconds: float = Query(default=10.0, gt=0.0),
+    idle: bool = Query(default=False),
+):
+    """
+    Samples every thread of this worker process, the event loop and the
+    threadpool included, and returns collapsed stacks for flame graph tools.
+    """
+    try:
+        sampler = profile(seconds, include_idle=idle)
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return PlainTextResponse(
+        sampler.collapsed(),
+        headers={"X-Profile-Samples": str(sampler.samples)},
+    )
+
+
+@router.get("/row-locks")
+def get_row_lock_contention(limit: int = Query(default=20, ge=1, le=1000)):
+    return {
+        "contended_ms": settings.DB_ROW_LOCK_CONTENDED_MS,
+        "tables": {
+            table: [hitter.as_dict() for hitter in hitters]
+            for table, hitters in ROW_LOCKS.top(limit).items()
+        },
+    }
@@ -1,11 +1,35 @@
 from fastapi import APIRouter
 
+from app.core.settings import settings
+
+from .debug import router as debug_router
+from .transfers import async_router as async_transfers_router
 from .transfers import router as transfers_router
+from .users import async_router as async_users_router
 from .users import router as users_router
+from .wallets import async_router as async_wallet_router
 from .wallets import router as wallet_router
+from .webhooks import router as webhooks_router
+
+
+def build_router(async_db: bool) -> APIRouter:
+    """
+    Transfer, wallet and user routes run on the async engine when `async_db` is set,
+    so requests wait on PostgreSQL and Redis without holding a threadpool thread.
+    """
+    router = APIRouter()
+
+    if async_db:
+        router.include_router(async_transfers_router)
+        router.include_router(async_wallet_router)
+        router.include_router(async_users_router)
+    else:
+        router.include_router(transfers_router)
+        router.include_router(wallet_router)
+        router.include_router(users_router)
+    router.include_router(webhooks_router)
+    router.include_router(debug_router)
+    return router
 
-router = APIRouter()
 
-router.include_router(transfers_router)
-router.include_router(wallet_router)
-router.include_router(users_router)
+router = build_router(settings.ASYNC_DB_ENABLED)
@@ -1,13 +1,32 @@
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, Header
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.metrics.collectors import TRANSFER_AMOUNT_TOTAL, TRANSFERS_CREATED_TOTAL
+from app.db.async_session import get_async_db
+from app.db.models import Transaction
 from app.db.session import get_db
 from app.usecases.transfers import create_transfer_idempotent as create_transfer
+from app.usecases.transfers import (
+    create_transfer_idempotent_async as create_transfer_async,
+)
 
 router = APIRouter(prefix="/transfers", tags=["transfers"])
+async_router = APIRouter(prefix="/transfers", tags=["transfers"])
+
+
+def _transfer_response(transfer: Transaction) -> dict:
+    TRANSFERS_CREATED_TOTAL.inc()
+    TRANSFER_AMOUNT_TOTAL.inc(float(transfer.amount))
+    return {
+        "id": transfer.id,
+        "from_wallet_id": transfer.from_wallet_id,
+        "to_wallet_id": transfer.to_wallet_id,
+        "amount": transfer.amount,
+        "created_at": transfer.created_at,
+    }
 
 
 @router.post("")
@@ -21,12 +40,18 @@ def transfer(
     transfer = create_transfer(
         db, from_wallet_id, to_wallet_id, amount, idempotency_key
     )
-    TRANSFERS_CREATED_TOTAL.inc()
-    TRANSFER_AMOUNT_TOTAL.inc(float(transfer.amount))
-    return {
-        "id": transfer.id,
-        "from_wallet_id": transfer.from_wallet_id,
-        "to_wallet_id": transfer.to_wallet_id,
-        "amount": transfer.amount,
-        "created_at": transfer.created_at,
-    }
+    return _transfer_response(transfer)
+
+
+@async_router.post("")
+async def transfer_async(
+    from_wallet_id: int,
+    to_wallet_id: int,
+    amount: Decimal,
+    idempotency_key: str = Header(..., alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    transfer = await create_transfer_async(
+        db, from_wallet_id, to_wallet_id, amount, idempotency_key
+    )
+    return _transfer_response(transfer)
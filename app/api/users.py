@@ -1,20 +1,26 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.db.async_session import get_async_db
+from app.db.models import User
 from app.db.session import get_db
-from app.services.users import (
-    create_user_with_wallet as create_user,
+from app.usecases.users import (
+    create_user,
+    create_user_async,
 )
-from app.services.users import (
-    get_user_by_id_with_wallet as get_user_by_id,
+from app.usecases.users import (
+    get_user as get_user_by_id,
+)
+from app.usecases.users import (
+    get_user_async as get_user_by_id_async,
 )
 
 router = APIRouter(prefix="/users", tags=["users"])
+async_router = APIRouter(prefix="/users", tags=["users"])
 
 
-@router.post("")
-def post_user(db: Session = Depends(get_db)):
-    created_user = create_user(db)
+def _created_user_response(created_user: User) -> dict:
     return {
         "id": created_user.id,
         "created_at": created_user.created_at,
@@ -24,9 +30,7 @@ def post_user(db: Session = Depends(get_db)):
     }
 
 
-@router.get("/{user_id}")
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    user_inform = get_user_by_id(db, user_id)
+def _user_response(user_inform: User) -> dict:
     return {
         "id": user_inform.id,
         "created_at": user_inform.created_at,
@@ -35,3 +39,23 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
             "balance": user_inform.wallet.balance,
         },
     }
+
+
+@router.post("")
+def post_user(db: Session = Depends(get_db)):
+    return _created_user_response(create_user(db))
+
+
+@router.get("/{user_id}")
+def get_user(user_id: int, db: Session = Depends(get_db)):
+    return _user_response(get_user_by_id(db, user_id))
+
+
+@async_router.post("")
+async def post_user_async(db: AsyncSession = Depends(get_async_db)):
+    return _created_user_response(await create_user_async(db))
+
+
+@async_router.get("/{user_id}")
+async def get_user_async(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    return _user_response(await get_user_by_id_async(db, user_id))
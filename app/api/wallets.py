@@ -1,18 +1,30 @@
+from typing import Any
+
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.db.async_session import get_async_db
 from app.db.session import get_db
-from app.usecases.wallets import get_wallet_cached
+from app.usecases.wallets import get_wallet_cached, get_wallet_cached_async
 
 router = APIRouter(prefix="/wallets", tags=["wallets"])
+async_router = APIRouter(prefix="/wallets", tags=["wallets"])
 
 
-@router.get("/{wallet_id}")
-def get_wallet_(wallet_id: int, db: Session = Depends(get_db)):
-    wallet = get_wallet_cached(db, wallet_id)
-
+def _wallet_response(wallet: dict[str, Any]) -> dict[str, Any]:
     return {
         "id": wallet["id"],
         "balance": wallet["balance"],
         "user_id": wallet["user_id"],
     }
+
+
+@router.get("/{wallet_id}")
+def get_wallet_(wallet_id: int, db: Session = Depends(get_db)):
+    return _wallet_response(get_wallet_cached(db, wallet_id))
+
+
+@async_router.get("/{wallet_id}")
+async def get_wallet_async(wallet_id: int, db: AsyncSession = Depends(get_async_db)):
+    return _wallet_response(await get_wallet_cached_async(db, wallet_id))
@@ -0,0 +1,56 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel, HttpUrl
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.db.session import get_db
+from app.services.webhooks import (
+    delete_webhook_endpoint,
+    get_webhook_endpoint,
+    set_webhook_endpoint,
+)
+
+
+def require_webhook_token(
+    webhook_token: str | None = Header(default=None, alias="X-Webhook-Token"),
+) -> None:
+    """
+    The API has no user accounts to check ownership against, so webhook
+    endpoints do not exist unless WEBHOOK_ADMIN_TOKEN is set and sent.
+    """
+    if not settings.WEBHOOK_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if webhook_token is None or not hmac.compare_digest(
+        webhook_token.encode(), settings.WEBHOOK_ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Invalid webhook token")
+
+
+class WebhookEndpointIn(BaseModel):
+    url: HttpUrl
+
+
+router = APIRouter(
+    prefix="/users/{user_id}/webhook",
+    tags=["webhooks"],
+    dependencies=[Depends(require_webhook_token)],
+)
+
+
+@router.put("")
+def put_webhook(user_id: int, body: WebhookEndpointIn, db: Session = Depends(get_db)):
+    endpoint = set_webhook_endpoint(db, user_id, str(body.url))
+    return {"user_id": endpoint.user_id, "url": endpoint.url}
+
+
+@router.get("")
+def get_webhook(user_id: int, db: Session = Depends(get_db)):
+    endpoint = get_webhook_endpoint(db, user_id)
+    return {"user_id": endpoint.user_id, "url": endpoint.url}
+
+
+@router.delete("", status_code=204)
+def delete_webhook(user_id: int, db: Session = Depends(get_db)):
+    delete_webhook_endpoint(db, user_id)
@@ -4,13 +4,58 @@ from functools import lru_cache
 from typing import Any, Optional, cast
 
 from redis import Redis, RedisError
+from redis.asyncio import Redis as AsyncRedis
 
 from app.core.metrics.cache import record_wallet_cache_lookup
+from app.core.request_context import timed
 from app.core.settings import settings
+from app.core.tracing import span
 
 logger = logging.getLogger(__name__)
 
 
+class TimedRedis(Redis):
+    """Redis client that times every command as part of the current request."""
+
+    def execute_command(self, *args, **options):
+        with timed("redis"), span("redis", command=args[0]):
+            return super().execute_command(*args, **options)
+
+
+class TimedAsyncRedis(AsyncRedis):
+    """asyncio counterpart of TimedRedis."""
+
+    async def execute_command(self, *args, **options):
+        with timed("redis"), span("redis", command=args[0]):
+            return await super().execute_command(*args, **options)
+
+
+def _decode(key: str, data: Any, json_decode: bool) -> Optional[Any]:
+    if not data:
+        logger.debug(
+            "cache_miss",
+            extra={"extra_fields": {"key": key}},
+        )
+        return None
+
+    data = cast(str | bytes | bytearray, data)
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+
+    if not isinstance(data, str):
+        return None
+
+    try:
+        return json.loads(data) if json_decode else data
+    except (json.JSONDecodeError, TypeError):
+        logger.warning(
+            "cache_decode_failed",
+            extra={"extra_fields": {"key": key}},
+            exc_info=True,
+        )
+        return None
+
+
 class Cache:
     """
     Cache abstraction.
@@ -30,22 +75,6 @@ class Cache:
 
         try:
             data = self._client.get(key)
-            if not data:
-                logger.debug(
-                    "cache_miss",
-                    extra={"extra_fields": {"key": key}},
-                )
-                return None
-
-            data = cast(str | bytes | bytearray, data)
-            if isinstance(data, bytes):
-                data = data.decode("utf-8")
-
-            if not isinstance(data, str):
-                return None
-
-            return json.loads(data) if json_decode else data
-
         except RedisError:
             logger.warning(
                 "redis_get_failed",
@@ -54,19 +83,28 @@ class Cache:
             )
             return None
 
-        except (json.JSONDecodeError, TypeError):
-            logger.warning(
-                "cache_decode_failed",
-                extra={"extra_fields": {"key": key}},
-                exc_info=True,
-            )
-            return None
+        return _decode(key, data, json_decode)
 
     def get_wallet(self, key: str) -> Optional[Any]:
         data = self.get(key)
         record_wallet_cache_lookup(cache_hit=data is not None)
         return data
 
+    def exists(self, key: str) -> Optional[bool]:
+        """Returns None when Redis is disabled or fails, so the caller can tell."""
+        if not self._client:
+            return None
+
+        try:
+            return bool(self._client.exists(key))
+        except RedisError:
+            logger.warning(
+                "redis_exists_failed",
+                extra={"extra_fields": {"key": key}},
+                exc_info=True,
+            )
+            return None
+
     def set(
         self,
         key: str,
@@ -116,8 +154,103 @@ def get_cache() -> Cache:
         return Cache(None)
 
     try:
-        client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        client = TimedRedis.from_url(settings.REDIS_URL, decode_responses=True)
         return Cache(client)
     except (RedisError, ValueError):
         logger.warning("redis_init_failed", exc_info=True)
         return Cache(None)
+
+
+class AsyncCache:
+    """
+    asyncio counterpart of Cache for async routes.
+    If Redis is disabled or fails, it behaves like a Null Object.
+    """
+
+    def __init__(self, client: Optional[AsyncRedis]):
+        self._client = client
+
+    async def get(self, key: str, json_decode: bool = True) -> Optional[Any]:
+        if not self._client:
+            return None
+
+        try:
+            data = await self._client.get(key)
+        except RedisError:
+            logger.warning(
+                "redis_get_failed",
+                extra={"extra_fields": {"key": key}},
+                exc_info=True,
+            )
+            return None
+
+        return _decode(key, data, json_decode)
+
+    async def get_wallet(self, key: str) -> Optional[Any]:
+        data = await self.get(key)
+        record_wallet_cache_lookup(cache_hit=data is not None)
+        return data
+
+    async def exists(self, key: str) -> Optional[bool]:
+        """Returns None when Redis is disabled or fails, so the caller can tell."""
+        if not self._client:
+            return None
+
+        try:
+            return bool(await self._client.exists(key))
+        except RedisError:
+            logger.warning(
+                "redis_exists_failed",
+                extra={"extra_fields": {"key": key}},
+                exc_info=True,
+            )
+            return None
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ex: int = 3600,
+        nx: bool = False,
+        json_encode: bool = True,
+    ) -> bool:
+        """Returns True if the key was set, False otherwise."""
+        if not self._client:
+            return False
+
+        try:
+            val = json.dumps(value) if json_encode else value
+            return bool(await self._client.set(key, val, ex=ex, nx=nx))
+        except RedisError:
+            logger.warning(
+                "redis_set_failed",
+                extra={"extra_fields": {"key": key}},
+                exc_info=True,
+            )
+            return False
+
+    async def delete(self, key: str) -> None:
+        if not self._client:
+            return
+
+        try:
+            await self._client.delete(key)
+        except RedisError:
+            logger.warning(
+                "redis_delete_failed",
+                extra={"extra_fields": {"key": key}},
+                exc_info=True,
+            )
+
+
+@lru_cache(maxsize=1)
+def get_async_cache() -> AsyncCache:
+    if not settings.CACHE_ENABLED:
+        return AsyncCache(None)
+
+    try:
+        client = TimedAsyncRedis.from_url(settings.REDIS_URL, decode_responses=True)
+        return AsyncCache(client)
+    except (RedisError, ValueError):
+        logger.warning("redis_init_failed", exc_info=True)
+        return AsyncCache(None)
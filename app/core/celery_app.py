@@ -1,10 +1,23 @@
 import inspect
+import time
 from contextvars import Token
 
 import sentry_sdk
 from celery import Celery, signals  # type: ignore[import-untyped]
+from celery.worker.control import inspect_command  # type: ignore[import-untyped]
+from kombu import Queue  # type: ignore[import-untyped]
+from prometheus_client import start_http_server
 
 from app.core.logging import setup_logging
+from app.core.metrics.tasks import (
+    ENQUEUED_AT_HEADER,
+    IN_FLIGHT_TASKS,
+    parse_enqueued_at,
+    record_task_finished,
+    record_task_queue_wait,
+    runnable_at,
+)
+from app.core.profiling import BackgroundProfile, ProfilerBusy
 from app.core.request_context import request_id_ctx
 from app.core.sentry import init_sentry, set_transfer_context
 from app.core.settings import settings
@@ -19,12 +32,60 @@ celery_app = Celery(
     include=["app.tasks.notifications"],
 )
 
+# Real-time notifications get their own priority queue so bulk work such as
+# dead-letter replays never sits in front of them. Each queue is consumed by a
+# separate worker deployment (see docker-compose.yml and k8s/).
+NOTIFICATIONS_QUEUE = "notifications"
+BULK_QUEUE = "notifications.bulk"
+MAINTENANCE_QUEUE = "maintenance"
+# Queue every task went to before the queues were split. The real-time worker
+# keeps consuming it until messages published by older releases are drained.
+LEGACY_QUEUE = "celery"
+MAX_PRIORITY = 9
+REALTIME_PRIORITY = 9
+DIGEST_PRIORITY = 6
+BULK_PRIORITY = 0
+
 celery_app.conf.update(
     task_acks_late=True,
     worker_hijack_root_logger=False,
     worker_prefetch_multiplier=1,
+    task_queues=(
+        Queue(
+            NOTIFICATIONS_QUEUE,
+            routing_key=NOTIFICATIONS_QUEUE,
+            queue_arguments={"x-max-priority": MAX_PRIORITY},
+        ),
+        Queue(BULK_QUEUE, routing_key=BULK_QUEUE),
+        Queue(MAINTENANCE_QUEUE, routing_key=MAINTENANCE_QUEUE),
+        # Declared without arguments, as it already exists that way.
+        Queue(LEGACY_QUEUE, routing_key=LEGACY_QUEUE),
+    ),
+    task_default_queue=NOTIFICATIONS_QUEUE,
+    task_routes={
+        "app.tasks.notifications.send_transaction_notification": {
+            "queue": NOTIFICATIONS_QUEUE,
+            "priority": REALTIME_PRIORITY,
+        },
+        "app.tasks.notifications.send_transaction_digest_notification": {
+            "queue": NOTIFICATIONS_QUEUE,
+            "priority": DIGEST_PRIORITY,
+        },
+        "app.tasks.notifications.flush_coalesced_notifications": {
+            "queue": MAINTENANCE_QUEUE,
+        },
+    },
 )
+if settings.NOTIFY_COALESCE_WINDOW_SEC > 0:
+    celery_app.conf.beat_schedule = {
+        "flush-coalesced-notifications": {
+            "task": "app.tasks.notifications.flush_coalesced_notifications",
+            "schedule": settings.NOTIFY_COALESCE_FLUSH_INTERVAL_SEC,
+            "options": {"expires": settings.NOTIFY_COALESCE_FLUSH_INTERVAL_SEC},
+        },
+    }
 _request_id_ctx_tokens: dict[str, Token[str | None]] = {}
+_task_started_at: dict[str, float] = {}
 
 
 def _task_metadata(task, args, kwargs) -> dict:
@@ -85,3 +146,87 @@ def task_postrun_handler(task_id=None, **_extra):
     token = _request_id_ctx_tokens.pop(task_id, None)
     if token is not None:
         request_id_ctx.reset(token)
+
+
+@signals.before_task_publish.connect
+def stamp_enqueued_at(headers=None, **_extra):
+    # Overwritten on every publish, so a retry measures its own wait.
+    if headers is not None:
+        headers[ENQUEUED_AT_HEADER] = time.time()
+
+
+@signals.task_received.connect
+def track_received_task(request=None, **_extra):
+    if request is None:
+        return
+    enqueued_at = parse_enqueued_at(request.request_dict.get(ENQUEUED_AT_HEADER))
+    if enqueued_at is not None:
+        IN_FLIGHT_TASKS.add(request.id, runnable_at(enqueued_at, request.eta))
+
+
+@signals.task_prerun.connect
+def record_task_started(sender=None, task_id=None, task=None, **_extra):
+    task = task or sender
+    if task is None or task_id is None:
+        return
+
+    _task_started_at[task_id] = time.perf_counter()
+    request = task.request
+    enqueued_at = parse_enqueued_at(getattr(request, ENQUEUED_AT_HEADER, None))
+    if enqueued_at is None:
+        enqueued_at = parse_enqueued_at((request.headers or {}).get(ENQUEUED_AT_HEADER))
+    if enqueued_at is not None:
+        record_task_queue_wait(task.name, enqueued_at, request.eta)
+
+
+@signals.task_postrun.connect
+def record_task_completed(sender=None, task_id=None, task=None, state=None, **_extra):
+    task = task or sender
+    IN_FLIGHT_TASKS.discard(task_id)
+    started_at = _task_started_at.pop(task_id, None)
+    if task is None or started_at is None:
+        return
+
+    record_task_finished(
+        task.name,
+        state or "UNKNOWN",
+        time.perf_counter() - started_at,
+        task.request.retries,
+    )
+
+
+@signals.task_revoked.connect
+def forget_revoked_task(request=None, **_extra):
+    if request is not None:
+        IN_FLIGHT_TASKS.discard(request.id)
+
+
+@signals.worker_init.connect
+def start_worker_metrics_server(**_extra):
+    from app.core.metrics.db.instrumentation import instrument_engine
+    from app.db.session import engine
+
+    instrument_engine(engine, "sync")
+    if settings.WORKER_METRICS_PORT:
+        start_http_server(settings.WORKER_METRICS_PORT)
+
+
+# Control commands run on the consumer thread, which fetches no tasks until the
+# command replies, so the stacks are sampled on a separate thread and collected
+# with a second command.
+worker_profile = BackgroundProfile()
+
+
+@inspect_command(name="profile", args=[("seconds", float)], signature="[seconds=10]")
+def profile_worker(state, seconds: float = 10.0) -> dict:
+    """Starts sampling the stacks of every worker thread in the background."""
+    try:
+        return {"started": True, "seconds": worker_profile.start(seconds)}
+    except ProfilerBusy as exc:
+        return {"error": str(exc)}
+
+
+@inspect_command(name="profile_result")
+def profile_worker_result(state) -> dict:
+    """Returns the collapsed stacks of the last profile, or that it is running."""
+    return worker_profile.result()
@@ -1,9 +1,22 @@
+import atexit
+import copy
 import json
 import logging
+import os
+import random
 import sys
-from datetime import datetime, timezone
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Collection
+from logging.handlers import QueueHandler, QueueListener
+from queue import Full, Queue
 from typing import Any
 
+from app.core.metrics.collectors import (
+    LOG_RECORDS_DROPPED_TOTAL,
+    LOG_RECORDS_SUPPRESSED_TOTAL,
+)
 from app.core.request_context import request_id_ctx
 from app.core.settings import settings
 
@@ -25,10 +38,152 @@ class RequestIDFilter(logging.Filter):
         return True
 
 
+class LogVolumeFilter(logging.Filter):
+    """
+    Limits the volume of high-frequency log events.
+    INFO and DEBUG records whose message has a sample rate are kept with that
+    probability, except records describing an error status or a slow request.
+    Repeated WARNING records whose message is one of the rate-limited events
+    pass through a token bucket per logger and message; the next record let
+    through reports how many were suppressed. Other warnings, such as slow
+    queries or dead-lettered notifications, and ERROR and CRITICAL records are
+    always kept.
+    """
+
+    def __init__(
+        self,
+        sample_rates: dict[str, float],
+        slow_ms: float,
+        rate_limited_events: Collection[str],
+        rate_per_sec: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+        sample: Callable[[], float] = random.random,
+        max_buckets: int = 1000,
+    ):
+        super().__init__()
+        self.sample_rates = sample_rates
+        self.slow_ms = slow_ms
+        self.rate_limited_events = rate_limited_events
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self._clock = clock
+        self._sample = sample
+        self.max_buckets = max_buckets
+        self._lock = threading.Lock()
+        # (logger, message) -> [tokens, updated_at, suppressed], least recently
+        # used first, so messages that stopped repeating are evicted.
+        self._buckets: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+        if record.levelno >= logging.WARNING:
+            return self._within_rate_limit(record)
+
+        rate = self.sample_rates.get(str(record.msg))
+        if rate is None or rate >= 1.0 or self._always_kept(record):
+            return True
+        if self._sample() < rate:
+            return True
+
+        LOG_RECORDS_SUPPRESSED_TOTAL.labels(reason="sampled").inc()
+        return False
+
+    def _always_kept(self, record: logging.LogRecord) -> bool:
+        extra_fields = getattr(record, "extra_fields", None)
+        if not isinstance(extra_fields, dict):
+            return False
+
+        status = extra_fields.get("status")
+        duration_ms = extra_fields.get("duration_ms")
+        return (isinstance(status, int) and status >= 400) or (
+            isinstance(duration_ms, (int, float)) and duration_ms >= self.slow_ms
+        )
+
+    def _within_rate_limit(self, record: logging.LogRecord) -> bool:
+        if self.rate_per_sec <= 0 or str(record.msg) not in self.rate_limited_events:
+            return True
+
+        key = (record.name, str(record.msg))
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+                if len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            tokens, updated_at, suppressed = bucket
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate_per_sec)
+            if tokens < 1:
+                bucket[:] = [tokens, now, suppressed + 1]
+                allowed = False
+            else:
+                bucket[:] = [tokens - 1, now, 0]
+                allowed = True
+
+        if not allowed:
+            LOG_RECORDS_SUPPRESSED_TOTAL.labels(reason="rate_limited").inc()
+            return False
+
+        if suppressed:
+            extra_fields = getattr(record, "extra_fields", None)
+            record.extra_fields = {
+                **(extra_fields if isinstance(extra_fields, dict) else {}),
+                "suppressed": int(suppressed),
+            }
+        return True
+
+
+def _dumps_stdlib(data: dict[str, Any]) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None  # type: ignore[assignment]
+
+if orjson is not None:
+    # Datetimes and dataclasses go through default=str like with json.dumps.
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def _dumps(data: dict[str, Any]) -> str:
+        try:
+            return orjson.dumps(data, default=str, option=_ORJSON_OPTIONS).decode()
+        except TypeError:
+            # Non-string keys, integers over 64 bits and similar values.
+            return _dumps_stdlib(data)
+
+else:
+    _dumps = _dumps_stdlib
+
+
 class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one compact JSON object per line, encoded with orjson when
+    it is installed. The timestamp is the record creation time; its date and time
+    part is cached per second.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._timestamp_prefix: tuple[int, str] = (-1, "")
+
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        cached_second, prefix = self._timestamp_prefix
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._timestamp_prefix = (second, prefix)
+        microsecond = int((created - second) * 1_000_000)
+        return f"{prefix}.{microsecond:06d}+00:00"
+
     def format(self, record: logging.LogRecord) -> str:
         log_data: dict[str, Any] = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -37,13 +192,9 @@ class JsonFormatter(logging.Formatter):
 
         extra_fields = getattr(record, "extra_fields", None)
         if isinstance(extra_fields, dict):
-            log_data.update(
-                {
-                    key: value
-                    for key, value in extra_fields.items()
-                    if key not in RESERVED_LOG_FIELDS
-                }
-            )
+            for key, value in extra_fields.items():
+                if key not in RESERVED_LOG_FIELDS:
+                    log_data[key] = value
 
         if record.exc_info and record.exc_info[0] is not None:
             exc_type, exc_value, _ = record.exc_info
@@ -52,16 +203,96 @@ class JsonFormatter(logging.Formatter):
                 log_data["error_message"] = str(exc_value)
             log_data["exception"] = self.formatException(record.exc_info)
 
-        return json.dumps(log_data, ensure_ascii=False, default=str)
+        return _dumps(log_data)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Hands records to a QueueListener thread that formats and writes them, so
+    json.dumps and a stdout write that may block stay off the request thread.
+    When the queue is full, records are dropped and counted, or with
+    block_on_full the caller waits for room.
+    """
+
+    queue: Queue
+
+    def __init__(self, log_queue: Queue, block_on_full: bool = False):
+        super().__init__(log_queue)
+        self.block_on_full = block_on_full
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only the message is resolved here; JSON formatting and tracebacks are
+        # left to the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.block_on_full:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            LOG_RECORDS_DROPPED_TOTAL.labels(level=record.levelname).inc()
+
+
+_listener: QueueListener | None = None
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def shutdown_logging() -> None:
+    """
+    Writes out the records still queued. Runs at exit, and must be called
+    before os._exit(), which skips atexit handlers.
+    """
+    _stop_listener()
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
+
+def _start_listener(handler: BoundedQueueHandler, *outputs: logging.Handler) -> None:
+    global _listener
+    _listener = QueueListener(handler.queue, *outputs, respect_handler_level=True)
+    _listener.start()
 
 
 def setup_logging() -> None:
     log_level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
+    _stop_listener()
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setLevel(log_level)
+    output.setFormatter(JsonFormatter())
 
-    handler = logging.StreamHandler(sys.stdout)
+    handler: logging.Handler = output
+    if settings.LOG_QUEUE_SIZE > 0:
+        handler = BoundedQueueHandler(
+            Queue(maxsize=settings.LOG_QUEUE_SIZE),
+            block_on_full=settings.LOG_QUEUE_OVERFLOW == "block",
+        )
+        _start_listener(handler, output)
+
+    # Filters run on the calling thread: dropped records are never queued, and
+    # the request ID context variable is read before the record is handed off.
     handler.setLevel(log_level)
+    handler.addFilter(
+        LogVolumeFilter(
+            sample_rates=settings.LOG_SAMPLE_RATES,
+            slow_ms=settings.LOG_SAMPLE_SLOW_MS,
+            rate_limited_events=settings.LOG_RATE_LIMITED_EVENTS,
+            rate_per_sec=settings.LOG_RATE_LIMIT_PER_SEC,
+            burst=settings.LOG_RATE_LIMIT_BURST,
+        )
+    )
     handler.addFilter(RequestIDFilter())
-    handler.setFormatter(JsonFormatter())
 
     root_logger = logging.getLogger()
     root_logger.handlers.clear()
@@ -69,3 +300,29 @@ def setup_logging() -> None:
     root_logger.addHandler(handler)
 
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def _restart_listener_after_fork() -> None:
+    # A forked worker inherits the queue but not the listener thread.
+    global _listener
+    if _listener is None:
+        return
+    handler = next(
+        (
+            handler
+            for handler in logging.getLogger().handlers
+            if isinstance(handler, BoundedQueueHandler)
+        ),
+        None,
+    )
+    outputs = _listener.handlers
+    _listener = None
+    if handler is None:
+        return
+    handler.queue = Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _start_listener(handler, *outputs)
+
+
+atexit.register(shutdown_logging)
+os.register_at_fork(after_in_child=_restart_listener_after_fork)
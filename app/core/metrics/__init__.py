@@ -19,9 +19,20 @@ from app.core.metrics.collectors import (
     USER_COUNT,
     WALLET_COUNT,
 )
-from app.core.metrics.system import refresh_system_metrics
+from app.core.metrics.periodic import PeriodicTask
+from app.core.metrics.system import SystemMetricsCollector, refresh_system_metrics
+from app.core.metrics.tasks import (
+    CELERY_OLDEST_TASK_AGE_SECONDS,
+    CELERY_TASK_DURATION_SECONDS,
+    CELERY_TASK_QUEUE_WAIT_SECONDS,
+    CELERY_TASK_RETRIES,
+)
 
 __all__ = [
+    "CELERY_OLDEST_TASK_AGE_SECONDS",
+    "CELERY_TASK_DURATION_SECONDS",
+    "CELERY_TASK_QUEUE_WAIT_SECONDS",
+    "CELERY_TASK_RETRIES",
     "DB_QUERY_DURATION_SECONDS",
     "DB_QUERY_ERRORS_TOTAL",
     "HTTP_EXCEPTIONS_TOTAL",
@@ -30,7 +41,9 @@ __all__ = [
     "HTTP_REQUESTS_TOTAL",
     "LEDGER_BALANCE_TOTAL",
     "METRICS_COLLECTION_SUCCESS",
+    "PeriodicTask",
     "SYSTEM_METRICS_COLLECTION_ERRORS_TOTAL",
+    "SystemMetricsCollector",
     "TRANSACTION_COUNT",
     "TRANSFER_AMOUNT_TOTAL",
     "TRANSFERS_CREATED_TOTAL",
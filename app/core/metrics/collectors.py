@@ -16,6 +16,28 @@ HTTP_REQUEST_DURATION_SECONDS = Histogram(
     ["method", "path"],
 )
 
+REQUEST_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per HTTP request",
+    ["method", "path"],
+    buckets=REQUEST_COUNT_BUCKETS,
+)
+
+HTTP_REQUEST_REDIS_COMMANDS = Histogram(
+    "http_request_redis_commands",
+    "Redis commands executed per HTTP request",
+    ["method", "path"],
+    buckets=REQUEST_COUNT_BUCKETS,
+)
+
+QUERY_BUDGET_VIOLATIONS_TOTAL = Counter(
+    "query_budget_violations_total",
+    "HTTP requests over the query budget or repeating one query",
+    ["method", "path", "reason"],
+)
+
 HTTP_EXCEPTIONS_TOTAL = Counter(
     "http_exceptions_total",
     "Total number of handled HTTP exceptions",
@@ -35,26 +57,31 @@ TRANSFER_AMOUNT_TOTAL = Counter(
 WALLET_COUNT = Gauge(
     "wallet_count",
     "Current number of wallets",
+    multiprocess_mode="mostrecent",
 )
 
 USER_COUNT = Gauge(
     "user_count",
     "Current number of users",
+    multiprocess_mode="mostrecent",
 )
 
 TRANSACTION_COUNT = Gauge(
     "transaction_count",
     "Current number of transactions",
+    multiprocess_mode="mostrecent",
 )
 
 LEDGER_BALANCE_TOTAL = Gauge(
     "ledger_balance_total",
     "Current sum of all wallet balances",
+    multiprocess_mode="mostrecent",
 )
 
 METRICS_COLLECTION_SUCCESS = Gauge(
     "metrics_collection_success",
     "Whether the latest system metrics collection succeeded",
+    multiprocess_mode="mostrecent",
 )
 
 SYSTEM_METRICS_COLLECTION_ERRORS_TOTAL = Counter(
@@ -73,3 +100,79 @@ DB_QUERY_ERRORS_TOTAL = Counter(
     "Total number of database query errors",
     ["operation"],
 )
+
+DB_POOL_CHECKED_OUT_CONNECTIONS = Gauge(
+    "db_pool_checked_out_connections",
+    "Database connections currently checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_OVERFLOW_CONNECTIONS = Gauge(
+    "db_pool_overflow_connections",
+    "Connections open beyond the pool size",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+DB_WAIT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+)
+
+DB_POOL_CHECKOUT_WAIT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool",
+    ["pool"],
+    buckets=DB_WAIT_BUCKETS,
+)
+
+DB_POOL_CONNECT_SECONDS = Histogram(
+    "db_pool_connect_seconds",
+    "Time spent opening a new connection during a pool checkout",
+    ["pool"],
+    buckets=DB_WAIT_BUCKETS,
+)
+
+DB_ROW_LOCK_WAIT_SECONDS = Histogram(
+    "db_row_lock_wait_seconds",
+    "Time spent acquiring SELECT ... FOR UPDATE row locks",
+    ["table"],
+    buckets=DB_WAIT_BUCKETS,
+)
+
+DB_ROW_LOCK_CONTENDED_TOTAL = Counter(
+    "db_row_lock_contended_total",
+    "Row lock acquisitions that waited at least DB_ROW_LOCK_CONTENDED_MS",
+    ["table"],
+)
+
+DB_POOL_CONNECTION_EVENTS_TOTAL = Counter(
+    "db_pool_connection_events_total",
+    "Database connections opened, closed and invalidated by the pool",
+    ["pool", "event"],
+)
+
+LOG_RECORDS_DROPPED_TOTAL = Counter(
+    "log_records_dropped_total",
+    "Log records dropped because the logging queue was full",
+    ["level"],
+)
+
+LOG_RECORDS_SUPPRESSED_TOTAL = Counter(
+    "log_records_suppressed_total",
+    "Log records discarded by sampling or rate limiting",
+    ["reason"],
+)
@@ -0,0 +1,57 @@
+import logging
+
+from app.core.metrics.collectors import QUERY_BUDGET_VIOLATIONS_TOTAL
+from app.core.request_context import RequestTimings
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Statements are timed as `db`, or as `db_lock` for SELECT ... FOR UPDATE.
+DB_PHASES = ("db", "db_lock")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised in test runs when a request breaks its query budget."""
+
+
+def count_statements(timings: RequestTimings) -> int:
+    return sum(timings.counts.get(phase, 0) for phase in DB_PHASES)
+
+
+def check_query_budget(method: str, path: str, timings: RequestTimings) -> None:
+    """
+    Flags requests that run more than QUERY_BUDGET_PER_REQUEST statements, or one
+    fingerprint more than QUERY_REPEAT_LIMIT times, the usual sign of an N+1
+    lazy load. Logs a warning, and also raises with QUERY_BUDGET_ACTION=raise,
+    which the middleware turns into a 500 before the response starts.
+    """
+    violations: dict[str, object] = {}
+
+    statements = count_statements(timings)
+    budget = settings.QUERY_BUDGET_PER_REQUEST
+    if budget and statements > budget:
+        violations["over_budget"] = {"statements": statements, "budget": budget}
+
+    repeat_limit = settings.QUERY_REPEAT_LIMIT
+    if repeat_limit and timings.queries:
+        fingerprint, executions = max(timings.queries.items(), key=lambda q: q[1])
+        if executions > repeat_limit:
+            violations["repeated_query"] = {
+                "fingerprint": fingerprint,
+                "executions": executions,
+                "limit": repeat_limit,
+            }
+
+    if not violations:
+        return
+
+    for reason in violations:
+        QUERY_BUDGET_VIOLATIONS_TOTAL.labels(
+            method=method, path=path, reason=reason
+        ).inc()
+
+    details = {"method": method, "path": path, **violations}
+    logger.warning("query_budget_exceeded", extra={"extra_fields": details})
+    if settings.QUERY_BUDGET_ACTION == "raise":
+        raise QueryBudgetExceeded(f"query budget exceeded: {details}")
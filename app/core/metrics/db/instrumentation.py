@@ -1,12 +1,29 @@
+import logging
 import time
 
 from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
 
 from app.core.metrics.collectors import (
+    DB_POOL_CHECKED_OUT_CONNECTIONS,
+    DB_POOL_CHECKOUT_WAIT_SECONDS,
+    DB_POOL_CONNECT_SECONDS,
+    DB_POOL_CONNECTION_EVENTS_TOTAL,
+    DB_POOL_OVERFLOW_CONNECTIONS,
     DB_QUERY_DURATION_SECONDS,
     DB_QUERY_ERRORS_TOTAL,
 )
-from app.db import engine
+from app.core.metrics.db.locks import ROW_LOCK_OPTION, ROW_LOCKS
+from app.core.metrics.db.queries import QUERY_STATS, QueryStat, redact_parameters
+from app.core.request_context import record_query, record_timing
+from app.core.settings import settings
+from app.core.tracing import record_span
+from app.db.pool import CHECKOUT_WAIT_KEY, CONNECT_TIME_KEY
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_SAVEPOINT = "slow_query_explain"
 
 
 def _query_operation(statement: str) -> str:
@@ -20,27 +37,151 @@ def _query_operation(statement: str) -> str:
     return "other"
 
 
-# def register_db_metrics(engine: Engine) -> None:
-@event.listens_for(engine, "before_cursor_execute")
-def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-    context._query_started_at = time.perf_counter()
-    context._query_operation = _query_operation(statement)
+def _explain(conn, statement: str, parameters) -> list[str] | None:
+    """
+    Returns the PostgreSQL plan of a statement that has just run. A savepoint
+    keeps a failing EXPLAIN from aborting the caller's transaction.
+    """
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        try:
+            cursor.execute(f"EXPLAIN {statement}", parameters)
+            plan = [row[0] for row in cursor.fetchall()]
+        except Exception:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            raise
+        cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        return plan
+    except Exception:
+        logger.debug("slow_query_explain_failed", exc_info=True)
+        return None
+    finally:
+        cursor.close()
+
+
+def _log_slow_query(
+    conn,
+    statement: str,
+    parameters,
+    executemany: bool,
+    stat: QueryStat,
+    duration: float,
+) -> None:
+    extra_fields: dict[str, object] = {
+        "fingerprint": stat.fingerprint,
+        "operation": stat.operation,
+        "statement": stat.statement,
+        "duration_ms": round(duration * 1000, 3),
+        "parameters": redact_parameters(parameters, executemany),
+    }
+    if (
+        settings.DB_SLOW_QUERY_EXPLAIN
+        and not executemany
+        and conn.dialect.name == "postgresql"
+        and stat.operation != "other"
+    ):
+        extra_fields["plan"] = _explain(conn, statement, parameters)
+
+    logger.warning("slow_query", extra={"extra_fields": extra_fields})
+
+
+def register_db_metrics(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        context._query_started_at = time.perf_counter()
+        context._query_operation = _query_operation(statement)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started_at = getattr(context, "_query_started_at", None)
+        if started_at is None:
+            return
+
+        operation = getattr(context, "_query_operation", "other")
+        duration = time.perf_counter() - started_at
+        DB_QUERY_DURATION_SECONDS.labels(operation=operation).observe(duration)
+        row_lock = context.execution_options.get(ROW_LOCK_OPTION)
+        if row_lock is not None:
+            # Locking a few rows by primary key takes microseconds, so the time
+            # of the statement is spent waiting for transactions holding them.
+            ROW_LOCKS.record(*row_lock, duration)
+            record_timing("db_lock", duration)
+            record_span("db.row_lock", duration, table=row_lock[0])
+        else:
+            record_timing("db", duration)
+            record_span("db.query", duration, operation=operation, statement=statement)
+
+        stat = QUERY_STATS.record(
+            statement, operation, duration, getattr(cursor, "rowcount", -1)
+        )
+        record_query(stat.fingerprint)
+        if settings.DB_SLOW_QUERY_MS and duration * 1000 >= settings.DB_SLOW_QUERY_MS:
+            _log_slow_query(conn, statement, parameters, executemany, stat, duration)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_query_error(exception_context):
+        context = exception_context.execution_context
+        operation = (
+            getattr(context, "_query_operation", "other") if context else "other"
+        )
+        DB_QUERY_ERRORS_TOTAL.labels(operation=operation).inc()
+
+        # Lock timeouts and deadlocks end the longest waits; record them too.
+        started_at = getattr(context, "_query_started_at", None)
+        row_lock = context.execution_options.get(ROW_LOCK_OPTION) if context else None
+        if started_at is not None and row_lock is not None:
+            ROW_LOCKS.record(*row_lock, time.perf_counter() - started_at)
+
+
+def register_pool_metrics(engine: Engine, pool_name: str) -> None:
+    """
+    Exports pool occupancy, checkout wait and connection churn, so a slow request
+    can be attributed to waiting for a pool slot rather than to query time.
+    """
+    pool = engine.pool
+    checked_out = DB_POOL_CHECKED_OUT_CONNECTIONS.labels(pool=pool_name)
+    overflow = DB_POOL_OVERFLOW_CONNECTIONS.labels(pool=pool_name)
+    checkout_wait = DB_POOL_CHECKOUT_WAIT_SECONDS.labels(pool=pool_name)
+    connect_time = DB_POOL_CONNECT_SECONDS.labels(pool=pool_name)
+
+    def update_overflow() -> None:
+        if isinstance(pool, QueuePool):
+            overflow.set(max(pool.overflow(), 0))
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTION_EVENTS_TOTAL.labels(pool=pool_name, event="connect").inc()
+
+    @event.listens_for(engine, "close")
+    def on_close(dbapi_connection, connection_record):
+        DB_POOL_CONNECTION_EVENTS_TOTAL.labels(pool=pool_name, event="close").inc()
 
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        DB_POOL_CONNECTION_EVENTS_TOTAL.labels(pool=pool_name, event="invalidate").inc()
 
-@event.listens_for(engine, "after_cursor_execute")
-def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-    started_at = getattr(context, "_query_started_at", None)
-    if started_at is None:
-        return
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_out.inc()
+        update_overflow()
+        wait = connection_record.info.pop(CHECKOUT_WAIT_KEY, None)
+        if wait is not None:
+            checkout_wait.observe(wait)
+            record_timing("db_pool", wait)
+            record_span("db.pool_wait", wait, pool=pool_name)
+        connected = connection_record.info.pop(CONNECT_TIME_KEY, None)
+        if connected is not None:
+            connect_time.observe(connected)
 
-    operation = getattr(context, "_query_operation", "other")
-    DB_QUERY_DURATION_SECONDS.labels(operation=operation).observe(
-        time.perf_counter() - started_at
-    )
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+        update_overflow()
 
 
-@event.listens_for(engine, "handle_error")
-def handle_query_error(exception_context):
-    context = exception_context.execution_context
-    operation = getattr(context, "_query_operation", "other") if context else "other"
-    DB_QUERY_ERRORS_TOTAL.labels(operation=operation).inc()
+def instrument_engine(engine: Engine, pool_name: str) -> None:
+    register_db_metrics(engine)
+    register_pool_metrics(engine, pool_name)
@@ -0,0 +1,196 @@
+import threading
+from collections.abc import Hashable, Iterable, Iterator
+from dataclasses import dataclass
+
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from app.core.metrics.collectors import (
+    DB_ROW_LOCK_CONTENDED_TOTAL,
+    DB_ROW_LOCK_WAIT_SECONDS,
+)
+from app.core.metrics.multiprocess import (
+    multiprocess_dir,
+    read_snapshots,
+    register_scrape_collector,
+    write_snapshot,
+)
+from app.core.settings import settings
+
+# Execution option naming the table and row IDs a SELECT ... FOR UPDATE locks.
+ROW_LOCK_OPTION = "row_lock"
+SNAPSHOT_NAME = "row_locks"
+
+
+@dataclass
+class HeavyHitter:
+    key: Hashable
+    weight: float
+    error: float
+    count: int
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "row_id": self.key,
+            "wait_ms": round(self.weight * 1000, 3),
+            "error_ms": round(self.error * 1000, 3),
+            "contended": self.count,
+        }
+
+
+class SpaceSavingSketch:
+    """
+    Approximate heaviest keys of a stream in fixed memory (Metwally et al.,
+    "Efficient Computation of Frequent and Top-k Elements in Data Streams").
+    Once `capacity` keys are tracked, a new key replaces the lightest one and
+    inherits its weight as error, so a key's weight is overestimated by at
+    most `error`, and any key heavier than total / capacity is kept.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._counters: dict[Hashable, HeavyHitter] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: Hashable, weight: float = 1.0) -> None:
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                if len(self._counters) < self._capacity:
+                    counter = self._counters[key] = HeavyHitter(key, 0.0, 0.0, 0)
+                else:
+                    lightest = min(
+                        self._counters.values(), key=lambda counter: counter.weight
+                    )
+                    del self._counters[lightest.key]
+                    counter = self._counters[key] = HeavyHitter(
+                        key, lightest.weight, lightest.weight, lightest.count
+                    )
+            counter.weight += weight
+            counter.count += 1
+
+    def top(self, limit: int) -> list[HeavyHitter]:
+        with self._lock:
+            return [
+                HeavyHitter(**vars(counter))
+                for counter in sorted(
+                    self._counters.values(),
+                    key=lambda counter: counter.weight,
+                    reverse=True,
+                )[:limit]
+            ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+class RowLockContention:
+    """
+    Per-process lock wait of the most contended rows of each table. Only
+    waits of at least DB_ROW_LOCK_CONTENDED_MS are added, so rows that are
+    merely busy do not crowd out the ones behind the lock queues.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._sketches: dict[str, SpaceSavingSketch] = {}
+        self._lock = threading.Lock()
+
+    def record(self, table: str, row_ids: Iterable[Hashable], wait: float) -> None:
+        DB_ROW_LOCK_WAIT_SECONDS.labels(table=table).observe(wait)
+        if wait * 1000 < settings.DB_ROW_LOCK_CONTENDED_MS:
+            return
+
+        DB_ROW_LOCK_CONTENDED_TOTAL.labels(table=table).inc()
+        with self._lock:
+            sketch = self._sketches.get(table)
+            if sketch is None:
+                sketch = self._sketches[table] = SpaceSavingSketch(self._capacity)
+        # A blocked statement does not report which of its rows was held, so
+        # every row shares the wait; the hot one accumulates it across transfers.
+        for row_id in row_ids:
+            sketch.add(row_id, wait)
+
+    def top(self, limit: int) -> dict[str, list[HeavyHitter]]:
+        with self._lock:
+            sketches = dict(self._sketches)
+        return {table: sketch.top(limit) for table, sketch in sketches.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sketches.clear()
+
+    def publish(self, limit: int) -> None:
+        """Shares the top `limit` rows of each table with the worker serving /metrics."""
+        write_snapshot(
+            SNAPSHOT_NAME,
+            {
+                table: [vars(hitter) for hitter in hitters]
+                for table, hitters in self.top(limit).items()
+            },
+        )
+
+
+def merge_row_locks(
+    snapshots: list[dict[str, list[dict]]], limit: int
+) -> dict[str, list[HeavyHitter]]:
+    """Adds up the published top rows of each worker and ranks them again."""
+    merged: dict[str, dict[Hashable, HeavyHitter]] = {}
+    for snapshot in snapshots:
+        for table, hitters in snapshot.items():
+            rows = merged.setdefault(table, {})
+            for data in hitters:
+                hitter = HeavyHitter(**data)
+                current = rows.get(hitter.key)
+                if current is None:
+                    rows[hitter.key] = hitter
+                    continue
+                current.weight += hitter.weight
+                current.error += hitter.error
+                current.count += hitter.count
+    return {
+        table: sorted(rows.values(), key=lambda hitter: hitter.weight, reverse=True)[
+            :limit
+        ]
+        for table, rows in merged.items()
+    }
+
+
+class RowLockCollector(Collector):
+    """
+    Exports the DB_ROW_LOCK_TOP_K most contended rows of each table at scrape
+    time, so only the current top rows have series. With several workers, their
+    published snapshots are merged.
+    """
+
+    def __init__(self, contention: RowLockContention) -> None:
+        self._contention = contention
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        if not settings.DB_ROW_LOCK_EXPORT_INTERVAL_SEC:
+            return
+
+        limit = settings.DB_ROW_LOCK_TOP_K
+        if multiprocess_dir() is None:
+            tables = self._contention.top(limit)
+        else:
+            tables = merge_row_locks(read_snapshots(SNAPSHOT_NAME), limit)
+
+        wait = GaugeMetricFamily(
+            "db_row_lock_hot_row_wait_seconds",
+            "Estimated contended lock wait of each of the most contended rows",
+            labels=["table", "row_id"],
+        )
+        for table, hitters in tables.items():
+            for hitter in hitters:
+                wait.add_metric([table, str(hitter.key)], hitter.weight)
+        yield wait
+
+
+ROW_LOCKS = RowLockContention(settings.DB_ROW_LOCK_SKETCH_SIZE)
+register_scrape_collector(RowLockCollector(ROW_LOCKS))
+
+
+def publish_row_lock_stats() -> None:
+    ROW_LOCKS.publish(settings.DB_ROW_LOCK_TOP_K)
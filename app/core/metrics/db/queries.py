@@ -0,0 +1,222 @@
+import hashlib
+import re
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from app.core.metrics.multiprocess import (
+    multiprocess_dir,
+    read_snapshots,
+    register_scrape_collector,
+    write_snapshot,
+)
+from app.core.settings import settings
+
+OTHER_FINGERPRINT = "other"
+SNAPSHOT_NAME = "query_stats"
+
+_COMMENTS = re.compile(r"/\*.*?\*/|--[^\n]*", re.DOTALL)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDERS = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_ROW = r"\(\s*\?(?:\s*,\s*\?)*\s*\)"
+_VALUES_ROWS = re.compile(rf"({_ROW})(?:\s*,\s*{_ROW})+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_statement(statement: str) -> str:
+    """
+    Replaces literals and bound parameters with `?` and collapses IN lists and
+    multi-row VALUES, so every execution of one query has the same text.
+    """
+    text = _COMMENTS.sub(" ", statement)
+    text = _STRINGS.sub("?", text)
+    text = _PLACEHOLDERS.sub("?", text)
+    text = _NUMBERS.sub("?", text)
+    text = _IN_LIST.sub("IN (?...)", text)
+    text = _VALUES_ROWS.sub(r"\1, ...", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+@lru_cache(maxsize=2048)
+def fingerprint_statement(statement: str) -> tuple[str, str]:
+    """Returns a short stable ID for the normalised statement, and its text."""
+    text = normalize_statement(statement)
+    return hashlib.blake2b(text.encode(), digest_size=6).hexdigest(), text
+
+
+@dataclass
+class QueryStat:
+    fingerprint: str
+    statement: str
+    operation: str
+    calls: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    rows: int = 0
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "fingerprint": self.fingerprint,
+            "operation": self.operation,
+            "statement": self.statement,
+            "calls": self.calls,
+            "total_ms": round(self.total_time * 1000, 3),
+            "mean_ms": round(self.total_time * 1000 / max(self.calls, 1), 3),
+            "max_ms": round(self.max_time * 1000, 3),
+            "rows": self.rows,
+        }
+
+
+class QueryStatsRegistry:
+    """
+    Per-process call count, total and maximum time and rows of each query
+    fingerprint. Once max_fingerprints are tracked, new ones are added up
+    under `other`, so ad hoc SQL cannot grow the registry without bound.
+    """
+
+    def __init__(self, max_fingerprints: int) -> None:
+        self._max_fingerprints = max_fingerprints
+        self._stats: dict[str, QueryStat] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        statement: str,
+        operation: str,
+        duration: float,
+        rows: int,
+    ) -> QueryStat:
+        fingerprint, text = fingerprint_statement(statement)
+        with self._lock:
+            stat = self._stats.get(fingerprint)
+            if stat is None:
+                if len(self._stats) >= self._max_fingerprints:
+                    fingerprint, text, operation = OTHER_FINGERPRINT, "", "other"
+                    stat = self._stats.get(fingerprint)
+                if stat is None:
+                    stat = self._stats[fingerprint] = QueryStat(
+                        fingerprint, text, operation
+                    )
+            stat.calls += 1
+            stat.total_time += duration
+            stat.max_time = max(stat.max_time, duration)
+            stat.rows += max(rows, 0)
+            return stat
+
+    def top(self, limit: int) -> list[QueryStat]:
+        """The fingerprints with the highest total time."""
+        with self._lock:
+            stats = [
+                QueryStat(**vars(stat))
+                for stat in sorted(
+                    self._stats.values(),
+                    key=lambda stat: stat.total_time,
+                    reverse=True,
+                )[:limit]
+            ]
+        return stats
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def publish(self, limit: int) -> None:
+        """Shares the top `limit` queries with the worker serving /metrics."""
+        write_snapshot(SNAPSHOT_NAME, [vars(stat) for stat in self.top(limit)])
+
+
+def merge_query_stats(snapshots: list[list[dict]], limit: int) -> list[QueryStat]:
+    """Adds up the published top queries of each worker and ranks them again."""
+    merged: dict[str, QueryStat] = {}
+    for snapshot in snapshots:
+        for data in snapshot:
+            stat = QueryStat(**data)
+            current = merged.get(stat.fingerprint)
+            if current is None:
+                merged[stat.fingerprint] = stat
+                continue
+            current.calls += stat.calls
+            current.total_time += stat.total_time
+            current.max_time = max(current.max_time, stat.max_time)
+            current.rows += stat.rows
+    return sorted(merged.values(), key=lambda stat: stat.total_time, reverse=True)[
+        :limit
+    ]
+
+
+class QueryStatsCollector(Collector):
+    """
+    Exports the top DB_QUERY_STATS_TOP_K fingerprints at scrape time, so only the
+    current top ones have series. With several workers, their published
+    snapshots are merged.
+    """
+
+    def __init__(self, registry: QueryStatsRegistry) -> None:
+        self._registry = registry
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        if not settings.DB_QUERY_STATS_EXPORT_INTERVAL_SEC:
+            return
+
+        limit = settings.DB_QUERY_STATS_TOP_K
+        if multiprocess_dir() is None:
+            stats = self._registry.top(limit)
+        else:
+            stats = merge_query_stats(read_snapshots(SNAPSHOT_NAME), limit)
+
+        labels = ["fingerprint", "operation"]
+        calls = GaugeMetricFamily(
+            "db_query_fingerprint_calls",
+            "Executions of each of the most time-consuming query fingerprints",
+            labels=labels,
+        )
+        seconds = GaugeMetricFamily(
+            "db_query_fingerprint_seconds",
+            "Total execution time of each of the most time-consuming query "
+            "fingerprints",
+            labels=labels,
+        )
+        max_seconds = GaugeMetricFamily(
+            "db_query_fingerprint_max_seconds",
+            "Slowest execution of each of the most time-consuming query fingerprints",
+            labels=labels,
+        )
+        rows = GaugeMetricFamily(
+            "db_query_fingerprint_rows",
+            "Rows returned or affected by each of the most time-consuming query "
+            "fingerprints",
+            labels=labels,
+        )
+        for stat in stats:
+            values = [stat.fingerprint, stat.operation]
+            calls.add_metric(values, stat.calls)
+            seconds.add_metric(values, stat.total_time)
+            max_seconds.add_metric(values, stat.max_time)
+            rows.add_metric(values, stat.rows)
+        yield from (calls, seconds, max_seconds, rows)
+
+
+QUERY_STATS = QueryStatsRegistry(settings.DB_QUERY_STATS_MAX_FINGERPRINTS)
+register_scrape_collector(QueryStatsCollector(QUERY_STATS))
+
+
+def redact_parameters(parameters: object, executemany: bool = False) -> object:
+    """Keeps the shape of statement parameters, replacing values with type names."""
+    if executemany and isinstance(parameters, (list, tuple)):
+        return {"executions": len(parameters)}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+def publish_query_stats() -> None:
+    QUERY_STATS.publish(settings.DB_QUERY_STATS_TOP_K)
@@ -0,0 +1,86 @@
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from prometheus_client import REGISTRY, CollectorRegistry, generate_latest, multiprocess
+from prometheus_client.registry import Collector
+
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+SNAPSHOT_SUFFIX = ".json"
+
+_scrape_collectors: list[Collector] = []
+
+
+def multiprocess_dir() -> str | None:
+    """
+    Directory shared by the worker processes of one API instance.
+    prometheus_client reads it at import time, so it must be set in the
+    environment before the server starts, and emptied on every start.
+    """
+    return os.environ.get(MULTIPROC_DIR_ENV) or None
+
+
+def register_scrape_collector(collector: Collector) -> None:
+    """
+    Adds a collector computed at scrape time, for metrics such as top-K rankings
+    whose label sets change. Gauge.remove() has no effect in multiprocess mode,
+    so such metrics cannot be kept as gauges without growing without bound.
+    """
+    REGISTRY.register(collector)
+    _scrape_collectors.append(collector)
+
+
+def render_metrics() -> bytes:
+    """Renders all metrics, merged across worker processes in multiprocess mode."""
+    if multiprocess_dir() is None:
+        return generate_latest()
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for collector in _scrape_collectors:
+        registry.register(collector)
+    return generate_latest(registry)
+
+
+def write_snapshot(name: str, data: Any) -> None:
+    """
+    Publishes this worker's copy of per-process data, such as query stats, for
+    the worker that serves the next scrape. Does nothing with a single process.
+    """
+    directory = multiprocess_dir()
+    if directory is None:
+        return
+
+    path = Path(directory) / f"{name}_{os.getpid()}{SNAPSHOT_SUFFIX}"
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps(data))
+    os.replace(temporary, path)
+
+
+def read_snapshots(name: str) -> list[Any]:
+    """Returns the snapshots of every live worker."""
+    directory = multiprocess_dir()
+    if directory is None:
+        return []
+
+    snapshots = []
+    for path in Path(directory).glob(f"{name}_*{SNAPSHOT_SUFFIX}"):
+        try:
+            snapshots.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            # The worker exited and removed it between glob and read.
+            continue
+    return snapshots
+
+
+def mark_worker_exited(pid: int | None = None) -> None:
+    """Drops the live gauges and snapshots of a worker, such as its pool occupancy."""
+    directory = multiprocess_dir()
+    if directory is None:
+        return
+
+    pid = os.getpid() if pid is None else pid
+    multiprocess.mark_process_dead(pid)
+    for snapshot in Path(directory).glob(f"*_{pid}{SNAPSHOT_SUFFIX}"):
+        snapshot.unlink(missing_ok=True)
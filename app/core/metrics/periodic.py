@@ -0,0 +1,36 @@
+import logging
+import threading
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Runs `task` on a background thread every `interval` seconds until stopped,
+    starting right away. A failed run is logged and the next one still happens.
+    """
+
+    def __init__(self, name: str, interval: float, task: Callable[[], None]) -> None:
+        self.name = name
+        self._interval = interval
+        self._task = task
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._task()
+            except Exception:
+                logger.exception(
+                    "periodic_task_failed", extra={"extra_fields": {"task": self.name}}
+                )
+            self._stopped.wait(self._interval)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
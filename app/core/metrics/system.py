@@ -1,7 +1,12 @@
 import logging
+import time
+from collections.abc import Callable, Sequence
+from datetime import datetime, timedelta
+from decimal import Decimal
 
-from sqlalchemy import func, select
+from sqlalchemy import Row, func, select, text
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 
 import app.db.session as db_session
 from app.core.metrics.collectors import (
@@ -12,22 +17,139 @@ from app.core.metrics.collectors import (
     USER_COUNT,
     WALLET_COUNT,
 )
-from app.db.models import Transaction, User, Wallet
+from app.core.metrics.periodic import PeriodicTask
+from app.core.settings import settings
+from app.db.models import Base, Transaction, User, Wallet
 
 logger = logging.getLogger(__name__)
 
+PLANNER_ESTIMATE_QUERY = text(
+    "SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"
+)
+
+
+def count_rows(db: Session, model: type[Base]) -> int:
+    """
+    Counts rows with the PostgreSQL planner estimate once a table is large enough
+    for COUNT(*) to be a costly sequential scan. Small, never-analyzed and
+    non-PostgreSQL tables, or SYSTEM_METRICS_EXACT_COUNTS, get an exact count.
+    """
+    if (
+        not settings.SYSTEM_METRICS_EXACT_COUNTS
+        and db.get_bind().dialect.name == "postgresql"
+    ):
+        estimate = db.execute(
+            PLANNER_ESTIMATE_QUERY,
+            {"table": model.__tablename__},
+        ).scalar_one_or_none()
+        if (
+            estimate is not None
+            and estimate >= settings.SYSTEM_METRICS_ESTIMATE_MIN_ROWS
+        ):
+            return estimate
+
+    return db.execute(select(func.count()).select_from(model)).scalar_one()
+
+
+class LedgerBalance:
+    """
+    Running sum of all wallet balances.
+    Transfers only move money between wallets, so the sum changes only when a
+    wallet is created: each refresh adds the wallets created since the previous
+    one, and a full SUM reconciles the total every reconcile_interval seconds.
+
+    A new wallet adds its opening balance rather than its current one, which
+    also includes money moved in from wallets already counted.
+
+    Wallets are found by created_at, which is set when their transaction starts,
+    so one committed late can be older than the newest wallet already seen.
+    Each scan reaches back `overlap` seconds before that newest wallet, and
+    wallets counted in that window are remembered so they are not added twice.
+    """
+
+    def __init__(self, reconcile_interval: float, overlap: float) -> None:
+        self._reconcile_interval = reconcile_interval
+        self._overlap = timedelta(seconds=overlap)
+        self._total = Decimal("0")
+        self._watermark: datetime | None = None
+        self._counted: dict[int, datetime] = {}
+        self._reconciled_at = 0.0
+
+    def reset(self) -> None:
+        self._watermark = None
+        self._counted.clear()
+
+    def refresh(self, db: Session, now: float | None = None) -> Decimal:
+        now = time.monotonic() if now is None else now
+        if (
+            self._watermark is None
+            or now - self._reconciled_at >= self._reconcile_interval
+        ):
+            self._reconcile(db)
+            self._reconciled_at = now
+            return self._total
+
+        for wallet_id, created_at, _, opening_balance in self._wallets_since(
+            db, self._watermark - self._overlap
+        ):
+            if wallet_id not in self._counted:
+                self._total += opening_balance
+                self._counted[wallet_id] = created_at
+                self._watermark = max(self._watermark, created_at)
+        self._forget_before(self._watermark - self._overlap)
+        return self._total
+
+    def _reconcile(self, db: Session) -> None:
+        self._counted.clear()
+        self._watermark = db.execute(select(func.max(Wallet.created_at))).scalar()
+        if self._watermark is None:
+            self._total = Decimal("0")
+            return
+
+        cutoff = self._watermark - self._overlap
+        older = db.execute(
+            select(func.coalesce(func.sum(Wallet.balance), 0)).where(
+                Wallet.created_at < cutoff
+            )
+        ).scalar_one()
+        self._total = Decimal(older)
+        # Older and recent wallets together make up the current SUM(balance).
+        for wallet_id, created_at, balance, _ in self._wallets_since(db, cutoff):
+            self._total += balance
+            self._counted[wallet_id] = created_at
+            self._watermark = max(self._watermark, created_at)
+
+    def _wallets_since(
+        self, db: Session, cutoff: datetime
+    ) -> Sequence[Row[tuple[int, datetime, Decimal, Decimal]]]:
+        return db.execute(
+            select(
+                Wallet.id, Wallet.created_at, Wallet.balance, Wallet.opening_balance
+            ).where(Wallet.created_at >= cutoff)
+        ).all()
+
+    def _forget_before(self, cutoff: datetime) -> None:
+        self._counted = {
+            wallet_id: created_at
+            for wallet_id, created_at in self._counted.items()
+            if created_at >= cutoff
+        }
+
+
+LEDGER_BALANCE = LedgerBalance(
+    settings.SYSTEM_METRICS_LEDGER_RECONCILE_SEC,
+    settings.SYSTEM_METRICS_LEDGER_OVERLAP_SEC,
+)
+
 
 def refresh_system_metrics() -> None:
     try:
-        with db_session.SessionLocal() as db:
-            wallet_count = db.execute(select(func.count(Wallet.id))).scalar_one()
-            user_count = db.execute(select(func.count(User.id))).scalar_one()
-            transaction_count = db.execute(
-                select(func.count(Transaction.id))
-            ).scalar_one()
-            total_balance = db.execute(
-                select(func.coalesce(func.sum(Wallet.balance), 0))
-            ).scalar_one()
+        # Aggregates tolerate replication lag, so they are read from a replica.
+        with db_session.replica_session() as db:
+            wallet_count = count_rows(db, Wallet)
+            user_count = count_rows(db, User)
+            transaction_count = count_rows(db, Transaction)
+            total_balance = LEDGER_BALANCE.refresh(db)
     except SQLAlchemyError:
         logger.warning(
             "system_metrics_collection_failed",
@@ -43,3 +165,15 @@ def refresh_system_metrics() -> None:
     TRANSACTION_COUNT.set(transaction_count)
     LEDGER_BALANCE_TOTAL.set(float(total_balance))
     METRICS_COLLECTION_SUCCESS.set(1)
+
+
+class SystemMetricsCollector(PeriodicTask):
+    """
+    Refreshes the system gauges on a background thread, so a Prometheus scrape
+    only reads the latest values instead of querying the database.
+    """
+
+    def __init__(
+        self, interval: float, refresh: Callable[[], None] = refresh_system_metrics
+    ) -> None:
+        super().__init__("system-metrics", interval, refresh)
@@ -0,0 +1,110 @@
+import threading
+import time
+from datetime import datetime
+
+from prometheus_client import Gauge, Histogram
+
+ENQUEUED_AT_HEADER = "enqueued_at"
+
+CELERY_TASK_QUEUE_WAIT_SECONDS = Histogram(
+    "celery_task_queue_wait_seconds",
+    "Time a task message spent in the broker before a worker started it",
+    ["task"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+
+CELERY_TASK_DURATION_SECONDS = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task execution time in seconds",
+    ["task", "state"],
+)
+
+CELERY_TASK_RETRIES = Histogram(
+    "celery_task_retries",
+    "Number of retries a task needed before it succeeded or failed",
+    ["task"],
+    buckets=(0, 1, 2, 3, 4, 5),
+)
+
+CELERY_OLDEST_TASK_AGE_SECONDS = Gauge(
+    "celery_oldest_task_age_seconds",
+    "Age of the oldest task this worker has received but not yet finished",
+)
+
+
+class InFlightTasks:
+    """
+    Runnable times of tasks a worker has received and not yet finished. Tasks
+    with a countdown or ETA are counted from their ETA, not from when they
+    were published.
+    """
+
+    def __init__(self) -> None:
+        self._enqueued_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, task_id: str, enqueued_at: float) -> None:
+        with self._lock:
+            self._enqueued_at[task_id] = enqueued_at
+
+    def discard(self, task_id: str) -> None:
+        with self._lock:
+            self._enqueued_at.pop(task_id, None)
+
+    def oldest_age(self) -> float:
+        with self._lock:
+            if not self._enqueued_at:
+                return 0.0
+            oldest = min(self._enqueued_at.values())
+        return max(time.time() - oldest, 0.0)
+
+
+IN_FLIGHT_TASKS = InFlightTasks()
+CELERY_OLDEST_TASK_AGE_SECONDS.set_function(IN_FLIGHT_TASKS.oldest_age)
+
+
+def parse_enqueued_at(value) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def runnable_at(enqueued_at: float, eta: str | datetime | None = None) -> float:
+    """When the task could first run: its enqueue time, or its ETA if later."""
+    if eta is None:
+        return enqueued_at
+    if isinstance(eta, str):
+        eta = datetime.fromisoformat(eta)
+    return max(enqueued_at, eta.timestamp())
+
+
+def queue_wait_seconds(
+    enqueued_at: float,
+    eta: str | datetime | None = None,
+    now: float | None = None,
+) -> float:
+    """Seconds since the task became runnable; a countdown is not counted as lag."""
+    now = time.time() if now is None else now
+    return max(now - runnable_at(enqueued_at, eta), 0.0)
+
+
+def record_task_queue_wait(
+    task_name: str,
+    enqueued_at: float,
+    eta: str | datetime | None = None,
+) -> None:
+    CELERY_TASK_QUEUE_WAIT_SECONDS.labels(task=task_name).observe(
+        queue_wait_seconds(enqueued_at, eta)
+    )
+
+
+def record_task_finished(
+    task_name: str,
+    state: str,
+    duration: float,
+    retries: int,
+) -> None:
+    CELERY_TASK_DURATION_SECONDS.labels(task=task_name, state=state).observe(duration)
+    if state != "RETRY":
+        CELERY_TASK_RETRIES.labels(task=task_name).observe(retries)
@@ -1,17 +1,32 @@
+import json
 import logging
 import time
 import uuid
 
 import sentry_sdk
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.metrics.collectors import (
+    HTTP_REQUEST_DB_QUERIES,
     HTTP_REQUEST_DURATION_SECONDS,
     HTTP_REQUEST_OUTCOMES_TOTAL,
+    HTTP_REQUEST_REDIS_COMMANDS,
     HTTP_REQUESTS_TOTAL,
 )
-from app.core.request_context import request_id_ctx
+from app.core.metrics.db.budget import (
+    QueryBudgetExceeded,
+    check_query_budget,
+    count_statements,
+)
+from app.core.request_context import (
+    RequestTimings,
+    request_id_ctx,
+    request_timings_ctx,
+)
+from app.core.settings import settings
+from app.core.tracing import SLOW_REQUESTS, RequestTrace, current_span_ctx
 
 logger = logging.getLogger(__name__)
 
@@ -28,98 +43,193 @@ def _sentry_user_from_request_state(request: Request) -> dict[str, str] | None:
     return {"id": str(user_id)}
 
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
-
-        token = request_id_ctx.set(request_id)
-        try:
-            response = await call_next(request)
-            response.headers["X-Request-ID"] = request_id
-            return response
-        finally:
-            request_id_ctx.reset(token)
+def _route_path(scope: Scope) -> str:
+    route = scope.get("route")
+    return route.path if route and hasattr(route, "path") else "__unmatched__"
+
+
+def _budget_exceeded_response(request_id: str) -> tuple[Message, Message]:
+    body = json.dumps(
+        {"detail": "Query budget exceeded", "request_id": request_id}
+    ).encode()
+    start = {
+        "type": "http.response.start",
+        "status": 500,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    }
+    return start, {"type": "http.response.body", "body": body}
+
+
+def _request_outcome(status_code: int) -> str:
+    if status_code < 400:
+        return "successful"
+    if status_code < 500:
+        return "client_error"
+    return "server_error"
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Pure ASGI middleware that assigns the request ID, sets the Sentry context,
+    and logs and measures every HTTP request.
+    Time spent in the database, Redis and the broker is collected per request
+    and returned in a Server-Timing header. Each request is also traced as a span
+    tree, which is kept only if the request was slow or failed.
+    The request is timed once and the status is captured from `send`, without the
+    per-request task group and memory streams of `BaseHTTPMiddleware`.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("X-Request-ID") or str(uuid.uuid4())
+        method = scope["method"]
+        status_code = 500
 
+        timings = RequestTimings()
+        over_budget = False
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code, over_budget
+            if over_budget:
+                # The app's response was replaced; drop the rest of its body.
+                return
+            if message["type"] == "http.response.start":
+                # Checked before anything is sent, so `raise` can still fail
+                # the request.
+                try:
+                    check_query_budget(method, _route_path(scope), timings)
+                except QueryBudgetExceeded:
+                    over_budget = True
+                    message, body = _budget_exceeded_response(request_id)
+                    await send(self._with_headers(message, request_id, timings))
+                    status_code = message["status"]
+                    await send(body)
+                    return
+                status_code = message["status"]
+                message = self._with_headers(message, request_id, timings)
+            await send(message)
+
+        trace = None
+        if settings.SLOW_REQUEST_THRESHOLD_MS > 0:
+            trace = RequestTrace(
+                "http.request",
+                {"method": method, "path": scope["path"], "request_id": request_id},
+                settings.SLOW_REQUEST_MAX_SPANS,
+            )
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+        token = request_id_ctx.set(request_id)
+        timings_token = request_timings_ctx.set(timings)
+        span_token = current_span_ctx.set(trace.root if trace else None)
         start_time = time.perf_counter()
-        status_code = 500
-
         try:
-            response = await call_next(request)
-            status_code = response.status_code
-            return response
+            self._set_sentry_context(scope, request_id)
+            await self.app(scope, receive, send_with_request_id)
         finally:
-            duration_ms = (time.perf_counter() - start_time) * 1000
-            logger.info(
-                "http_request_completed",
-                extra={
-                    "extra_fields": {
-                        "method": request.method,
-                        "path": request.url.path,
-                        "status": status_code,
-                        "duration_ms": round(duration_ms, 3),
-                    }
-                },
-            )
-
+            duration = time.perf_counter() - start_time
+            self._log_request(method, scope["path"], status_code, duration, timings)
+            self._record_metrics(scope, method, status_code, duration, timings)
+            if trace is not None:
+                self._keep_slow_trace(trace, status_code, duration)
+            current_span_ctx.reset(span_token)
+            request_timings_ctx.reset(timings_token)
+            request_id_ctx.reset(token)
 
-class SentryMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        request_id = request_id_ctx.get("-")
+    @staticmethod
+    def _with_headers(
+        message: Message, request_id: str, timings: RequestTimings
+    ) -> Message:
+        headers = MutableHeaders(scope=message)
+        headers["X-Request-ID"] = request_id
+        if settings.SERVER_TIMING_ENABLED:
+            headers["Server-Timing"] = timings.server_timing()
+        return message
+
+    @staticmethod
+    def _set_sentry_context(scope: Scope, request_id: str) -> None:
         sentry_sdk.set_tag("component", "api")
         sentry_sdk.set_context(
             "request",
             {
                 "request_id": request_id,
-                "method": request.method,
-                "path": request.url.path,
+                "method": scope["method"],
+                "path": scope["path"],
             },
         )
 
-        user_context = _sentry_user_from_request_state(request)
+        user_context = _sentry_user_from_request_state(Request(scope))
         if user_context is not None:
             sentry_sdk.set_user(user_context)
 
-        return await call_next(request)
-
-
-class MetricsMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.perf_counter()
-
-        method = request.method
-        status_code = 500
-
-        try:
-            response = await call_next(request)
-            status_code = response.status_code
-            return response
-        finally:
-            duration = time.perf_counter() - start_time
-            route = request.scope.get("route")
-            path = route.path if route and hasattr(route, "path") else "__unmatched__"
-            if status_code < 400:
-                outcome = "successful"
-            elif status_code < 500:
-                outcome = "client_error"
-            else:
-                outcome = "server_error"
-
-            HTTP_REQUESTS_TOTAL.labels(
-                method=method,
-                path=path,
-                status=str(status_code),
-            ).inc()
-
-            HTTP_REQUEST_OUTCOMES_TOTAL.labels(
-                method=method,
-                path=path,
-                outcome=outcome,
-            ).inc()
-
-            HTTP_REQUEST_DURATION_SECONDS.labels(
-                method=method,
-                path=path,
-            ).observe(duration)
+    @staticmethod
+    def _log_request(
+        method: str,
+        path: str,
+        status_code: int,
+        duration: float,
+        timings: RequestTimings | None = None,
+    ):
+        extra_fields: dict[str, object] = {
+            "method": method,
+            "path": path,
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 3),
+        }
+        if timings is not None:
+            for phase, seconds in timings.durations.items():
+                extra_fields[f"{phase}_ms"] = round(seconds * 1000, 3)
+                extra_fields[f"{phase}_count"] = timings.counts[phase]
+
+        logger.info("http_request_completed", extra={"extra_fields": extra_fields})
+
+    @staticmethod
+    def _keep_slow_trace(trace: RequestTrace, status_code: int, duration: float):
+        if status_code < 500 and duration * 1000 < settings.SLOW_REQUEST_THRESHOLD_MS:
+            return
+
+        trace.root.finish()
+        trace.root.attributes["status"] = status_code
+        SLOW_REQUESTS.add(trace)
+
+    @staticmethod
+    def _record_metrics(
+        scope: Scope,
+        method: str,
+        status_code: int,
+        duration: float,
+        timings: RequestTimings | None = None,
+    ):
+        path = _route_path(scope)
+
+        HTTP_REQUESTS_TOTAL.labels(
+            method=method,
+            path=path,
+            status=str(status_code),
+        ).inc()
+
+        HTTP_REQUEST_OUTCOMES_TOTAL.labels(
+            method=method,
+            path=path,
+            outcome=_request_outcome(status_code),
+        ).inc()
+
+        HTTP_REQUEST_DURATION_SECONDS.labels(
+            method=method,
+            path=path,
+        ).observe(duration)
+
+        if timings is not None:
+            HTTP_REQUEST_DB_QUERIES.labels(method=method, path=path).observe(
+                count_statements(timings)
+            )
+            HTTP_REQUEST_REDIS_COMMANDS.labels(method=method, path=path).observe(
+                timings.counts.get("redis", 0)
+            )
@@ -0,0 +1,168 @@
+import queue
+import re
+import selectors
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Any
+
+from app.core.settings import settings
+
+# Functions of threads waiting for work rather than doing or awaiting any. Only
+# the innermost frames are checked, up to the first one outside `threading`, so a
+# thread waiting for a database pool slot is not mistaken for an idle one. Code
+# objects are compared, as names lack the class before Python 3.11.
+IDLE_CODE = frozenset(
+    {
+        threading.Event.wait.__code__,
+        queue.Queue.get.__code__,
+        *(
+            getattr(selectors, name).select.__code__
+            for name in (
+                "EpollSelector",
+                "KqueueSelector",
+                "PollSelector",
+                "SelectSelector",
+            )
+            if hasattr(selectors, name)
+        ),
+    }
+)
+
+_THREAD_NUMBER = re.compile(r"[-_]\d+")
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _frame_name(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    code = frame.f_code
+    # co_qualname, with the class name of methods, is new in Python 3.11.
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _is_idle(frame: FrameType | None) -> bool:
+    while frame is not None:
+        if frame.f_code in IDLE_CODE:
+            return True
+        if frame.f_globals.get("__name__") != "threading":
+            return False
+        frame = frame.f_back
+    return False
+
+
+def _thread_names() -> dict[int, str]:
+    # Numbered pool threads are merged, so each pool is one flame graph root.
+    return {
+        thread.ident: _THREAD_NUMBER.sub("", thread.name)
+        for thread in threading.enumerate()
+        if thread.ident is not None
+    }
+
+
+class StackSampler:
+    """
+    Samples the Python stack of every thread of the process at a fixed interval
+    and counts identical stacks, in the collapsed format flame graph tools read:
+    `thread;outermost:frame;...;innermost:frame count`.
+    Only one profile runs at a time per process.
+    """
+
+    _running = threading.Lock()
+
+    def __init__(self, interval: float, include_idle: bool = False) -> None:
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+
+    def run(self, seconds: float) -> Counter[str]:
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusy("a profile is already running")
+        try:
+            own_thread = threading.get_ident()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                self._sample(own_thread)
+                time.sleep(self.interval)
+        finally:
+            self._running.release()
+        return self.stacks
+
+    def _sample(self, own_thread: int) -> None:
+        names = _thread_names()
+        self.samples += 1
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            if not self.include_idle and _is_idle(frame):
+                continue
+            stack = []
+            current: FrameType | None = frame
+            while current is not None:
+                stack.append(_frame_name(current))
+                current = current.f_back
+            stack.append(names.get(thread_id, "thread"))
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+def profile(seconds: float, include_idle: bool = False) -> StackSampler:
+    """
+    Samples all threads for up to PROFILE_MAX_SECONDS, every
+    PROFILE_SAMPLE_INTERVAL_MS, blocking the calling thread meanwhile.
+    """
+    sampler = StackSampler(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000, include_idle)
+    sampler.run(min(seconds, settings.PROFILE_MAX_SECONDS))
+    return sampler
+
+
+class BackgroundProfile:
+    """
+    Runs one profile at a time on its own thread and keeps the result of the
+    last one, for callers that cannot block while it samples.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._started = False
+        self._result: dict[str, Any] | None = None
+
+    def start(self, seconds: float) -> float:
+        """Starts sampling and returns the capped profile length."""
+        seconds = min(seconds, settings.PROFILE_MAX_SECONDS)
+        with self._lock:
+            if self._started and self._result is None:
+                raise ProfilerBusy("a profile is already running")
+            self._started = True
+            self._result = None
+        threading.Thread(
+            target=self._run, args=(seconds,), name="profiler", daemon=True
+        ).start()
+        return seconds
+
+    def _run(self, seconds: float) -> None:
+        try:
+            sampler = profile(seconds)
+        except ProfilerBusy as exc:
+            result: dict[str, Any] = {"error": str(exc)}
+        else:
+            result = {"samples": sampler.samples, "stacks": sampler.collapsed()}
+        with self._lock:
+            self._result = result
+
+    def result(self) -> dict[str, Any]:
+        with self._lock:
+            if not self._started:
+                return {"error": "no profile has been started"}
+            if self._result is None:
+                return {"running": True}
+            return self._result
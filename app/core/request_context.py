@@ -1,3 +1,72 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from contextvars import ContextVar
 
 request_id_ctx: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+
+class RequestTimings:
+    """
+    Time spent by one request per dependency, such as `db` or `redis`.
+    Threadpool calls copy the request context, so they add to the same object.
+    """
+
+    __slots__ = ("started_at", "durations", "counts", "queries")
+
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+        self.durations: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        # Executions per query fingerprint, to spot one query repeated in a loop.
+        self.queries: dict[str, int] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+
+    def breakdown(self) -> dict[str, float]:
+        """
+        Returns milliseconds per phase, `app` for the rest of the elapsed time
+        and `total`.
+        """
+        total = time.perf_counter() - self.started_at
+        phases = dict(self.durations)
+        phases["app"] = max(total - sum(self.durations.values()), 0.0)
+        phases["total"] = total
+        return {phase: round(seconds * 1000, 3) for phase, seconds in phases.items()}
+
+    def server_timing(self) -> str:
+        return ", ".join(
+            f"{phase};dur={duration}" for phase, duration in self.breakdown().items()
+        )
+
+
+request_timings_ctx: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def record_timing(phase: str, seconds: float) -> None:
+    timings = request_timings_ctx.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+
+def record_query(fingerprint: str) -> None:
+    timings = request_timings_ctx.get()
+    if timings is not None:
+        timings.queries[fingerprint] = timings.queries.get(fingerprint, 0) + 1
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    if request_timings_ctx.get() is None:
+        yield
+        return
+
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(phase, time.perf_counter() - started_at)
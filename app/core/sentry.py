@@ -1,9 +1,4 @@
 import sentry_sdk
-from sentry_sdk.integrations.celery import CeleryIntegration
-from sentry_sdk.integrations.fastapi import FastApiIntegration
-from sentry_sdk.integrations.redis import RedisIntegration
-from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
-from sentry_sdk.integrations.starlette import StarletteIntegration
 
 from app.core.settings import settings
 from app.idempotency import idempotency_key_fingerprint
@@ -102,6 +97,15 @@ def init_sentry() -> None:
     if not settings.sentry.dsn:
         return
 
+    # Imported only when Sentry is configured; the Celery integration alone
+    # pulls in Celery. Initialising before the routes are built still lets the
+    # Starlette integration wrap them.
+    from sentry_sdk.integrations.celery import CeleryIntegration
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+    from sentry_sdk.integrations.redis import RedisIntegration
+    from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+    from sentry_sdk.integrations.starlette import StarletteIntegration
+
     sentry_sdk.init(
         dsn=str(settings.sentry.dsn),
         environment=settings.sentry.environment or settings.APP_ENV,
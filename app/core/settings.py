@@ -2,10 +2,26 @@ import json
 import os
 from typing import Annotated, Literal
 
-from pydantic import AnyHttpUrl, Field, field_validator
+from pydantic import AnyHttpUrl, Field, field_validator, model_validator
 from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 Environment = Literal["local", "dev", "test", "staging", "production"]
+DATABASE_URL_PREFIXES = (
+    "postgresql://",
+    "postgresql+psycopg://",
+    "sqlite://",
+    "sqlite+pysqlite://",
+)
+# Warnings logged on every cache call while Redis is down.
+DEFAULT_LOG_RATE_LIMITED_EVENTS = frozenset(
+    {
+        "redis_get_failed",
+        "redis_set_failed",
+        "redis_delete_failed",
+        "redis_exists_failed",
+        "cache_decode_failed",
+    }
+)
 DEFAULT_SENTRY_SENSITIVE_KEYS = frozenset(
     {
         "authorization",
@@ -82,26 +98,98 @@ class Settings(BaseSettings):
     APP_ENV: Environment = "dev"
 
     DATABASE_URL: str
+    DATABASE_REPLICA_URLS: Annotated[list[str], NoDecode] = Field(default_factory=list)
     REDIS_URL: str
     RABBITMQ_URL: str
 
+    DB_POOL_SIZE: int = Field(default=5, ge=1)
+    DB_MAX_OVERFLOW: int = Field(default=10, ge=0)
+    DB_POOL_TIMEOUT_SEC: float = Field(default=30.0, gt=0.0)
+    DB_POOL_RECYCLE_SEC: int = Field(default=1800, ge=-1)
+    DB_POOL_PRE_PING: bool = True
+    DB_NULL_POOL: bool = False
+    DB_PGBOUNCER_MODE: bool = False
+    DB_READ_YOUR_WRITES_SEC: int = Field(default=5, ge=1)
+    DB_QUERY_STATS_MAX_FINGERPRINTS: int = Field(default=1000, ge=1)
+    DB_QUERY_STATS_TOP_K: int = Field(default=20, ge=1)
+    DB_QUERY_STATS_EXPORT_INTERVAL_SEC: float = Field(default=15.0, ge=0.0)
+    DB_SLOW_QUERY_MS: float = Field(default=500.0, ge=0.0)
+    DB_SLOW_QUERY_EXPLAIN: bool = False
+    DB_ROW_LOCK_CONTENDED_MS: float = Field(default=5.0, ge=0.0)
+    DB_ROW_LOCK_SKETCH_SIZE: int = Field(default=200, ge=1)
+    DB_ROW_LOCK_TOP_K: int = Field(default=10, ge=1)
+    DB_ROW_LOCK_EXPORT_INTERVAL_SEC: float = Field(default=15.0, ge=0.0)
+    QUERY_BUDGET_PER_REQUEST: int = Field(default=0, ge=0)
+    QUERY_REPEAT_LIMIT: int = Field(default=0, ge=0)
+    QUERY_BUDGET_ACTION: Literal["log", "raise"] = "log"
+
+    WEB_CONCURRENCY: int = Field(default=1, ge=1)
+    SERVER_MAX_REQUESTS: int = Field(default=0, ge=0)
+    SERVER_MAX_REQUESTS_JITTER: int = Field(default=0, ge=0)
+    SERVER_GRACEFUL_TIMEOUT_SEC: int = Field(default=30, ge=1)
+
     CACHE_ENABLED: bool = False
+    ASYNC_DB_ENABLED: bool = False
     LOG_LEVEL: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "INFO"
+    LOG_QUEUE_SIZE: int = Field(default=10_000, ge=0)
+    LOG_QUEUE_OVERFLOW: Literal["drop", "block"] = "drop"
+    LOG_SAMPLE_RATES: Annotated[dict[str, float], NoDecode] = Field(
+        default_factory=dict
+    )
+    LOG_SAMPLE_SLOW_MS: float = Field(default=1000.0, ge=0.0)
+    LOG_RATE_LIMITED_EVENTS: Annotated[set[str], NoDecode] = Field(
+        default_factory=lambda: set(DEFAULT_LOG_RATE_LIMITED_EVENTS)
+    )
+    LOG_RATE_LIMIT_PER_SEC: float = Field(default=1.0, ge=0.0)
+    LOG_RATE_LIMIT_BURST: int = Field(default=10, ge=1)
+    SERVER_TIMING_ENABLED: bool = True
+    SLOW_REQUEST_THRESHOLD_MS: float = Field(default=1000.0, ge=0.0)
+    SLOW_REQUEST_BUFFER_SIZE: int = Field(default=100, ge=1)
+    SLOW_REQUEST_MAX_SPANS: int = Field(default=500, ge=1)
+    DEBUG_TOKEN: str = ""
+    PROFILE_SAMPLE_INTERVAL_MS: float = Field(default=10.0, gt=0.0)
+    PROFILE_MAX_SECONDS: float = Field(default=60.0, gt=0.0)
 
     NOTIFY_FAIL_RATE: float = Field(default=0.0, ge=0.0, le=1.0)
     NOTIFY_DELAY_SEC: float = Field(default=2.0, ge=0.0)
+    NOTIFY_WEBHOOK_URL: AnyHttpUrl | None = None
+    NOTIFY_CONCURRENCY: int = Field(default=100, ge=1)
+    NOTIFY_TIMEOUT_SEC: float = Field(default=10.0, gt=0.0)
+    NOTIFY_DEDUPE_TTL_SEC: int = Field(default=24 * 3600, ge=1)
+    NOTIFY_DEDUPE_LEASE_SEC: int = Field(default=60, ge=1)
+    NOTIFY_DEAD_LETTER_MAX_SIZE: int = Field(default=100_000, ge=1)
+    NOTIFY_COALESCE_WINDOW_SEC: float = Field(default=0.0, ge=0.0)
+    NOTIFY_COALESCE_FLUSH_INTERVAL_SEC: float = Field(default=1.0, gt=0.0)
+
+    SYSTEM_METRICS_INTERVAL_SEC: float = Field(default=15.0, ge=0.0)
+    SYSTEM_METRICS_EXACT_COUNTS: bool = False
+    SYSTEM_METRICS_ESTIMATE_MIN_ROWS: int = Field(default=100_000, ge=0)
+    SYSTEM_METRICS_LEDGER_RECONCILE_SEC: float = Field(default=3600.0, gt=0.0)
+    SYSTEM_METRICS_LEDGER_OVERLAP_SEC: float = Field(default=300.0, ge=0.0)
+
+    WORKER_METRICS_PORT: int = Field(default=9808, ge=0, le=65535)
+
+    WEBHOOK_ENDPOINT_CONCURRENCY: int = Field(default=10, ge=1)
+    WEBHOOK_BATCH_MAX_SIZE: int = Field(default=50, ge=1)
+    WEBHOOK_MAX_CONNECTIONS_PER_HOST: int = Field(default=20, ge=1)
+    WEBHOOK_CIRCUIT_FAILURE_THRESHOLD: int = Field(default=5, ge=1)
+    WEBHOOK_CIRCUIT_RESET_SEC: float = Field(default=30.0, gt=0.0)
+    WEBHOOK_REGISTRY_TTL_SEC: float = Field(default=30.0, ge=0.0)
+    WEBHOOK_ADMIN_TOKEN: str = ""
+    WEBHOOK_MAX_CLIENTS: int = Field(default=256, ge=1)
+    WEBHOOK_ALLOW_PRIVATE_ADDRESSES: bool = False
+
+    @field_validator("NOTIFY_WEBHOOK_URL", mode="before")
+    @classmethod
+    def empty_webhook_url_as_none(cls, value):
+        if value == "":
+            return None
+        return value
 
     @field_validator("DATABASE_URL")
     @classmethod
     def validate_database_url(cls, value: str) -> str:
-        allowed_prefixes = (
-            "postgresql://",
-            "postgresql+psycopg://",
-            "sqlite://",
-            "sqlite+pysqlite://",
-        )
-
-        if not value.startswith(allowed_prefixes):
+        if not value.startswith(DATABASE_URL_PREFIXES):
             raise ValueError(
                 "DATABASE_URL must start with postgresql://, postgresql+psycopg://, "
                 "sqlite:// or sqlite+pysqlite://"
@@ -109,6 +197,67 @@ class Settings(BaseSettings):
 
         return value
 
+    @field_validator("DATABASE_REPLICA_URLS", mode="before")
+    @classmethod
+    def parse_replica_urls(cls, value):
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [url.strip() for url in value.split(",") if url.strip()]
+        return value
+
+    @field_validator("DATABASE_REPLICA_URLS")
+    @classmethod
+    def validate_replica_urls(cls, value: list[str]) -> list[str]:
+        for url in value:
+            if not url.startswith(DATABASE_URL_PREFIXES):
+                raise ValueError(
+                    "DATABASE_REPLICA_URLS must start with postgresql://, "
+                    "postgresql+psycopg://, sqlite:// or sqlite+pysqlite://"
+                )
+
+        return value
+
+    @field_validator("LOG_SAMPLE_RATES", mode="before")
+    @classmethod
+    def parse_log_sample_rates(cls, value):
+        if value is None:
+            return {}
+        if isinstance(value, str):
+            rates = {}
+            for item in value.split(","):
+                if not item.strip():
+                    continue
+                event, separator, rate = item.partition("=")
+                if not separator:
+                    raise ValueError(
+                        "LOG_SAMPLE_RATES must be a comma-separated list of "
+                        "event=rate pairs"
+                    )
+                rates[event.strip()] = rate.strip()
+            return rates
+        return value
+
+    @field_validator("LOG_RATE_LIMITED_EVENTS", mode="before")
+    @classmethod
+    def parse_log_rate_limited_events(cls, value):
+        if value is None:
+            return set()
+        if isinstance(value, str):
+            return {event.strip() for event in value.split(",") if event.strip()}
+        return value
+
+    @field_validator("LOG_SAMPLE_RATES")
+    @classmethod
+    def validate_log_sample_rates(cls, value: dict[str, float]) -> dict[str, float]:
+        for event, rate in value.items():
+            if not 0.0 <= rate <= 1.0:
+                raise ValueError(
+                    f"LOG_SAMPLE_RATES rate for {event} must be between 0 and 1"
+                )
+
+        return value
+
     @field_validator("REDIS_URL")
     @classmethod
     def validate_redis_url(cls, value: str) -> str:
@@ -133,5 +282,15 @@ class Settings(BaseSettings):
 
     sentry: SentrySettings = Field(default_factory=SentrySettings)
 
+    @model_validator(mode="after")
+    def validate_notify_dedupe_lease(self) -> "Settings":
+        # A lease ending mid-delivery lets another worker deliver the same event.
+        if self.NOTIFY_DEDUPE_LEASE_SEC <= self.NOTIFY_TIMEOUT_SEC:
+            raise ValueError(
+                "NOTIFY_DEDUPE_LEASE_SEC must be longer than NOTIFY_TIMEOUT_SEC"
+            )
+
+        return self
+
 
 settings = Settings()  # type: ignore[call-arg]
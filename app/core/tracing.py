@@ -0,0 +1,190 @@
+import functools
+import inspect
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, TypeVar
+
+from app.core.settings import settings
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Span:
+    """One timed operation of a request; children are the operations inside it."""
+
+    __slots__ = (
+        "name",
+        "attributes",
+        "started_at",
+        "duration",
+        "error",
+        "children",
+        "trace",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace: "RequestTrace",
+        attributes: dict[str, Any] | None = None,
+        started_at: float | None = None,
+    ) -> None:
+        self.name = name
+        self.trace = trace
+        self.attributes = attributes or {}
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.duration: float | None = None
+        self.error: str | None = None
+        self.children: list[Span] = []
+
+    def child(
+        self,
+        name: str,
+        attributes: dict[str, Any] | None = None,
+        started_at: float | None = None,
+    ) -> "Span | None":
+        if not self.trace.reserve_span():
+            return None
+        span = Span(name, self.trace, attributes, started_at)
+        self.children.append(span)
+        return span
+
+    def finish(self, error: str | None = None) -> None:
+        self.duration = time.perf_counter() - self.started_at
+        self.error = error
+
+    def to_dict(self, origin: float) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "name": self.name,
+            "start_ms": round((self.started_at - origin) * 1000, 3),
+            "duration_ms": (
+                None if self.duration is None else round(self.duration * 1000, 3)
+            ),
+        }
+        if self.attributes:
+            data["attributes"] = self.attributes
+        if self.error is not None:
+            data["error"] = self.error
+        if self.children:
+            data["children"] = [child.to_dict(origin) for child in self.children]
+        return data
+
+
+class RequestTrace:
+    """
+    Span tree of one request, capped at max_spans so a request issuing
+    thousands of statements cannot grow it without bound.
+    """
+
+    def __init__(self, name: str, attributes: dict[str, Any], max_spans: int):
+        self.max_spans = max_spans
+        self.span_count = 1
+        self.dropped_spans = 0
+        self.timestamp = datetime.now(timezone.utc)
+        self.root = Span(name, self, attributes)
+
+    def reserve_span(self) -> bool:
+        if self.span_count >= self.max_spans:
+            self.dropped_spans += 1
+            return False
+        self.span_count += 1
+        return True
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "timestamp": self.timestamp.isoformat(),
+            "dropped_spans": self.dropped_spans,
+            "root": self.root.to_dict(self.root.started_at),
+        }
+
+
+current_span_ctx: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """Records the block as a child of the current span, if a request is traced."""
+    parent = current_span_ctx.get()
+    child = parent.child(name, attributes) if parent is not None else None
+    if child is None:
+        yield None
+        return
+
+    token = current_span_ctx.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.finish(error=type(exc).__name__)
+        raise
+    else:
+        child.finish()
+    finally:
+        current_span_ctx.reset(token)
+
+
+def record_span(name: str, duration: float, **attributes: Any) -> None:
+    """Adds an already finished operation that ended now, such as a SQL statement."""
+    parent = current_span_ctx.get()
+    if parent is None:
+        return
+
+    now = time.perf_counter()
+    child = parent.child(name, attributes, started_at=now - duration)
+    if child is not None:
+        child.duration = duration
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator recording each call of a sync or async function as a span."""
+
+    def decorator(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class SlowRequestLog:
+    """
+    Ring buffer of the span trees of the most recent slow or failed requests.
+    Each API worker process keeps its own.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._traces: deque[dict[str, Any]] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, trace: RequestTrace) -> None:
+        data = trace.to_dict()
+        with self._lock:
+            self._traces.append(data)
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """Returns the stored traces, newest first."""
+        with self._lock:
+            return list(reversed(self._traces))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+
+SLOW_REQUESTS = SlowRequestLog(settings.SLOW_REQUEST_BUFFER_SIZE)
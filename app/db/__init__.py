@@ -1,4 +1,13 @@
-from .models import Base, Transaction, User, Wallet
+from .models import Base, Transaction, User, Wallet, WebhookEndpoint
 from .session import SessionLocal, engine, get_db
 
-__all__ = ["engine", "SessionLocal", "get_db", "Base", "User", "Wallet", "Transaction"]
+__all__ = [
+    "engine",
+    "SessionLocal",
+    "get_db",
+    "Base",
+    "User",
+    "Wallet",
+    "Transaction",
+    "WebhookEndpoint",
+]
@@ -0,0 +1,83 @@
+import itertools
+from collections.abc import AsyncGenerator
+from functools import lru_cache
+
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core.metrics.db.instrumentation import instrument_engine
+from app.core.settings import settings
+from app.db.session import engine_options
+
+ASYNC_DRIVERS = {
+    "postgresql://": "postgresql+psycopg://",
+    "postgresql+psycopg://": "postgresql+psycopg://",
+    "sqlite://": "sqlite+aiosqlite://",
+    "sqlite+pysqlite://": "sqlite+aiosqlite://",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Rewrites DATABASE_URL to the asyncio driver of the same database."""
+    for prefix, async_prefix in ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix) :]
+    return url
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    # Created lazily so processes that never serve async routes, such as
+    # Celery workers, do not import the asyncio drivers.
+    url = async_database_url(settings.DATABASE_URL)
+    engine = create_async_engine(url, **engine_options(url, is_async=True))
+    instrument_engine(engine.sync_engine, "async")
+    return engine
+
+
+@lru_cache(maxsize=1)
+def get_async_replica_engines() -> tuple[AsyncEngine, ...]:
+    engines = []
+    for index, replica_url in enumerate(settings.DATABASE_REPLICA_URLS):
+        url = async_database_url(replica_url)
+        replica = create_async_engine(url, **engine_options(url, is_async=True))
+        instrument_engine(replica.sync_engine, f"async-replica-{index}")
+        engines.append(replica)
+    return tuple(engines)
+
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind=get_async_engine(),
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+_next_async_replica = itertools.count()
+
+
+@lru_cache(maxsize=1)
+def get_async_replica_sessionmakers() -> tuple[async_sessionmaker[AsyncSession], ...]:
+    return tuple(
+        async_sessionmaker(bind=replica, autoflush=False, expire_on_commit=False)
+        for replica in get_async_replica_engines()
+    )
+
+
+def async_replica_session() -> AsyncSession:
+    """asyncio counterpart of replica_session."""
+    makers = get_async_replica_sessionmakers()
+    if not makers:
+        return get_async_sessionmaker()()
+    return makers[next(_next_async_replica) % len(makers)]()
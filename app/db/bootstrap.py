@@ -0,0 +1,37 @@
+"""Creates missing tables before the first deploy of a release.
+
+The API no longer creates the schema on import, so a pod start does not issue DDL
+introspection against the primary. Run once per deploy, from the app image:
+    python -m app.db.bootstrap
+
+Existing tables are left as they are; apply the SQL files in app/db/migrations
+for changes to them.
+"""
+
+import logging
+
+from sqlalchemy.engine import Engine
+
+from app.db.models import Base
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+def bootstrap_schema(bind: Engine = engine) -> None:
+    Base.metadata.create_all(bind=bind)
+    logger.info(
+        "database_schema_bootstrapped",
+        extra={"extra_fields": {"tables": sorted(Base.metadata.tables)}},
+    )
+
+
+def main() -> None:
+    from app.core.logging import setup_logging
+
+    setup_logging()
+    bootstrap_schema()
+
+
+if __name__ == "__main__":
+    main()
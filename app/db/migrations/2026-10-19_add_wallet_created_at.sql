@@ -0,0 +1,5 @@
+-- Creation time of wallets, used to find new wallets for the ledger balance gauge.
+-- Existing wallets get the time of the migration. PostgreSQL syntax.
+ALTER TABLE wallets
+    ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now();
+CREATE INDEX IF NOT EXISTS ix_wallets_created_at ON wallets (created_at);
@@ -0,0 +1,6 @@
+-- Balance each wallet was created with, which the ledger balance gauge adds for
+-- new wallets. Existing wallets get the 100.00 every wallet is opened with.
+-- PostgreSQL syntax.
+ALTER TABLE wallets
+    ADD COLUMN IF NOT EXISTS opening_balance NUMERIC(12, 2) NOT NULL DEFAULT 0;
+UPDATE wallets SET opening_balance = 100.00;
@@ -0,0 +1,8 @@
+-- Per-user webhook endpoints for transfer notifications.
+-- PostgreSQL syntax.
+CREATE TABLE IF NOT EXISTS webhook_endpoints (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES users (id),
+    url VARCHAR(2048) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+);
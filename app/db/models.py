@@ -1,7 +1,15 @@
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import CheckConstraint, DateTime, ForeignKey, Integer, Numeric, func
+from sqlalchemy import (
+    CheckConstraint,
+    DateTime,
+    ForeignKey,
+    Integer,
+    Numeric,
+    String,
+    func,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -20,6 +28,10 @@ class User(Base):
     wallet: Mapped["Wallet"] = relationship(uselist=False, back_populates="user")
 
 
+def _opening_balance(context) -> Decimal:
+    return context.get_current_parameters().get("balance") or Decimal("0")
+
+
 class Wallet(Base):
     __tablename__ = "wallets"
 
@@ -27,6 +39,13 @@ class Wallet(Base):
     balance: Mapped[Decimal] = mapped_column(
         Numeric(12, 2), server_default="0", nullable=False
     )
+    # Balance the wallet was created with, which is what it added to the ledger.
+    opening_balance: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), default=_opening_balance, server_default="0", nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
     user_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("users.id"), unique=True, nullable=False
     )
@@ -69,3 +88,16 @@ class Transaction(Base):
     to_wallet: Mapped["Wallet"] = relationship(
         foreign_keys=[to_wallet_id], back_populates="incoming_transactions"
     )
+
+
+class WebhookEndpoint(Base):
+    __tablename__ = "webhook_endpoints"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, nullable=False)
+    user_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("users.id"), unique=True, nullable=False
+    )
+    url: Mapped[str] = mapped_column(String(2048), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
@@ -0,0 +1,35 @@
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+
+CHECKOUT_WAIT_KEY = "checkout_wait_sec"
+CONNECT_TIME_KEY = "connect_sec"
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that stores how long each checkout waited for a free slot in the
+    connection record's `info`, where the pool `checkout` event can read it.
+    A checkout that opens an overflow connection stores the time spent
+    connecting separately, so a slow database login is not read as pool
+    exhaustion.
+    """
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started_at = time.perf_counter()
+        record = super()._do_get()
+        elapsed = time.perf_counter() - started_at
+        record.info[CHECKOUT_WAIT_KEY] = max(
+            elapsed - record.info.get(CONNECT_TIME_KEY, 0.0), 0.0
+        )
+        return record
+
+    def _create_connection(self) -> ConnectionPoolEntry:
+        started_at = time.perf_counter()
+        record = super()._create_connection()
+        record.info[CONNECT_TIME_KEY] = time.perf_counter() - started_at
+        return record
+
+
+class TimedAsyncQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool counterpart of TimedQueuePool."""
@@ -1,14 +1,82 @@
+import itertools
+from typing import Any
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.settings import Settings, settings
+from app.db.pool import TimedAsyncQueuePool, TimedQueuePool
+
+
+def engine_options(
+    database_url: str,
+    config: Settings = settings,
+    is_async: bool = False,
+) -> dict[str, Any]:
+    """
+    Connection pool options for create_engine and create_async_engine.
+    Pool sizing is skipped for SQLite, whose pools take no overflow or timeout.
+    """
+    if database_url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+
+    options: dict[str, Any] = {"pool_pre_ping": config.DB_POOL_PRE_PING}
+    if config.DB_PGBOUNCER_MODE:
+        # PgBouncer in transaction mode hands each transaction to any server
+        # connection, so server-side prepared statements cannot be reused.
+        options["connect_args"] = {"prepare_threshold": None}
+
+    if config.DB_NULL_POOL:
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT_SEC,
+            pool_recycle=config.DB_POOL_RECYCLE_SEC,
+        )
+    return options
+
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+# Like the async sessions, objects stay loaded after commit, so post-commit code
+# such as transfer side effects and responses does not reload them.
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine,
+)
+
+replica_engines = [
+    create_engine(url, **engine_options(url)) for url in settings.DATABASE_REPLICA_URLS
+]
+_replica_sessionmakers = [
+    sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        bind=replica,
+    )
+    for replica in replica_engines
+]
+_next_replica = itertools.cycle(_replica_sessionmakers)
+
 
-from app.core.settings import settings
+def has_replicas() -> bool:
+    return bool(_replica_sessionmakers)
 
-engine_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
-    engine_args["connect_args"] = {"check_same_thread": False}
 
-engine = create_engine(settings.DATABASE_URL, **engine_args)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def replica_session() -> Session:
+    """
+    Opens a read-only session on the next replica in round-robin order.
+    Falls back to the primary when no replica is configured.
+    """
+    if not _replica_sessionmakers:
+        return SessionLocal()
+    return next(_next_replica)()
 
 
 def _query_operation(statement: str) -> str:
@@ -1,8 +1,9 @@
 import logging
-from collections.abc import Callable, Generator
-from contextlib import contextmanager
+from collections.abc import AsyncGenerator, Callable, Generator
+from contextlib import asynccontextmanager, contextmanager
 from typing import Any
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -11,15 +12,37 @@ PostCommitHook = tuple[Callable[..., Any], tuple[Any, ...], dict[str, Any]]
 POST_COMMIT_HOOKS_KEY = "post_commit_hooks"
 
 
-def _post_commit_hooks(db: Session) -> list[PostCommitHook]:
+def _post_commit_hooks(db: Session | AsyncSession) -> list[PostCommitHook]:
     hooks = db.info.setdefault(POST_COMMIT_HOOKS_KEY, [])
     return hooks
 
 
-def on_commit(db: Session, func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+def _run_post_commit_hooks(db: Session | AsyncSession) -> None:
+    hooks = _post_commit_hooks(db)
+    db.info[POST_COMMIT_HOOKS_KEY] = []
+    for f, a, k in hooks:
+        try:
+            f(*a, **k)
+        except Exception:
+            logger.exception(
+                "post_commit_hook_failed",
+                extra={
+                    "extra_fields": {
+                        "hook_name": getattr(f, "__name__", str(f)),
+                    }
+                },
+            )
+
+
+def on_commit(
+    db: Session | AsyncSession,
+    func: Callable[..., Any],
+    *args: Any,
+    **kwargs: Any,
+) -> None:
     """
     Registers a function to be called after the current top-level transaction commits.
-    Expects to be called within a transaction_scope.
+    Expects to be called within a transaction_scope or async_transaction_scope.
     """
     _post_commit_hooks(db).append((func, args, kwargs))
 
@@ -42,21 +65,29 @@ def transaction_scope(db: Session) -> Generator[None, None, None]:
                 yield
 
             # If we reached here, the top-level transaction has successfully committed.
-            hooks = _post_commit_hooks(db)
-            db.info[POST_COMMIT_HOOKS_KEY] = []
-            for f, a, k in hooks:
-                try:
-                    f(*a, **k)
-                except Exception:
-                    logger.exception(
-                        "post_commit_hook_failed",
-                        extra={
-                            "extra_fields": {
-                                "hook_name": getattr(f, "__name__", str(f)),
-                            }
-                        },
-                    )
+            _run_post_commit_hooks(db)
         except Exception:
             # Clear hooks on failure to prevent leakage to next transaction
             db.info[POST_COMMIT_HOOKS_KEY] = []
             raise
+
+
+@asynccontextmanager
+async def async_transaction_scope(db: AsyncSession) -> AsyncGenerator[None, None]:
+    """
+    Async counterpart of transaction_scope with the same SAVEPOINT and
+    post-commit hook semantics.
+    """
+    if db.in_transaction():
+        async with db.begin_nested():
+            yield
+    else:
+        db.info[POST_COMMIT_HOOKS_KEY] = []
+        try:
+            async with db.begin():
+                yield
+
+            _run_post_commit_hooks(db)
+        except Exception:
+            db.info[POST_COMMIT_HOOKS_KEY] = []
+            raise
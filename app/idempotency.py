@@ -1,18 +1,48 @@
 import hashlib
 import json
 import logging
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 from functools import lru_cache
 from typing import Optional
 
 from redis import Redis, RedisError
+from redis.asyncio import Redis as AsyncRedis
 
+from app.cache import TimedAsyncRedis, TimedRedis
 from app.core.settings import settings
 from app.services.exceptions import IdempotencyKeyConflict, RequestInProgress
 
 logger = logging.getLogger(__name__)
 
 
+def _raise_for_existing(existing_hash, payload_hash: str) -> None:
+    if isinstance(existing_hash, bytes):
+        existing_hash = existing_hash.decode("utf-8")
+
+    if existing_hash and existing_hash != payload_hash:
+        raise IdempotencyKeyConflict()
+
+    # Key exists and hash matches -> Request is already being processed or finished
+    raise RequestInProgress()
+
+
+def _log_redis_failure(
+    operation: str,
+    key: str,
+    event: str = "idempotency_redis_operation_failed",
+) -> None:
+    logger.warning(
+        event,
+        extra={
+            "extra_fields": {
+                "operation": operation,
+                "key_fingerprint": idempotency_key_fingerprint(key),
+            }
+        },
+        exc_info=True,
+    )
+
+
 class IdempotencyManager:
     """
     Handles idempotency.
@@ -42,26 +72,9 @@ class IdempotencyManager:
             success = self._client.set(redis_key, payload_hash, ex=self._ttl, nx=True)
 
             if not success:
-                existing_hash = self._client.get(redis_key)
-                if isinstance(existing_hash, bytes):
-                    existing_hash = existing_hash.decode("utf-8")
-
-                if existing_hash and existing_hash != payload_hash:
-                    raise IdempotencyKeyConflict()
-
-                # Key exists and hash matches -> Request is already being processed or finished
-                raise RequestInProgress()
+                _raise_for_existing(self._client.get(redis_key), payload_hash)
         except RedisError:
-            logger.warning(
-                "idempotency_redis_operation_failed",
-                extra={
-                    "extra_fields": {
-                        "operation": "check_and_reserve",
-                        "key_fingerprint": idempotency_key_fingerprint(key),
-                    }
-                },
-                exc_info=True,
-            )
+            _log_redis_failure("check_and_reserve", key)
             # On storage error, we fail closed to prevent accidental double-processing
             raise RequestInProgress() from None
 
@@ -72,15 +85,8 @@ class IdempotencyManager:
         try:
             self._client.delete(self._get_key(key))
         except RedisError:
-            logger.warning(
-                "idempotency_reservation_cleanup_failed",
-                extra={
-                    "extra_fields": {
-                        "operation": "remove_reservation",
-                        "key_fingerprint": idempotency_key_fingerprint(key),
-                    }
-                },
-                exc_info=True,
+            _log_redis_failure(
+                "remove_reservation", key, "idempotency_reservation_cleanup_failed"
             )
 
     @contextmanager
@@ -103,7 +109,7 @@ def get_idempotency_manager() -> IdempotencyManager:
     try:
         # We use a separate connection or the same URL,
         # but encapsulated in its own manager
-        client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        client = TimedRedis.from_url(settings.REDIS_URL, decode_responses=True)
         return IdempotencyManager(client)
     except (RedisError, ValueError):
         logger.warning(
@@ -114,6 +120,67 @@ def get_idempotency_manager() -> IdempotencyManager:
         return IdempotencyManager(None)
 
 
+class AsyncIdempotencyManager:
+    """asyncio counterpart of IdempotencyManager for async routes."""
+
+    def __init__(self, client: Optional[AsyncRedis]):
+        self._client = client
+        self._ttl = 24 * 3600  # 24 hours default
+
+    def _get_key(self, key: str) -> str:
+        return f"idem:{key}"
+
+    async def check_and_reserve(self, key: str, payload_hash: str) -> None:
+        if not self._client:
+            raise RequestInProgress()
+
+        redis_key = self._get_key(key)
+        try:
+            success = await self._client.set(
+                redis_key, payload_hash, ex=self._ttl, nx=True
+            )
+            if not success:
+                _raise_for_existing(await self._client.get(redis_key), payload_hash)
+        except RedisError:
+            _log_redis_failure("check_and_reserve", key)
+            raise RequestInProgress() from None
+
+    async def remove_reservation(self, key: str) -> None:
+        if not self._client:
+            return
+        try:
+            await self._client.delete(self._get_key(key))
+        except RedisError:
+            _log_redis_failure(
+                "remove_reservation", key, "idempotency_reservation_cleanup_failed"
+            )
+
+    @asynccontextmanager
+    async def reserve(self, key: str, payload_hash: str):
+        await self.check_and_reserve(key, payload_hash)
+        try:
+            yield
+        except Exception:
+            await self.remove_reservation(key)
+            raise
+
+
+@lru_cache(maxsize=1)
+def get_async_idempotency_manager() -> AsyncIdempotencyManager:
+    if not settings.CACHE_ENABLED:
+        return AsyncIdempotencyManager(None)
+    try:
+        client = TimedAsyncRedis.from_url(settings.REDIS_URL, decode_responses=True)
+        return AsyncIdempotencyManager(client)
+    except (RedisError, ValueError):
+        logger.warning(
+            "idempotency_redis_init_failed",
+            extra={"extra_fields": {"operation": "initialize"}},
+            exc_info=True,
+        )
+        return AsyncIdempotencyManager(None)
+
+
 def hash_payload(data: dict) -> str:
     """Stable JSON hashing of a dictionary."""
     serialized = json.dumps(data, sort_keys=True)
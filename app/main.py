@@ -9,22 +9,30 @@ from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
-from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client import CONTENT_TYPE_LATEST
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.api.routes import router
 from app.core.logging import setup_logging
-from app.core.metrics import HTTP_EXCEPTIONS_TOTAL, refresh_system_metrics
-from app.core.middleware import (
-    MetricsMiddleware,
-    RequestIDMiddleware,
-    RequestLoggingMiddleware,
-    SentryMiddleware,
+from app.core.metrics import (
+    HTTP_EXCEPTIONS_TOTAL,
+    PeriodicTask,
+    SystemMetricsCollector,
 )
+from app.core.metrics.db.instrumentation import instrument_engine
+from app.core.metrics.db.locks import publish_row_lock_stats
+from app.core.metrics.db.queries import publish_query_stats
+from app.core.metrics.multiprocess import (
+    mark_worker_exited,
+    multiprocess_dir,
+    render_metrics,
+)
+from app.core.middleware import RequestInstrumentationMiddleware
 from app.core.request_context import request_id_ctx
 from app.core.sentry import init_sentry
-from app.db.models import Base
-from app.db.session import engine
+from app.core.settings import settings
+from app.db.async_session import get_async_engine, get_async_replica_engines
+from app.db.session import engine, replica_engines
 from app.services.exceptions import (
     BadRequest,
     Conflict,
@@ -34,6 +42,9 @@ from app.services.exceptions import (
 
 setup_logging()
 init_sentry()
+instrument_engine(engine, "sync")
+for index, replica_engine in enumerate(replica_engines):
+    instrument_engine(replica_engine, f"replica-{index}")
 logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).resolve().parent.parent
 STATIC_DIR = BASE_DIR / "static"
@@ -42,15 +53,43 @@ STATIC_DIR = BASE_DIR / "static"
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("application_startup")
+    tasks: list[PeriodicTask] = []
+    if settings.SYSTEM_METRICS_INTERVAL_SEC > 0:
+        tasks.append(SystemMetricsCollector(settings.SYSTEM_METRICS_INTERVAL_SEC))
+    # A single process ranks its own stats at scrape time; workers of a
+    # multiprocess server publish theirs for the one serving the scrape.
+    publish = multiprocess_dir() is not None
+    if publish and settings.DB_QUERY_STATS_EXPORT_INTERVAL_SEC > 0:
+        tasks.append(
+            PeriodicTask(
+                "query-stats",
+                settings.DB_QUERY_STATS_EXPORT_INTERVAL_SEC,
+                publish_query_stats,
+            )
+        )
+    if publish and settings.DB_ROW_LOCK_EXPORT_INTERVAL_SEC > 0:
+        tasks.append(
+            PeriodicTask(
+                "row-lock-stats",
+                settings.DB_ROW_LOCK_EXPORT_INTERVAL_SEC,
+                publish_row_lock_stats,
+            )
+        )
+    for task in tasks:
+        task.start()
     yield
+    for task in tasks:
+        task.stop()
+    if settings.ASYNC_DB_ENABLED:
+        await get_async_engine().dispose()
+        for replica_engine in get_async_replica_engines():
+            await replica_engine.dispose()
+    mark_worker_exited()
     logger.info("application_shutdown")
 
 
 app = FastAPI(title="Transfer System API", lifespan=lifespan)
-app.add_middleware(MetricsMiddleware)
-app.add_middleware(SentryMiddleware)
-app.add_middleware(RequestLoggingMiddleware)
-app.add_middleware(RequestIDMiddleware)
+app.add_middleware(RequestInstrumentationMiddleware)
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 
@@ -142,8 +181,6 @@ async def service_exception_handler(request: Request, exc: ServiceError):
     return _error_response(request, _service_error_status(exc), exc)
 
 
-Base.metadata.create_all(bind=engine)
-
 app.include_router(router)
 
 
@@ -173,9 +210,8 @@ def transfers_frontend():
 
 @app.get("/metrics")
 def metrics() -> Response:
-    refresh_system_metrics()
     return Response(
-        content=generate_latest(),
+        content=render_metrics(),
         media_type=CONTENT_TYPE_LATEST,
     )
 
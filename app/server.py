@@ -0,0 +1,307 @@
+"""Production entry point: preforked uvicorn workers sharing one socket.
+
+The master imports ``app.main`` and the Celery client used to enqueue
+notifications once, freezes everything it imported out of the garbage collector,
+and forks the workers, so Celery, Sentry, SQLAlchemy and the application code stay
+shared copy-on-write instead of being imported per worker.
+
+    python -m app.server --workers 4
+    kill -HUP <master pid>    # replace the workers one by one
+
+Workers use uvloop and httptools when installed and can be recycled after a
+number of requests to bound slow memory growth.
+"""
+
+import argparse
+import gc
+import importlib
+import logging
+import os
+import random
+import signal
+import socket
+import time
+from pathlib import Path
+from types import FrameType
+
+import uvicorn
+
+logger = logging.getLogger("app.server")
+
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+# Imported lazily by app.main, so that other entry points start without Celery.
+PRELOADED_MODULES = ("app.tasks.transfer_notifications",)
+FORCED_SHUTDOWN_GRACE_SEC = 5.0
+# A worker exiting sooner than this after it started is counted as a crash. Its
+# replacement is delayed exponentially, and the master gives up after
+# MAX_EARLY_EXITS in a row instead of forking a broken worker forever.
+EARLY_EXIT_SEC = 10.0
+RESPAWN_BACKOFF_SEC = 0.5
+RESPAWN_BACKOFF_MAX_SEC = 30.0
+MAX_EARLY_EXITS = 5
+
+
+def _prepare_multiprocess_dir() -> None:
+    # Metric files of a previous run would be merged into the new one.
+    directory = os.environ.get(MULTIPROC_DIR_ENV)
+    if not directory:
+        return
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    for pattern in ("*.db", "*.json"):
+        for stale in path.glob(pattern):
+            stale.unlink()
+
+
+def _reset_after_fork() -> None:
+    """Drops pooled connections inherited from the master without closing them."""
+    from app.db.session import engine, replica_engines
+
+    for inherited in (engine, *replica_engines):
+        inherited.dispose(close=False)
+
+
+def _run_worker(app, sock: socket.socket, config_kwargs: dict) -> None:
+    gc.enable()
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD):
+        signal.signal(signum, signal.SIG_DFL)
+    _reset_after_fork()
+
+    config = uvicorn.Config(app, loop="auto", http="auto", **config_kwargs)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Master:
+    """
+    Forks the workers and replaces any that exit until it is stopped. Workers
+    that keep crashing right after they start are replaced with a growing delay,
+    and the master exits with status 1 after MAX_EARLY_EXITS of them in a row.
+    """
+
+    def __init__(
+        self,
+        app,
+        sock: socket.socket,
+        workers: int,
+        max_requests: int,
+        max_requests_jitter: int,
+        graceful_timeout: int,
+    ):
+        self._app = app
+        self._sock = sock
+        self._workers = workers
+        self._max_requests = max_requests
+        self._max_requests_jitter = max_requests_jitter
+        self._graceful_timeout = graceful_timeout
+        self._children: set[int] = set()
+        self._retiring: set[int] = set()
+        self._started_at: dict[int, float] = {}
+        self._respawn_at: list[float] = []
+        self._early_exits = 0
+        self._last_respawn_at = 0.0
+        self._stopping = False
+        self._reloading = False
+        self._failed = False
+
+    def _request_limit(self) -> int | None:
+        if not self._max_requests:
+            return None
+        # Jitter keeps the workers from recycling at the same moment; it needs
+        # no cryptographic randomness.
+        jitter = random.randint(0, self._max_requests_jitter)  # nosec B311
+        return self._max_requests + jitter
+
+    def spawn(self) -> int:
+        config_kwargs = {
+            "limit_max_requests": self._request_limit(),
+            "timeout_graceful_shutdown": self._graceful_timeout,
+        }
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                _run_worker(self._app, self._sock, config_kwargs)
+            except BaseException:
+                logger.exception("server_worker_failed")
+                exit_code = 1
+            finally:
+                from app.core.logging import shutdown_logging
+
+                # os._exit skips atexit, which would flush the queued records.
+                shutdown_logging()
+                os._exit(exit_code)
+
+        self._children.add(pid)
+        self._started_at[pid] = time.monotonic()
+        logger.info("server_worker_started", extra={"extra_fields": {"pid": pid}})
+        return pid
+
+    def _handle_stop(self, _signum: int, _frame: FrameType | None) -> None:
+        self._stopping = True
+
+    def _handle_reload(self, _signum: int, _frame: FrameType | None) -> None:
+        self._reloading = True
+
+    def _reap(self) -> None:
+        from app.core.metrics.multiprocess import mark_worker_exited
+
+        while self._children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            self._children.discard(pid)
+            mark_worker_exited(pid)
+            retired = pid in self._retiring
+            self._retiring.discard(pid)
+            lifetime = time.monotonic() - self._started_at.pop(pid, 0.0)
+            logger.info(
+                "server_worker_exited",
+                extra={
+                    "extra_fields": {
+                        "pid": pid,
+                        "exit_code": os.waitstatus_to_exitcode(status),
+                        "retired": retired,
+                    }
+                },
+            )
+            if not self._stopping and not retired:
+                self._schedule_respawn(lifetime)
+
+    def _schedule_respawn(self, lifetime: float) -> None:
+        now = time.monotonic()
+        if lifetime >= EARLY_EXIT_SEC:
+            self._early_exits = 0
+            self._respawn_at.append(now)
+            return
+
+        self._early_exits += 1
+        if self._early_exits >= MAX_EARLY_EXITS:
+            logger.error(
+                "server_workers_crashing",
+                extra={"extra_fields": {"early_exits": self._early_exits}},
+            )
+            self._failed = True
+            self._stopping = True
+            return
+
+        delay = min(
+            RESPAWN_BACKOFF_SEC * 2 ** (self._early_exits - 1), RESPAWN_BACKOFF_MAX_SEC
+        )
+        self._respawn_at.append(now + delay)
+
+    def _respawn_due(self) -> None:
+        now = time.monotonic()
+        due = [at for at in self._respawn_at if at <= now]
+        self._respawn_at = [at for at in self._respawn_at if at > now]
+        for _ in due:
+            self.spawn()
+            self._last_respawn_at = now
+        # The last replacement has outlived the crash window.
+        if (
+            self._early_exits
+            and not self._respawn_at
+            and now - self._last_respawn_at >= EARLY_EXIT_SEC
+        ):
+            self._early_exits = 0
+
+    def _reload(self) -> None:
+        self._reloading = False
+        for pid in self._children - self._retiring:
+            # The replacement accepts on the shared socket while the old worker
+            # finishes its in-flight requests.
+            self.spawn()
+            self._retiring.add(pid)
+            os.kill(pid, signal.SIGTERM)
+
+    def _shutdown(self) -> None:
+        for pid in self._children:
+            os.kill(pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self._graceful_timeout + FORCED_SHUTDOWN_GRACE_SEC
+        while self._children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+
+        for pid in self._children:
+            os.kill(pid, signal.SIGKILL)
+        while self._children:
+            pid, _status = os.waitpid(-1, 0)
+            self._children.discard(pid)
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        for _ in range(self._workers):
+            self.spawn()
+
+        while not self._stopping:
+            if self._reloading:
+                self._reload()
+            self._reap()
+            self._respawn_due()
+            time.sleep(0.1)
+
+        logger.info("server_shutdown")
+        self._shutdown()
+        if self._failed:
+            raise SystemExit(1)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Run the API with preforked uvicorn workers."
+    )
+    # Local runs stay on loopback; the image passes --host for the container.
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=None,
+        help="Recycle a worker after this many requests; 0 disables recycling.",
+    )
+    parser.add_argument("--max-requests-jitter", type=int, default=None)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+
+    # Disabled while importing so no collection leaves freed holes in pages that
+    # the workers will share; the workers enable it again after forking.
+    gc.disable()
+    _prepare_multiprocess_dir()
+
+    from app.core.settings import settings
+    from app.main import app
+
+    for module in PRELOADED_MODULES:
+        importlib.import_module(module)
+
+    sock = uvicorn.Config(app, host=args.host, port=args.port).bind_socket()
+    sock.set_inheritable(True)
+    gc.freeze()
+
+    Master(
+        app,
+        sock,
+        workers=args.workers or settings.WEB_CONCURRENCY,
+        max_requests=(
+            settings.SERVER_MAX_REQUESTS
+            if args.max_requests is None
+            else args.max_requests
+        ),
+        max_requests_jitter=(
+            settings.SERVER_MAX_REQUESTS_JITTER
+            if args.max_requests_jitter is None
+            else args.max_requests_jitter
+        ),
+        graceful_timeout=settings.SERVER_GRACEFUL_TIMEOUT_SEC,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
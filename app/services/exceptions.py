@@ -41,6 +41,18 @@ class UserWalletNotFound(NotFound):
         self.message = f"Wallet for user with id {self.user_id} not found."
 
 
+class WebhookEndpointNotFound(NotFound):
+    def __init__(self, user_id: int) -> None:
+        self.user_id = user_id
+        self.message = f"Webhook endpoint for user with id {self.user_id} not found."
+
+
+class InvalidWebhookUrl(BadRequest):
+    def __init__(self, reason: str) -> None:
+        self.reason = reason
+        self.message = f"Invalid webhook URL: {self.reason}."
+
+
 class CannotTransferToSameWallet(BadRequest):
     message = "Cannot transfer to the same wallet"
 
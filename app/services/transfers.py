@@ -1,11 +1,15 @@
 import logging
+from collections.abc import Sequence
 from decimal import Decimal
 
-from sqlalchemy import select
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.metrics.db.locks import ROW_LOCK_OPTION
+from app.core.tracing import traced
 from app.db.models import Transaction, Wallet
-from app.db.tx import transaction_scope
+from app.db.tx import async_transaction_scope, transaction_scope
 
 from .exceptions import (
     CannotTransferToSameWallet,
@@ -18,12 +22,11 @@ from .exceptions import (
 logger = logging.getLogger(__name__)
 
 
-def create_transfer(
-    db: Session,
+def _validate_transfer(
     from_wallet_id: int,
     to_wallet_id: int,
     amount: Decimal,
-) -> Transaction:
+) -> None:
     if from_wallet_id == to_wallet_id:
         raise CannotTransferToSameWallet()
 
@@ -33,43 +36,52 @@ def create_transfer(
     if amount <= 0:
         raise InvalidTransferAmount()
 
+
+def _locked_wallets_query(from_wallet_id: int, to_wallet_id: int) -> Select:
     first_id, second_id = sorted([from_wallet_id, to_wallet_id])
+    return (
+        select(Wallet)
+        .where(Wallet.id.in_([first_id, second_id]))
+        .with_for_update()
+        .execution_options(**{ROW_LOCK_OPTION: ("wallets", (first_id, second_id))})
+    )
 
-    with transaction_scope(db):
-        wallets = (
-            db.execute(
-                select(Wallet)
-                .where(Wallet.id.in_([first_id, second_id]))
-                .with_for_update()
-            )
-            .scalars()
-            .all()
-        )
 
-        wallet_map = {w.id: w for w in wallets}
-        from_wallet = wallet_map.get(from_wallet_id)
-        to_wallet = wallet_map.get(to_wallet_id)
+def _apply_transfer(
+    wallets: Sequence[Wallet],
+    from_wallet_id: int,
+    to_wallet_id: int,
+    amount: Decimal,
+) -> Transaction:
+    wallet_map = {w.id: w for w in wallets}
+    from_wallet = wallet_map.get(from_wallet_id)
+    to_wallet = wallet_map.get(to_wallet_id)
 
-        if not from_wallet:
-            raise WalletNotFound(from_wallet_id)
+    if not from_wallet:
+        raise WalletNotFound(from_wallet_id)
 
-        if not to_wallet:
-            raise WalletNotFound(to_wallet_id)
+    if not to_wallet:
+        raise WalletNotFound(to_wallet_id)
 
-        if from_wallet.balance < amount:
-            raise InsufficientFunds()
+    if from_wallet.balance < amount:
+        raise InsufficientFunds()
 
-        from_wallet.balance -= amount
-        to_wallet.balance += amount
+    from_wallet.balance -= amount
+    to_wallet.balance += amount
+
+    return Transaction(
+        from_wallet=from_wallet,
+        to_wallet=to_wallet,
+        amount=amount,
+    )
 
-        transfer = Transaction(
-            from_wallet_id=from_wallet.id,
-            to_wallet_id=to_wallet.id,
-            amount=amount,
-        )
-        db.add(transfer)
-        db.flush()
 
+def _log_transfer_created(
+    transfer: Transaction,
+    from_wallet_id: int,
+    to_wallet_id: int,
+    amount: Decimal,
+) -> None:
     logger.info(
         "transfer_created",
         extra={
@@ -82,4 +94,46 @@ def create_transfer(
         },
     )
 
+
+@traced("service.create_transfer")
+def create_transfer(
+    db: Session,
+    from_wallet_id: int,
+    to_wallet_id: int,
+    amount: Decimal,
+) -> Transaction:
+    _validate_transfer(from_wallet_id, to_wallet_id, amount)
+
+    with transaction_scope(db):
+        wallets = (
+            db.execute(_locked_wallets_query(from_wallet_id, to_wallet_id))
+            .scalars()
+            .all()
+        )
+        transfer = _apply_transfer(wallets, from_wallet_id, to_wallet_id, amount)
+        db.add(transfer)
+        db.flush()
+
+    _log_transfer_created(transfer, from_wallet_id, to_wallet_id, amount)
+    return transfer
+
+
+@traced("service.create_transfer")
+async def create_transfer_async(
+    db: AsyncSession,
+    from_wallet_id: int,
+    to_wallet_id: int,
+    amount: Decimal,
+) -> Transaction:
+    _validate_transfer(from_wallet_id, to_wallet_id, amount)
+
+    async with async_transaction_scope(db):
+        result = await db.execute(_locked_wallets_query(from_wallet_id, to_wallet_id))
+        transfer = _apply_transfer(
+            result.scalars().all(), from_wallet_id, to_wallet_id, amount
+        )
+        db.add(transfer)
+        await db.flush()
+
+    _log_transfer_created(transfer, from_wallet_id, to_wallet_id, amount)
     return transfer
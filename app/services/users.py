@@ -1,12 +1,13 @@
 import logging
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 
 from app.db.models import User
-from app.db.tx import on_commit, transaction_scope
+from app.db.tx import async_transaction_scope, on_commit, transaction_scope
 
 from .exceptions import UserNotFound, UserWalletNotFound
-from .wallets import create_wallet_for_user
+from .wallets import create_wallet_for_user, create_wallet_for_user_async
 
 logger = logging.getLogger(__name__)
 
@@ -56,7 +57,37 @@ def get_user_by_id(db: Session, user_id: int) -> User:
 
 
 def get_user_by_id_with_wallet(db: Session, user_id: int) -> User:
-    user = get_user_by_id(db, user_id)
+    # Joined eagerly, so reading the wallet does not issue a second query.
+    user = db.get(User, user_id, options=[joinedload(User.wallet)])
+    if not user:
+        raise UserNotFound(user_id)
+    if user.wallet is None:
+        raise UserWalletNotFound(user_id)
+    return user
+
+
+async def create_user_with_wallet_async(db: AsyncSession) -> User:
+    async with async_transaction_scope(db):
+        user = User()
+        db.add(user)
+        await db.flush()
+        wallet = await create_wallet_for_user_async(db, user.id)
+        user.wallet = wallet
+        on_commit(
+            db,
+            _log_user_created,
+            user.id,
+            wallet.id,
+            str(wallet.balance),
+        )
+    return user
+
+
+async def get_user_by_id_with_wallet_async(db: AsyncSession, user_id: int) -> User:
+    # The wallet is loaded eagerly because lazy loads cannot run under asyncio.
+    user = await db.get(User, user_id, options=[joinedload(User.wallet)])
+    if not user:
+        raise UserNotFound(user_id)
     if user.wallet is None:
         raise UserWalletNotFound(user_id)
     return user
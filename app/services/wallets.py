@@ -1,6 +1,7 @@
 import logging
 from decimal import Decimal
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.db.models import User, Wallet
@@ -35,6 +36,13 @@ def get_wallet(db: Session, wallet_id: int) -> Wallet:
     return _get_wallet_from_db(db, wallet_id)
 
 
+async def get_wallet_async(db: AsyncSession, wallet_id: int) -> Wallet:
+    wallet = await db.get(Wallet, wallet_id)
+    if not wallet:
+        raise WalletNotFound(wallet_id)
+    return wallet
+
+
 def create_wallet_for_user(db: Session, user_id: int) -> Wallet:
     initial_balance = Decimal("100.00")
     user = db.get(User, user_id)
@@ -53,3 +61,23 @@ def create_wallet_for_user(db: Session, user_id: int) -> Wallet:
         str(wallet.balance),
     )
     return wallet
+
+
+async def create_wallet_for_user_async(db: AsyncSession, user_id: int) -> Wallet:
+    initial_balance = Decimal("100.00")
+    user = await db.get(User, user_id)
+    if not user:
+        raise UserNotFound(user_id)
+
+    wallet = Wallet(user_id=user.id, balance=initial_balance)
+    db.add(wallet)
+    await db.flush()
+
+    on_commit(
+        db,
+        _log_wallet_created,
+        wallet.id,
+        user_id,
+        str(wallet.balance),
+    )
+    return wallet
@@ -0,0 +1,102 @@
+import ipaddress
+import logging
+import socket
+from urllib.parse import urlsplit
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.models import User, WebhookEndpoint
+from app.db.tx import transaction_scope
+
+from .exceptions import InvalidWebhookUrl, UserNotFound, WebhookEndpointNotFound
+
+logger = logging.getLogger(__name__)
+
+
+def _find_webhook_endpoint(db: Session, user_id: int) -> WebhookEndpoint | None:
+    return db.execute(
+        select(WebhookEndpoint).where(WebhookEndpoint.user_id == user_id)
+    ).scalar_one_or_none()
+
+
+def _resolve_addresses(host: str, port: int) -> set[str]:
+    try:
+        return {
+            str(info[4][0])
+            for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
+        }
+    except (OSError, UnicodeError):
+        return set()
+
+
+def is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global
+
+
+def validate_webhook_url(url: str) -> None:
+    """
+    Workers POST to registered URLs from inside the network, so only HTTPS URLs
+    whose host resolves to public addresses only are accepted.
+    """
+    parts = urlsplit(url)
+    if parts.scheme != "https":
+        raise InvalidWebhookUrl("only https is allowed")
+    if not parts.hostname:
+        raise InvalidWebhookUrl("a host is required")
+
+    addresses = _resolve_addresses(parts.hostname, parts.port or 443)
+    if not addresses:
+        raise InvalidWebhookUrl("the host does not resolve")
+    if not all(is_public_address(address) for address in addresses):
+        raise InvalidWebhookUrl("the host must not be a private address")
+
+
+def set_webhook_endpoint(db: Session, user_id: int, url: str) -> WebhookEndpoint:
+    validate_webhook_url(url)
+    with transaction_scope(db):
+        if db.get(User, user_id) is None:
+            raise UserNotFound(user_id)
+
+        endpoint = _find_webhook_endpoint(db, user_id)
+        if endpoint is None:
+            endpoint = WebhookEndpoint(user_id=user_id, url=url)
+            db.add(endpoint)
+        else:
+            endpoint.url = url
+        db.flush()
+
+    logger.info(
+        "webhook_endpoint_set",
+        extra={"extra_fields": {"user_id": user_id, "endpoint_id": endpoint.id}},
+    )
+    return endpoint
+
+
+def get_webhook_endpoint(db: Session, user_id: int) -> WebhookEndpoint:
+    endpoint = _find_webhook_endpoint(db, user_id)
+    if endpoint is None:
+        raise WebhookEndpointNotFound(user_id)
+    return endpoint
+
+
+def delete_webhook_endpoint(db: Session, user_id: int) -> None:
+    with transaction_scope(db):
+        endpoint = _find_webhook_endpoint(db, user_id)
+        if endpoint is None:
+            raise WebhookEndpointNotFound(user_id)
+        db.delete(endpoint)
+
+    logger.info(
+        "webhook_endpoint_deleted",
+        extra={"extra_fields": {"user_id": user_id}},
+    )
+
+
+def get_webhook_url(db: Session, user_id: int) -> str | None:
+    return db.execute(
+        select(WebhookEndpoint.url).where(WebhookEndpoint.user_id == user_id)
+    ).scalar_one_or_none()
@@ -0,0 +1,113 @@
+import logging
+import time
+from functools import lru_cache
+from typing import Optional, cast
+
+from redis import Redis, RedisError
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+PENDING_USERS_KEY = "notify:coalesce:users"
+
+
+class NotificationCoalescer:
+    """
+    Collects transfer notifications per user in Redis sorted sets so that
+    everything a user receives within the coalescing window is delivered once.
+    `notify:coalesce:users` scores each user by their oldest pending transfer;
+    `notify:coalesce:user:<id>` holds that user's pending transfer ids.
+    """
+
+    def __init__(self, client: Optional[Redis], window: float):
+        self._client = client
+        self._window = window
+
+    @property
+    def enabled(self) -> bool:
+        return self._client is not None and self._window > 0
+
+    def _user_key(self, user_id: int) -> str:
+        return f"notify:coalesce:user:{user_id}"
+
+    def add(self, user_id: int, transfer_id: int) -> bool:
+        """Returns False when the transfer must be notified immediately instead."""
+        if not self.enabled or self._client is None:
+            return False
+
+        now = time.time()
+        user_key = self._user_key(user_id)
+        try:
+            pipe = self._client.pipeline(transaction=True)
+            pipe.zadd(user_key, {str(transfer_id): now})
+            pipe.zadd(PENDING_USERS_KEY, {str(user_id): now}, nx=True)
+            # Safety net for users whose flush never happens.
+            pipe.expire(user_key, int(self._window * 10) + 60)
+            pipe.execute()
+            return True
+        except RedisError:
+            logger.warning(
+                "notification_coalesce_failed",
+                extra={
+                    "extra_fields": {"user_id": user_id, "transfer_id": transfer_id}
+                },
+                exc_info=True,
+            )
+            return False
+
+    def due_users(self, limit: int = 500) -> list[int]:
+        """Users whose oldest pending transfer is older than the window."""
+        if self._client is None:
+            return []
+
+        cutoff = time.time() - self._window
+        try:
+            members = self._client.zrangebyscore(
+                PENDING_USERS_KEY, "-inf", cutoff, start=0, num=limit
+            )
+        except RedisError:
+            logger.warning(
+                "notification_coalesce_scan_failed",
+                exc_info=True,
+            )
+            return []
+        return [int(member) for member in cast(list[str], members)]
+
+    def drain(self, user_id: int) -> list[int]:
+        """Atomically takes all pending transfer ids for a user."""
+        if self._client is None:
+            return []
+
+        user_key = self._user_key(user_id)
+        try:
+            pipe = self._client.pipeline(transaction=True)
+            pipe.zrange(user_key, 0, -1)
+            pipe.delete(user_key)
+            pipe.zrem(PENDING_USERS_KEY, str(user_id))
+            members, _, _ = pipe.execute()
+        except RedisError:
+            logger.warning(
+                "notification_coalesce_drain_failed",
+                extra={"extra_fields": {"user_id": user_id}},
+                exc_info=True,
+            )
+            return []
+        return sorted(int(member) for member in members)
+
+
+@lru_cache(maxsize=1)
+def get_notification_coalescer() -> NotificationCoalescer:
+    window = settings.NOTIFY_COALESCE_WINDOW_SEC
+    if window <= 0 or not settings.CACHE_ENABLED:
+        return NotificationCoalescer(None, window)
+
+    try:
+        client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        return NotificationCoalescer(client, window)
+    except (RedisError, ValueError):
+        logger.warning(
+            "notification_coalesce_redis_init_failed",
+            exc_info=True,
+        )
+        return NotificationCoalescer(None, window)
@@ -0,0 +1,234 @@
+"""Dead-letter queue for notifications that exhausted their retries.
+
+Inspect and replay from the worker image:
+    python -m app.tasks.dead_letter stats
+    python -m app.tasks.dead_letter list --limit 20
+    python -m app.tasks.dead_letter replay --batch-size 100 --rate 50
+"""
+
+import argparse
+import json
+import logging
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Optional, cast
+
+from redis import Redis, RedisError
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DEAD_LETTER_KEY = "notify:dead_letter"
+# Entries a replay has taken off the queue and not yet published.
+REPLAYING_KEY = "notify:dead_letter:replaying"
+
+Publisher = Callable[[str, list[Any], dict[str, Any]], None]
+
+
+class DeadLetterQueue:
+    """
+    Redis list of failed notification tasks with their original arguments.
+    New entries are appended on the right; replay moves the oldest from the left
+    onto a replaying list and removes each one once it is published, so entries
+    are never only in the replay's memory.
+    """
+
+    def __init__(self, client: Optional[Redis], max_size: int):
+        self._client = client
+        self._max_size = max_size
+
+    def push(
+        self,
+        task_name: str,
+        args: list[Any],
+        kwargs: dict[str, Any],
+        reason: str,
+        task_id: str | None = None,
+    ) -> bool:
+        if not self._client:
+            return False
+
+        entry = {
+            "task": task_name,
+            "args": args,
+            "kwargs": kwargs,
+            "reason": reason,
+            "task_id": task_id,
+            "failed_at": datetime.now(timezone.utc).isoformat(),
+        }
+        try:
+            pipe = self._client.pipeline(transaction=True)
+            pipe.rpush(DEAD_LETTER_KEY, json.dumps(entry, default=str))
+            pipe.ltrim(DEAD_LETTER_KEY, -self._max_size, -1)
+            pipe.execute()
+            return True
+        except RedisError:
+            logger.warning(
+                "dead_letter_push_failed",
+                extra={"extra_fields": {"task_name": task_name, "task_id": task_id}},
+                exc_info=True,
+            )
+            return False
+
+    def size(self) -> int:
+        if not self._client:
+            return 0
+        return int(cast(int, self._client.llen(DEAD_LETTER_KEY)))
+
+    def peek(self, limit: int) -> list[dict[str, Any]]:
+        if not self._client:
+            return []
+        raw = cast(list[str], self._client.lrange(DEAD_LETTER_KEY, 0, limit - 1))
+        return [json.loads(item) for item in raw]
+
+    def claim_batch(self, batch_size: int) -> list[str]:
+        """Moves up to `batch_size` of the oldest entries onto the replaying list."""
+        if not self._client:
+            return []
+        pipe = self._client.pipeline(transaction=True)
+        for _ in range(batch_size):
+            pipe.lmove(DEAD_LETTER_KEY, REPLAYING_KEY, "LEFT", "RIGHT")
+        return [raw for raw in pipe.execute() if raw is not None]
+
+    def ack(self, raw: str) -> None:
+        """Drops a claimed entry once it has been published."""
+        if self._client:
+            self._client.lrem(REPLAYING_KEY, 1, raw)
+
+    def restore(self) -> None:
+        """Puts unpublished claimed entries back at the head, in their order."""
+        if not self._client:
+            return
+        count = int(cast(int, self._client.llen(REPLAYING_KEY)))
+        if not count:
+            return
+        pipe = self._client.pipeline(transaction=True)
+        for _ in range(count):
+            pipe.lmove(REPLAYING_KEY, DEAD_LETTER_KEY, "RIGHT", "LEFT")
+        pipe.execute()
+
+
+@lru_cache(maxsize=1)
+def get_dead_letter_queue() -> DeadLetterQueue:
+    max_size = settings.NOTIFY_DEAD_LETTER_MAX_SIZE
+    if not settings.CACHE_ENABLED:
+        return DeadLetterQueue(None, max_size)
+
+    try:
+        client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        return DeadLetterQueue(client, max_size)
+    except (RedisError, ValueError):
+        logger.warning("dead_letter_redis_init_failed", exc_info=True)
+        return DeadLetterQueue(None, max_size)
+
+
+def _publish(task_name: str, args: list[Any], kwargs: dict[str, Any]) -> None:
+    from app.core.celery_app import BULK_PRIORITY, BULK_QUEUE, celery_app
+
+    celery_app.send_task(
+        task_name,
+        args=args,
+        kwargs=kwargs,
+        queue=BULK_QUEUE,
+        priority=BULK_PRIORITY,
+    )
+
+
+def replay_dead_letters(
+    queue: DeadLetterQueue,
+    *,
+    batch_size: int,
+    rate: float,
+    limit: int | None = None,
+    publish: Publisher = _publish,
+    sleep: Callable[[float], None] = time.sleep,
+) -> int:
+    """
+    Re-enqueues dead-lettered tasks oldest first, at most `rate` per second.
+    Stops at the first publish failure. Unpublished entries go back to the head
+    of the queue when replay stops for any reason, including an interrupt; a
+    replay that was killed outright leaves them on the replaying list, and the
+    next replay puts them back before it starts.
+    """
+    replayed = 0
+    queue.restore()
+    try:
+        while limit is None or replayed < limit:
+            size = batch_size if limit is None else min(batch_size, limit - replayed)
+            batch = queue.claim_batch(size)
+            if not batch:
+                break
+
+            started = time.monotonic()
+            for raw in batch:
+                entry = json.loads(raw)
+                try:
+                    publish(entry["task"], entry["args"], entry["kwargs"])
+                except Exception:
+                    logger.exception(
+                        "dead_letter_replay_failed",
+                        extra={"extra_fields": {"replayed": replayed}},
+                    )
+                    return replayed
+                queue.ack(raw)
+                replayed += 1
+
+            # Space batches so the average publish rate stays under `rate`.
+            remaining = len(batch) / rate - (time.monotonic() - started)
+            if remaining > 0:
+                sleep(remaining)
+    finally:
+        queue.restore()
+
+    logger.info(
+        "dead_letter_replay_completed",
+        extra={"extra_fields": {"replayed": replayed}},
+    )
+    return replayed
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Inspect and replay dead-lettered notification tasks."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("stats", help="Print the number of dead-lettered tasks.")
+
+    list_parser = subparsers.add_parser("list", help="Print the oldest entries.")
+    list_parser.add_argument("--limit", type=int, default=20)
+
+    replay = subparsers.add_parser("replay", help="Re-enqueue dead-lettered tasks.")
+    replay.add_argument("--batch-size", type=int, default=100)
+    replay.add_argument("--rate", type=float, default=50.0, help="Tasks per second.")
+    replay.add_argument("--limit", type=int, default=None)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    from app.core.logging import setup_logging
+
+    setup_logging()
+    args = build_parser().parse_args(argv)
+    queue = get_dead_letter_queue()
+
+    if args.command == "stats":
+        print(json.dumps({"dead_letters": queue.size()}))
+    elif args.command == "list":
+        for entry in queue.peek(args.limit):
+            print(json.dumps(entry))
+    else:
+        replayed = replay_dead_letters(
+            queue,
+            batch_size=args.batch_size,
+            rate=args.rate,
+            limit=args.limit,
+        )
+        print(json.dumps({"replayed": replayed, "remaining": queue.size()}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import logging
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Literal, Optional
+
+from redis import Redis, RedisError
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DedupeKey = tuple[int, Optional[str]]
+ClaimState = Literal["claimed", "delivered", "in_progress"]
+
+DELIVERED = "delivered"
+IN_PROGRESS = "in_progress"
+
+# Both only touch a key still claimed by the caller, so a worker whose lease
+# expired cannot release or overwrite the claim of the worker that took over.
+RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+# A key whose lease expired unclaimed is still marked: the delivery happened.
+MARK_DELIVERED_SCRIPT = """
+local value = redis.call("GET", KEYS[1])
+if value == ARGV[1] or not value then
+    redis.call("SET", KEYS[1], ARGV[2], "EX", ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+class NotificationDedupeStore:
+    """
+    Worker-side record of delivered notifications, keyed on transfer id and
+    idempotency fingerprint.
+    A delivery claims its key with SET NX, a short lease and a token naming the
+    claim's owner. Success upgrades the key to "delivered" for the full TTL;
+    failure releases it so retries proceed. Both check the owner first.
+    When Redis is unavailable every claim succeeds (at-least-once delivery).
+    """
+
+    def __init__(self, client: Optional[Redis], ttl: int, lease: int):
+        self._client = client
+        self._ttl = ttl
+        self._lease = lease
+        if client is not None:
+            self._release_script = client.register_script(RELEASE_SCRIPT)
+            self._mark_delivered_script = client.register_script(MARK_DELIVERED_SCRIPT)
+
+    @property
+    def lease(self) -> int:
+        return self._lease
+
+    def _key(self, key: DedupeKey) -> str:
+        transfer_id, fingerprint = key
+        return f"notify:sent:{transfer_id}:{fingerprint or '-'}"
+
+    @staticmethod
+    def _claim_value(owner: str) -> str:
+        return f"{IN_PROGRESS}:{owner}"
+
+    def claim_many(self, keys: Sequence[DedupeKey], owner: str) -> list[ClaimState]:
+        """
+        Claims every key for `owner`, a token unique to this delivery attempt,
+        in one round trip, and reports who owns the rest.
+        """
+        if not self._client or not keys:
+            return ["claimed"] * len(keys)
+
+        redis_keys = [self._key(key) for key in keys]
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for redis_key in redis_keys:
+                pipe.set(redis_key, self._claim_value(owner), nx=True, ex=self._lease)
+                pipe.get(redis_key)
+            results = pipe.execute()
+        except RedisError:
+            logger.warning(
+                "notification_dedupe_failed",
+                extra={"extra_fields": {"operation": "claim", "keys": len(keys)}},
+                exc_info=True,
+            )
+            return ["claimed"] * len(keys)
+
+        states: list[ClaimState] = []
+        for claimed, value in zip(results[::2], results[1::2], strict=False):
+            if claimed:
+                states.append("claimed")
+            elif value == DELIVERED:
+                states.append("delivered")
+            else:
+                states.append("in_progress")
+        return states
+
+    def claim(self, key: DedupeKey, owner: str) -> ClaimState:
+        return self.claim_many([key], owner)[0]
+
+    def mark_delivered(self, keys: Sequence[DedupeKey], owner: str) -> None:
+        self._write(keys, owner, "mark_delivered")
+
+    def release(self, keys: Sequence[DedupeKey], owner: str) -> None:
+        self._write(keys, owner, "release")
+
+    def _write(self, keys: Sequence[DedupeKey], owner: str, operation: str) -> None:
+        if not self._client or not keys:
+            return
+
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for key in keys:
+                if operation == "release":
+                    self._release_script(
+                        keys=[self._key(key)],
+                        args=[self._claim_value(owner)],
+                        client=pipe,
+                    )
+                else:
+                    self._mark_delivered_script(
+                        keys=[self._key(key)],
+                        args=[self._claim_value(owner), DELIVERED, self._ttl],
+                        client=pipe,
+                    )
+            pipe.execute()
+        except RedisError:
+            logger.warning(
+                "notification_dedupe_failed",
+                extra={"extra_fields": {"operation": operation, "keys": len(keys)}},
+                exc_info=True,
+            )
+
+
+@lru_cache(maxsize=1)
+def get_notification_dedupe_store() -> NotificationDedupeStore:
+    ttl = settings.NOTIFY_DEDUPE_TTL_SEC
+    lease = settings.NOTIFY_DEDUPE_LEASE_SEC
+    if not settings.CACHE_ENABLED:
+        return NotificationDedupeStore(None, ttl, lease)
+
+    try:
+        client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        return NotificationDedupeStore(client, ttl, lease)
+    except (RedisError, ValueError):
+        logger.warning(
+            "notification_dedupe_redis_init_failed",
+            exc_info=True,
+        )
+        return NotificationDedupeStore(None, ttl, lease)
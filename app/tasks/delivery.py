@@ -0,0 +1,88 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from collections.abc import Coroutine
+from functools import lru_cache
+from typing import Any, TypeVar
+
+from app.core.settings import settings
+from app.tasks.exceptions import NotificationDeliveryError
+from app.tasks.webhooks import WebhookDispatcher
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class DeliveryEngine:
+    """
+    Runs notification deliveries on a dedicated asyncio event loop.
+    Worker threads submit coroutines and block until they finish, while the loop
+    multiplexes the downstream I/O and caps it with a semaphore.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        timeout: float,
+        webhooks: WebhookDispatcher | None = None,
+    ):
+        self._timeout = timeout
+        self._loop = asyncio.new_event_loop()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.webhooks = webhooks or WebhookDispatcher.from_settings(timeout)
+        self._thread = threading.Thread(
+            target=self._run_loop,
+            name="notification-delivery",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _limited(self, coro: Coroutine[Any, Any, T]) -> T:
+        async with self._semaphore:
+            return await coro
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Runs a coroutine on the delivery loop and waits for its result."""
+        future = asyncio.run_coroutine_threadsafe(self._limited(coro), self._loop)
+        try:
+            return future.result(self._timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise NotificationDeliveryError("Notification delivery timed out") from None
+
+    def close(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.webhooks.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+@lru_cache(maxsize=1)
+def get_delivery_engine() -> DeliveryEngine:
+    return DeliveryEngine(
+        concurrency=settings.NOTIFY_CONCURRENCY,
+        timeout=settings.NOTIFY_TIMEOUT_SEC,
+    )
+
+
+async def deliver_notification(
+    engine: DeliveryEngine,
+    event: dict[str, Any],
+    webhook_url: str | None = None,
+) -> None:
+    """
+    Delivers one notification event.
+    Without a webhook URL the downstream call is simulated with NOTIFY_DELAY_SEC.
+    """
+    if webhook_url is None:
+        if settings.NOTIFY_DELAY_SEC > 0:
+            await asyncio.sleep(settings.NOTIFY_DELAY_SEC)
+        return
+
+    await engine.webhooks.deliver(webhook_url, event)
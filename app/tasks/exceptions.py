@@ -0,0 +1,6 @@
+class NotificationDeliveryError(RuntimeError):
+    """A notification could not be delivered to the downstream endpoint."""
+
+
+class CircuitOpenError(NotificationDeliveryError):
+    """The endpoint's circuit breaker is open; delivery was not attempted."""
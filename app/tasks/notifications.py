@@ -1,19 +1,90 @@
 import logging
 import secrets
-import time
+from typing import Any
+
+from celery import signals  # type: ignore[import-untyped]
+from celery.exceptions import CeleryError  # type: ignore[import-untyped]
+from kombu.exceptions import KombuError  # type: ignore[import-untyped]
 
 from app.core.celery_app import celery_app
 from app.core.settings import settings
+from app.tasks.coalescing import get_notification_coalescer
+from app.tasks.dead_letter import get_dead_letter_queue
+from app.tasks.dedupe import DedupeKey, get_notification_dedupe_store
+from app.tasks.delivery import deliver_notification, get_delivery_engine
+from app.tasks.webhooks import resolve_webhook_url
 
 logger = logging.getLogger(__name__)
 random = secrets.SystemRandom()
 
 
+def _deliver(event: dict[str, Any], user_id: int | None) -> None:
+    engine = get_delivery_engine()
+    engine.run(deliver_notification(engine, event, resolve_webhook_url(user_id)))
+
+    if random.random() < settings.NOTIFY_FAIL_RATE:  # nosec B311
+        raise RuntimeError("Simulated notification failure")
+
+
+def _log_delivery_failure(task, log_fields: dict[str, Any]) -> None:
+    log_fields = {
+        **log_fields,
+        "retry_count": task.request.retries,
+        "max_retries": task.max_retries,
+    }
+    if task.request.retries >= task.max_retries:
+        logger.exception(
+            "notification_failed",
+            extra={"extra_fields": log_fields},
+        )
+    else:
+        logger.warning(
+            "notification_retry",
+            extra={"extra_fields": log_fields},
+            exc_info=True,
+        )
+
+
+def _log_duplicate_skipped(task, log_fields: dict[str, Any]) -> None:
+    logger.info(
+        "notification_duplicate_skipped",
+        extra={
+            "extra_fields": {
+                **log_fields,
+                "task_id": task.request.id,
+                "retry_count": task.request.retries,
+            }
+        },
+    )
+
+
+def _check_again_after_lease(
+    task, args: tuple[Any, ...], lease: int, log_fields: dict[str, Any]
+) -> None:
+    """
+    Enqueues the task again for when the other delivery's lease expires. Unlike
+    a retry, this does not use up max_retries, so a duplicate waiting on a slow
+    delivery is never dead-lettered; if that delivery fails or its worker dies,
+    the copy takes over.
+    """
+    task.apply_async(args=args, countdown=lease)
+    logger.info(
+        "notification_deferred",
+        extra={
+            "extra_fields": {
+                **log_fields,
+                "task_id": task.request.id,
+                "countdown": lease,
+            }
+        },
+    )
+
+
 @celery_app.task(
     bind=True,
     autoretry_for=(Exception,),
     retry_backoff=True,
-    retry_kwargs={"max_retries": 5},
+    max_retries=5,
 )
 def send_transaction_notification(
     self,
@@ -22,39 +93,179 @@ def send_transaction_notification(
     user_id: int | None = None,
     idempotency_fingerprint: str | None = None,
 ):
+    dedupe = get_notification_dedupe_store()
+    key: DedupeKey = (transfer_id, idempotency_fingerprint)
+    owner = secrets.token_hex(8)
+    state = dedupe.claim(key, owner)
+    if state == "delivered":
+        _log_duplicate_skipped(self, {"transfer_id": transfer_id})
+        return
+    if state == "in_progress":
+        _check_again_after_lease(
+            self,
+            (transfer_id, request_id, user_id, idempotency_fingerprint),
+            dedupe.lease,
+            {"transfer_id": transfer_id},
+        )
+        return
+
     try:
-        if settings.NOTIFY_DELAY_SEC > 0:
-            time.sleep(settings.NOTIFY_DELAY_SEC)
-
-        if random.random() < settings.NOTIFY_FAIL_RATE:  # nosec B311
-            raise RuntimeError("Simulated notification failure")
-
-        logger.info(
-            "notification_sent",
-            extra={
-                "extra_fields": {
-                    "transfer_id": transfer_id,
-                    "user_id": user_id,
-                    "task_id": self.request.id,
-                }
+        _deliver(
+            {
+                "event": "transfer.created",
+                "transfer_id": transfer_id,
+                "user_id": user_id,
             },
+            user_id,
         )
+    except Exception:
+        dedupe.release([key], owner)
+        _log_delivery_failure(self, {"transfer_id": transfer_id})
+        raise
 
-    except RuntimeError:
-        log_fields = {
-            "transfer_id": transfer_id,
-            "retry_count": self.request.retries,
-            "max_retries": self.max_retries,
-        }
-        if self.request.retries >= self.max_retries:
+    dedupe.mark_delivered([key], owner)
+    logger.info(
+        "notification_sent",
+        extra={
+            "extra_fields": {
+                "transfer_id": transfer_id,
+                "user_id": user_id,
+                "task_id": self.request.id,
+            }
+        },
+    )
+
+
+@celery_app.task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    max_retries=5,
+)
+def send_transaction_digest_notification(
+    self,
+    user_id: int,
+    transfer_ids: list[int],
+    request_id: str | None = None,
+):
+    dedupe = get_notification_dedupe_store()
+    keys: list[DedupeKey] = [(transfer_id, None) for transfer_id in transfer_ids]
+    owner = secrets.token_hex(8)
+    states = dedupe.claim_many(keys, owner)
+    claimed = [
+        key for key, state in zip(keys, states, strict=False) if state == "claimed"
+    ]
+    if "in_progress" in states:
+        dedupe.release(claimed, owner)
+        _check_again_after_lease(
+            self,
+            (user_id, transfer_ids, request_id),
+            dedupe.lease,
+            {"user_id": user_id, "transfer_count": len(transfer_ids)},
+        )
+        return
+    if not claimed:
+        _log_duplicate_skipped(self, {"user_id": user_id})
+        return
+
+    pending_ids = [transfer_id for transfer_id, _ in claimed]
+    try:
+        _deliver(
+            {
+                "event": "transfer.digest",
+                "user_id": user_id,
+                "transfer_ids": pending_ids,
+            },
+            user_id,
+        )
+    except Exception:
+        dedupe.release(claimed, owner)
+        _log_delivery_failure(
+            self,
+            {"user_id": user_id, "transfer_count": len(pending_ids)},
+        )
+        raise
+
+    dedupe.mark_delivered(claimed, owner)
+    logger.info(
+        "notification_digest_sent",
+        extra={
+            "extra_fields": {
+                "user_id": user_id,
+                "transfer_count": len(pending_ids),
+                "task_id": self.request.id,
+            }
+        },
+    )
+
+
+@celery_app.task
+def flush_coalesced_notifications() -> int:
+    """Sends one digest per user whose coalescing window has elapsed."""
+    coalescer = get_notification_coalescer()
+    flushed = 0
+
+    for user_id in coalescer.due_users():
+        transfer_ids = coalescer.drain(user_id)
+        if not transfer_ids:
+            continue
+
+        try:
+            send_transaction_digest_notification.delay(user_id, transfer_ids)
+        except (CeleryError, KombuError):
             logger.exception(
-                "notification_failed",
-                extra={"extra_fields": log_fields},
-            )
-        else:
-            logger.warning(
-                "notification_retry",
-                extra={"extra_fields": log_fields},
-                exc_info=True,
+                "notification_digest_enqueue_failed",
+                extra={
+                    "extra_fields": {
+                        "user_id": user_id,
+                        "transfer_count": len(transfer_ids),
+                    }
+                },
             )
-        raise
+            for transfer_id in transfer_ids:
+                coalescer.add(user_id, transfer_id)
+            continue
+        flushed += 1
+
+    return flushed
+
+
+DEAD_LETTER_TASKS = frozenset(
+    {
+        send_transaction_notification.name,
+        send_transaction_digest_notification.name,
+    }
+)
+
+
+@signals.task_failure.connect
+def dead_letter_failed_notification(
+    sender=None,
+    task_id=None,
+    exception=None,
+    args=None,
+    kwargs=None,
+    **_extra,
+):
+    if sender is None or sender.name not in DEAD_LETTER_TASKS:
+        return
+
+    reason = f"{type(exception).__name__}: {exception}"
+    stored = get_dead_letter_queue().push(
+        sender.name,
+        list(args or ()),
+        dict(kwargs or {}),
+        reason,
+        task_id,
+    )
+    logger.warning(
+        "notification_dead_lettered",
+        extra={
+            "extra_fields": {
+                "task_name": sender.name,
+                "task_id": task_id,
+                "reason": reason,
+                "stored": stored,
+            }
+        },
+    )
@@ -1,4 +1,5 @@
 from app.core.request_context import request_id_ctx
+from app.tasks.coalescing import get_notification_coalescer
 from app.tasks.notifications import send_transaction_notification
 
 
@@ -7,6 +8,9 @@ def enqueue_transfer_notification(
     user_id: int | None = None,
     idempotency_fingerprint: str | None = None,
 ) -> None:
+    if user_id is not None and get_notification_coalescer().add(user_id, transfer_id):
+        return
+
     send_transaction_notification.delay(
         transfer_id,
         request_id_ctx.get(),
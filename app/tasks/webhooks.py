@@ -0,0 +1,379 @@
+import asyncio
+import logging
+import socket
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpcore
+import httpx
+
+import app.db.session as db_session
+from app.core.settings import settings
+from app.services.webhooks import get_webhook_url, is_public_address
+from app.tasks.exceptions import CircuitOpenError, NotificationDeliveryError
+
+logger = logging.getLogger(__name__)
+
+PendingEvent = tuple[dict[str, Any], "asyncio.Future[None]"]
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+    Opens after `failure_threshold` failures in a row and lets a single trial
+    request through once `reset_timeout` seconds have passed.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self._reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self._opened_at is not None or self.failures >= self._failure_threshold:
+            self._opened_at = time.monotonic()
+
+
+async def _resolve(host: str, port: int) -> list[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(
+        host, port, type=socket.SOCK_STREAM
+    )
+    return [str(info[4][0]) for info in infos]
+
+
+class PublicAddressBackend(httpcore.AsyncNetworkBackend):
+    """
+    Connects only to hosts whose addresses are all public. URLs are checked when
+    registered, but DNS can change afterwards, so the addresses are checked
+    again here and the connection goes to one of the checked addresses.
+    """
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend) -> None:
+        self._backend = backend
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: Any = None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await asyncio.wait_for(_resolve(host, port), timeout)
+        except (OSError, asyncio.TimeoutError) as exc:
+            raise httpcore.ConnectError(f"Cannot resolve {host}") from exc
+        if not addresses or not all(map(is_public_address, addresses)):
+            raise httpcore.ConnectError(f"{host} resolves to a non-public address")
+
+        for address in addresses[:-1]:
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout, local_address, socket_options
+                )
+            except httpcore.ConnectError:
+                continue
+        return await self._backend.connect_tcp(
+            addresses[-1], port, timeout, local_address, socket_options
+        )
+
+    async def connect_unix_socket(
+        self, path: str, timeout: float | None = None, socket_options: Any = None
+    ) -> httpcore.AsyncNetworkStream:
+        raise httpcore.ConnectError("Unix sockets are not webhook destinations")
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+def _transport(limits: httpx.Limits, public_only: bool) -> httpx.AsyncHTTPTransport:
+    transport = httpx.AsyncHTTPTransport(limits=limits)
+    if public_only:
+        # httpx has no option for the network backend of its connection pool.
+        pool = transport._pool
+        pool._network_backend = PublicAddressBackend(pool._network_backend)
+    return transport
+
+
+@dataclass
+class _HostClient:
+    client: httpx.AsyncClient
+    in_flight: int = 0
+    evicted: bool = False
+
+
+@dataclass
+class _EndpointState:
+    url: str
+    breaker: CircuitBreaker
+    pending: deque[PendingEvent] = field(default_factory=deque)
+    in_flight: int = 0
+
+
+class WebhookDispatcher:
+    """
+    Delivers webhook events from the delivery engine's event loop.
+
+    Each destination host gets its own pooled keep-alive client. Past
+    `max_clients` hosts, the least recently used client is closed once its
+    requests finish. Connections to non-public addresses are refused unless
+    `allow_private_addresses` is set. Each endpoint gets a concurrency limit
+    and a circuit breaker. Events that arrive while all
+    of an endpoint's slots are busy are sent together as one batch, so batching
+    only kicks in under load and adds no latency otherwise.
+    Must only be used from coroutines running on a single event loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float,
+        endpoint_concurrency: int,
+        batch_max_size: int,
+        max_connections_per_host: int,
+        failure_threshold: int,
+        reset_timeout: float,
+        max_clients: int,
+        allow_private_addresses: bool,
+    ):
+        self._timeout = timeout
+        self._endpoint_concurrency = endpoint_concurrency
+        self._batch_max_size = batch_max_size
+        self._max_connections_per_host = max_connections_per_host
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._max_clients = max_clients
+        self._allow_private_addresses = allow_private_addresses
+        self._clients: OrderedDict[tuple[str, str], _HostClient] = OrderedDict()
+        self._endpoints: dict[str, _EndpointState] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @classmethod
+    def from_settings(cls, timeout: float) -> "WebhookDispatcher":
+        return cls(
+            timeout=timeout,
+            endpoint_concurrency=settings.WEBHOOK_ENDPOINT_CONCURRENCY,
+            batch_max_size=settings.WEBHOOK_BATCH_MAX_SIZE,
+            max_connections_per_host=settings.WEBHOOK_MAX_CONNECTIONS_PER_HOST,
+            failure_threshold=settings.WEBHOOK_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.WEBHOOK_CIRCUIT_RESET_SEC,
+            max_clients=settings.WEBHOOK_MAX_CLIENTS,
+            allow_private_addresses=settings.WEBHOOK_ALLOW_PRIVATE_ADDRESSES,
+        )
+
+    def _acquire_client(self, url: str) -> _HostClient:
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        host = self._clients.get(key)
+        if host is None:
+            limits = httpx.Limits(
+                max_connections=self._max_connections_per_host,
+                max_keepalive_connections=self._max_connections_per_host,
+            )
+            host = _HostClient(
+                httpx.AsyncClient(
+                    timeout=self._timeout,
+                    transport=_transport(limits, not self._allow_private_addresses),
+                )
+            )
+            self._clients[key] = host
+            while len(self._clients) > self._max_clients:
+                _, evicted = self._clients.popitem(last=False)
+                evicted.evicted = True
+                self._close_if_idle(evicted)
+        self._clients.move_to_end(key)
+        host.in_flight += 1
+        return host
+
+    def _release_client(self, host: _HostClient) -> None:
+        host.in_flight -= 1
+        self._close_if_idle(host)
+
+    def _close_if_idle(self, host: _HostClient) -> None:
+        if host.evicted and host.in_flight == 0:
+            task = asyncio.create_task(host.client.aclose())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _endpoint(self, url: str) -> _EndpointState:
+        endpoint = self._endpoints.get(url)
+        if endpoint is None:
+            endpoint = _EndpointState(
+                url=url,
+                breaker=CircuitBreaker(self._failure_threshold, self._reset_timeout),
+            )
+            self._endpoints[url] = endpoint
+        return endpoint
+
+    def circuit_state(self, url: str) -> str:
+        endpoint = self._endpoints.get(url)
+        return endpoint.breaker.state if endpoint else "closed"
+
+    async def deliver(self, url: str, event: dict[str, Any]) -> None:
+        endpoint = self._endpoint(url)
+        if endpoint.breaker.state == "open":
+            raise CircuitOpenError(f"Circuit open for webhook endpoint {url}")
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        endpoint.pending.append((event, future))
+        self._pump(endpoint)
+        await future
+
+    def _pump(self, endpoint: _EndpointState) -> None:
+        while endpoint.in_flight < self._endpoint_concurrency:
+            # Waiters cancelled by a delivery timeout no longer need sending.
+            while endpoint.pending and endpoint.pending[0][1].done():
+                endpoint.pending.popleft()
+            if not endpoint.pending:
+                break
+
+            if not endpoint.breaker.allow():
+                if endpoint.breaker.state == "open":
+                    self._fail_pending(endpoint)
+                break
+
+            batch: list[PendingEvent] = []
+            while endpoint.pending and len(batch) < self._batch_max_size:
+                item = endpoint.pending.popleft()
+                if not item[1].done():
+                    batch.append(item)
+
+            endpoint.in_flight += 1
+            task = asyncio.create_task(self._send(endpoint, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        if (
+            not endpoint.pending
+            and endpoint.in_flight == 0
+            and endpoint.breaker.failures == 0
+        ):
+            self._endpoints.pop(endpoint.url, None)
+
+    def _fail_pending(self, endpoint: _EndpointState) -> None:
+        while endpoint.pending:
+            _, future = endpoint.pending.popleft()
+            if not future.done():
+                future.set_exception(
+                    CircuitOpenError(
+                        f"Circuit open for webhook endpoint {endpoint.url}"
+                    )
+                )
+
+    async def _send(self, endpoint: _EndpointState, batch: list[PendingEvent]) -> None:
+        host = self._acquire_client(endpoint.url)
+        try:
+            response = await host.client.post(
+                endpoint.url,
+                json={"events": [event for event, _ in batch]},
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as exc:
+            endpoint.breaker.record_failure()
+            logger.warning(
+                "webhook_delivery_failed",
+                extra={
+                    "extra_fields": {
+                        "endpoint_host": urlsplit(endpoint.url).netloc,
+                        "batch_size": len(batch),
+                        "consecutive_failures": endpoint.breaker.failures,
+                        "circuit_state": endpoint.breaker.state,
+                    }
+                },
+            )
+            for _, future in batch:
+                if not future.done():
+                    error = NotificationDeliveryError(
+                        f"Webhook delivery failed: {type(exc).__name__}"
+                    )
+                    error.__cause__ = exc
+                    future.set_exception(error)
+        else:
+            endpoint.breaker.record_success()
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+        finally:
+            self._release_client(host)
+            endpoint.in_flight -= 1
+            self._pump(endpoint)
+
+    async def aclose(self) -> None:
+        for host in self._clients.values():
+            await host.client.aclose()
+        self._clients.clear()
+
+
+class WebhookEndpointRegistry:
+    """
+    Resolves a user's webhook URL from the database with a small TTL cache,
+    so repeated notifications for the same user do not each cost a query.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 10_000):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries: OrderedDict[int, tuple[str | None, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, user_id: int) -> str | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                return entry[0]
+
+        with db_session.SessionLocal() as db:
+            url = get_webhook_url(db, user_id)
+
+        with self._lock:
+            self._entries[user_id] = (url, now + self._ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+        return url
+
+
+@lru_cache(maxsize=1)
+def get_webhook_registry() -> WebhookEndpointRegistry:
+    return WebhookEndpointRegistry(ttl=settings.WEBHOOK_REGISTRY_TTL_SEC)
+
+
+def resolve_webhook_url(user_id: int | None) -> str | None:
+    """Returns the user's registered endpoint or the NOTIFY_WEBHOOK_URL fallback."""
+    url = get_webhook_registry().resolve(user_id) if user_id is not None else None
+    if url is None and settings.NOTIFY_WEBHOOK_URL is not None:
+        url = str(settings.NOTIFY_WEBHOOK_URL)
+    return url
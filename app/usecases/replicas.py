@@ -0,0 +1,67 @@
+from collections.abc import Iterable
+
+import app.db.session as db_session
+from app.cache import get_async_cache, get_cache
+from app.core.settings import settings
+
+RECENT_WRITE_PREFIX = "recent_write:"
+
+
+def _recent_write_key(entity: str, entity_id: int) -> str:
+    return f"{RECENT_WRITE_PREFIX}{entity}:{entity_id}"
+
+
+def _recent_write_keys(
+    wallet_ids: Iterable[int | None],
+    user_ids: Iterable[int | None],
+) -> list[str]:
+    keys = [
+        _recent_write_key("wallet", wallet_id) for wallet_id in wallet_ids if wallet_id
+    ]
+    keys += [_recent_write_key("user", user_id) for user_id in user_ids if user_id]
+    return keys
+
+
+def remember_writes(
+    wallet_ids: Iterable[int | None] = (),
+    user_ids: Iterable[int | None] = (),
+) -> None:
+    """
+    Pins reads of the written wallets and users to the primary for
+    DB_READ_YOUR_WRITES_SEC, so a client never reads its own transfer from a
+    replica that has not replayed it yet.
+    """
+    if not db_session.has_replicas():
+        return
+
+    cache = get_cache()
+    for key in _recent_write_keys(wallet_ids, user_ids):
+        cache.set(key, "1", ex=settings.DB_READ_YOUR_WRITES_SEC, json_encode=False)
+
+
+async def remember_writes_async(
+    wallet_ids: Iterable[int | None] = (),
+    user_ids: Iterable[int | None] = (),
+) -> None:
+    if not db_session.has_replicas():
+        return
+
+    cache = get_async_cache()
+    for key in _recent_write_keys(wallet_ids, user_ids):
+        await cache.set(
+            key, "1", ex=settings.DB_READ_YOUR_WRITES_SEC, json_encode=False
+        )
+
+
+def read_from_replica(entity: str, entity_id: int) -> bool:
+    # Without Redis recent writes cannot be seen, so reads stay on the primary.
+    if not db_session.has_replicas():
+        return False
+    return get_cache().exists(_recent_write_key(entity, entity_id)) is False
+
+
+async def read_from_replica_async(entity: str, entity_id: int) -> bool:
+    if not db_session.has_replicas():
+        return False
+    recent = await get_async_cache().exists(_recent_write_key(entity, entity_id))
+    return recent is False
@@ -1,52 +1,133 @@
 import logging
 from decimal import Decimal
 
-from celery.exceptions import CeleryError  # type: ignore[import-untyped]
-from kombu.exceptions import KombuError  # type: ignore[import-untyped]
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.db.models import Transaction, Wallet
+import app.db.session as db_session
+from app.core.request_context import timed
+from app.core.tracing import span, traced
+from app.db.models import Transaction
 from app.idempotency import (
+    get_async_idempotency_manager,
     get_idempotency_manager,
     hash_payload,
     idempotency_key_fingerprint,
 )
-from app.services.transfers import create_transfer
-from app.tasks.transfer_notifications import enqueue_transfer_notification
-from app.usecases.wallets import invalidate_wallet_cache
+from app.services.transfers import create_transfer, create_transfer_async
+from app.usecases.replicas import remember_writes, remember_writes_async
+from app.usecases.wallets import (
+    invalidate_wallet_cache,
+    invalidate_wallet_cache_async,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def enqueue_transfer_notification(
+    transfer_id: int,
+    user_id: int | None,
+    idempotency_fingerprint: str,
+) -> None:
+    # Celery and kombu are imported by the first transfer, not at API startup.
+    from app.tasks.transfer_notifications import enqueue_transfer_notification
+
+    enqueue_transfer_notification(transfer_id, user_id, idempotency_fingerprint)
+
+
+def _enqueue_notification(
+    transfer: Transaction,
+    user_id: int | None,
+    idempotency_fingerprint: str,
+) -> None:
+    from celery.exceptions import CeleryError  # type: ignore[import-untyped]
+    from kombu.exceptions import KombuError  # type: ignore[import-untyped]
+
+    try:
+        with timed("broker"), span("broker.publish"):
+            enqueue_transfer_notification(
+                transfer.id,
+                user_id,
+                idempotency_fingerprint,
+            )
+    except (CeleryError, KombuError):
+        _log_enqueue_failure(transfer, user_id)
+
+
+@traced("usecase.post_transfer_side_effects")
 def _post_transfer_side_effects(
-    db: Session,
     transfer: Transaction,
     idempotency_fingerprint: str,
 ) -> None:
+    # Pin reads to the primary before invalidating, or a concurrent read could
+    # refill the cache from a replica that has not applied the transfer yet.
+    if db_session.has_replicas():
+        remember_writes(**_transfer_writes(transfer))
     invalidate_wallet_cache(transfer.from_wallet_id)
     invalidate_wallet_cache(transfer.to_wallet_id)
 
-    from_wallet = db.get(Wallet, transfer.from_wallet_id)
-    user_id = from_wallet.user_id if from_wallet else None
+    # The wallets were loaded and locked by the transfer, so no query is needed.
+    user_id = transfer.from_wallet.user_id
 
-    try:
-        enqueue_transfer_notification(
-            transfer.id,
-            user_id,
-            idempotency_fingerprint,
-        )
-    except (CeleryError, KombuError):
-        logger.exception(
-            "transfer_notification_enqueue_failed",
-            extra={
-                "extra_fields": {
-                    "transfer_id": transfer.id,
-                    "user_id": user_id,
-                },
+    _enqueue_notification(transfer, user_id, idempotency_fingerprint)
+
+
+def _transfer_writes(transfer: Transaction) -> dict[str, list[int]]:
+    return {
+        "wallet_ids": [transfer.from_wallet_id, transfer.to_wallet_id],
+        "user_ids": [transfer.from_wallet.user_id, transfer.to_wallet.user_id],
+    }
+
+
+def _log_enqueue_failure(transfer: Transaction, user_id: int | None) -> None:
+    logger.exception(
+        "transfer_notification_enqueue_failed",
+        extra={
+            "extra_fields": {
+                "transfer_id": transfer.id,
+                "user_id": user_id,
             },
-        )
+        },
+    )
 
 
+@traced("usecase.post_transfer_side_effects")
+async def _post_transfer_side_effects_async(
+    transfer: Transaction,
+    idempotency_fingerprint: str,
+) -> None:
+    if db_session.has_replicas():
+        await remember_writes_async(**_transfer_writes(transfer))
+    await invalidate_wallet_cache_async(transfer.from_wallet_id)
+    await invalidate_wallet_cache_async(transfer.to_wallet_id)
+
+    user_id = transfer.from_wallet.user_id
+
+    # Publishing to the broker is blocking I/O in kombu.
+    await run_in_threadpool(
+        _enqueue_notification,
+        transfer,
+        user_id,
+        idempotency_fingerprint,
+    )
+
+
+def _transfer_request_hash(
+    from_wallet_id: int,
+    to_wallet_id: int,
+    amount: Decimal,
+) -> str:
+    return hash_payload(
+        {
+            "from_wallet_id": from_wallet_id,
+            "to_wallet_id": to_wallet_id,
+            "amount": str(amount),
+        }
+    )
+
+
+@traced("usecase.create_transfer")
 def create_transfer_idempotent(
     db: Session,
     from_wallet_id: int,
@@ -56,16 +137,29 @@ def create_transfer_idempotent(
 ) -> Transaction:
     idem = get_idempotency_manager()
     fingerprint = idempotency_key_fingerprint(idempotency_key)
-
-    payload = {
-        "from_wallet_id": from_wallet_id,
-        "to_wallet_id": to_wallet_id,
-        "amount": str(amount),
-    }
-    request_hash = hash_payload(payload)
+    request_hash = _transfer_request_hash(from_wallet_id, to_wallet_id, amount)
 
     with idem.reserve(f"transfer:{idempotency_key}", request_hash):
         transfer = create_transfer(db, from_wallet_id, to_wallet_id, amount)
 
-    _post_transfer_side_effects(db, transfer, fingerprint)
+    _post_transfer_side_effects(transfer, fingerprint)
+    return transfer
+
+
+@traced("usecase.create_transfer")
+async def create_transfer_idempotent_async(
+    db: AsyncSession,
+    from_wallet_id: int,
+    to_wallet_id: int,
+    amount: Decimal,
+    idempotency_key: str,
+) -> Transaction:
+    idem = get_async_idempotency_manager()
+    fingerprint = idempotency_key_fingerprint(idempotency_key)
+    request_hash = _transfer_request_hash(from_wallet_id, to_wallet_id, amount)
+
+    async with idem.reserve(f"transfer:{idempotency_key}", request_hash):
+        transfer = await create_transfer_async(db, from_wallet_id, to_wallet_id, amount)
+
+    await _post_transfer_side_effects_async(transfer, fingerprint)
     return transfer
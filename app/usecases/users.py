@@ -0,0 +1,52 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+import app.db.async_session as async_db_session
+import app.db.session as db_session
+from app.core.tracing import traced
+from app.db.models import User
+from app.services.users import (
+    create_user_with_wallet,
+    create_user_with_wallet_async,
+    get_user_by_id_with_wallet,
+    get_user_by_id_with_wallet_async,
+)
+from app.usecases.replicas import (
+    read_from_replica,
+    read_from_replica_async,
+    remember_writes,
+    remember_writes_async,
+)
+
+
+@traced("usecase.create_user")
+def create_user(db: Session) -> User:
+    user = create_user_with_wallet(db)
+    remember_writes(wallet_ids=[user.wallet.id], user_ids=[user.id])
+    return user
+
+
+@traced("usecase.create_user")
+async def create_user_async(db: AsyncSession) -> User:
+    user = await create_user_with_wallet_async(db)
+    await remember_writes_async(wallet_ids=[user.wallet.id], user_ids=[user.id])
+    return user
+
+
+@traced("usecase.get_user")
+def get_user(db: Session, user_id: int) -> User:
+    if not read_from_replica("user", user_id):
+        return get_user_by_id_with_wallet(db, user_id)
+
+    # The wallet is loaded before the replica session closes and detaches the user.
+    with db_session.replica_session() as replica:
+        return get_user_by_id_with_wallet(replica, user_id)
+
+
+@traced("usecase.get_user")
+async def get_user_async(db: AsyncSession, user_id: int) -> User:
+    if not await read_from_replica_async("user", user_id):
+        return await get_user_by_id_with_wallet_async(db, user_id)
+
+    async with async_db_session.async_replica_session() as replica:
+        return await get_user_by_id_with_wallet_async(replica, user_id)
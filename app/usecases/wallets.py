@@ -1,14 +1,45 @@
 from typing import Any
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.cache import get_cache
-from app.services.wallets import get_wallet
+import app.db.async_session as async_db_session
+import app.db.session as db_session
+from app.cache import get_async_cache, get_cache
+from app.core.tracing import traced
+from app.db.models import Wallet
+from app.services.wallets import get_wallet, get_wallet_async
+from app.usecases.replicas import read_from_replica, read_from_replica_async
 
 CACHE_TTL_SECONDS = 60
 WALLET_CACHE_PREFIX = "wallet:"
 
 
+def _wallet_cache_data(wallet: Wallet) -> dict[str, Any]:
+    return {
+        "id": wallet.id,
+        "balance": str(wallet.balance),
+        "user_id": wallet.user_id,
+    }
+
+
+def _read_wallet(db: Session, wallet_id: int) -> dict[str, Any]:
+    if not read_from_replica("wallet", wallet_id):
+        return _wallet_cache_data(get_wallet(db, wallet_id))
+
+    with db_session.replica_session() as replica:
+        return _wallet_cache_data(get_wallet(replica, wallet_id))
+
+
+async def _read_wallet_async(db: AsyncSession, wallet_id: int) -> dict[str, Any]:
+    if not await read_from_replica_async("wallet", wallet_id):
+        return _wallet_cache_data(await get_wallet_async(db, wallet_id))
+
+    async with async_db_session.async_replica_session() as replica:
+        return _wallet_cache_data(await get_wallet_async(replica, wallet_id))
+
+
+@traced("usecase.get_wallet")
 def get_wallet_cached(db: Session, wallet_id: int) -> dict[str, Any]:
     cache = get_cache()
     key = f"{WALLET_CACHE_PREFIX}{wallet_id}"
@@ -17,16 +48,28 @@ def get_wallet_cached(db: Session, wallet_id: int) -> dict[str, Any]:
     if data:
         return data
 
-    wallet = get_wallet(db, wallet_id)
-    data = {
-        "id": wallet.id,
-        "balance": str(wallet.balance),
-        "user_id": wallet.user_id,
-    }
-
+    data = _read_wallet(db, wallet_id)
     cache.set(key, data, ex=CACHE_TTL_SECONDS)
     return data
 
 
+@traced("usecase.get_wallet")
+async def get_wallet_cached_async(db: AsyncSession, wallet_id: int) -> dict[str, Any]:
+    cache = get_async_cache()
+    key = f"{WALLET_CACHE_PREFIX}{wallet_id}"
+
+    data = await cache.get_wallet(key)
+    if data:
+        return data
+
+    data = await _read_wallet_async(db, wallet_id)
+    await cache.set(key, data, ex=CACHE_TTL_SECONDS)
+    return data
+
+
 def invalidate_wallet_cache(wallet_id: int) -> None:
     get_cache().delete(f"{WALLET_CACHE_PREFIX}{wallet_id}")
+
+
+async def invalidate_wallet_cache_async(wallet_id: int) -> None:
+    await get_async_cache().delete(f"{WALLET_CACHE_PREFIX}{wallet_id}")
@@ -0,0 +1,131 @@
+"""Measure JSON log formatting throughput in records per second.
+
+Formats an ``http_request_completed`` access log record, as emitted for every
+request, with:
+
+- ``legacy``: the previous formatter, which called ``datetime.now().isoformat()``
+  and filtered ``extra_fields`` into an intermediate dict for every record;
+- ``json``: ``JsonFormatter`` with the standard library encoder;
+- ``orjson``: ``JsonFormatter`` with orjson, when it is installed.
+
+Examples:
+    python scripts/logging_benchmark.py
+    python scripts/logging_benchmark.py --records 500000
+"""
+
+# ruff: noqa: E402 -- project imports require the repository root on sys.path.
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("RABBITMQ_URL", "memory://")
+
+from app.core import logging as app_logging
+from app.core.logging import RESERVED_LOG_FIELDS, JsonFormatter
+
+
+class LegacyJsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        log_data: dict[str, Any] = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+
+        extra_fields = getattr(record, "extra_fields", None)
+        if isinstance(extra_fields, dict):
+            log_data.update(
+                {
+                    key: value
+                    for key, value in extra_fields.items()
+                    if key not in RESERVED_LOG_FIELDS
+                }
+            )
+
+        return json.dumps(log_data, ensure_ascii=False, default=str)
+
+
+def access_record() -> logging.LogRecord:
+    record = logging.LogRecord(
+        name="app.core.middleware",
+        level=logging.INFO,
+        pathname=__file__,
+        lineno=1,
+        msg="http_request_completed",
+        args=(),
+        exc_info=None,
+    )
+    record.request_id = "3f2b6c1e-8d4a-4f0e-9a51-2c7d9e0b1a64"
+    record.extra_fields = {
+        "method": "POST",
+        "path": "/transfers",
+        "status": 201,
+        "duration_ms": 12.345,
+    }
+    return record
+
+
+def measure(format_record: Callable[[logging.LogRecord], str], records: int) -> float:
+    record = access_record()
+    for _ in range(min(records, 10000)):
+        format_record(record)
+
+    started = time.perf_counter()
+    for _ in range(records):
+        record.created = time.time()
+        format_record(record)
+    return records / (time.perf_counter() - started)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Compare JSON log formatting throughput."
+    )
+    parser.add_argument("--records", type=int, default=200000)
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+
+    dumps = app_logging._dumps
+    results = {"legacy": measure(LegacyJsonFormatter().format, args.records)}
+    app_logging._dumps = app_logging._dumps_stdlib
+    try:
+        results["json"] = measure(JsonFormatter().format, args.records)
+    finally:
+        app_logging._dumps = dumps
+    if app_logging.orjson is not None:
+        results["orjson"] = measure(JsonFormatter().format, args.records)
+
+    print("JSON log formatting benchmark")
+    print("=============================")
+    print(f"Records per formatter: {args.records}")
+    for name, per_second in results.items():
+        print(
+            f"{name:<7} {per_second:10.0f} records/s "
+            f"({1e6 / per_second:.2f} us/record, "
+            f"{per_second / results['legacy']:.2f}x legacy)"
+        )
+
+
+if __name__ == "__main__":
+    main()
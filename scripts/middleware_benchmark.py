@@ -0,0 +1,185 @@
+"""Measure per-request overhead of the HTTP instrumentation middleware.
+
+Calls a minimal ASGI app directly, without a server or HTTP client, so the
+difference between runs is the middleware itself:
+
+- ``none``: no middleware;
+- ``legacy``: the previous stack of four ``BaseHTTPMiddleware`` layers for request
+  IDs, access logs, Sentry context and metrics;
+- ``asgi``: the single pure ASGI ``RequestInstrumentationMiddleware``.
+
+Examples:
+    python scripts/middleware_benchmark.py
+    python scripts/middleware_benchmark.py --requests 50000
+"""
+
+# ruff: noqa: E402 -- project imports require the repository root on sys.path.
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("RABBITMQ_URL", "memory://")
+
+import sentry_sdk
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.middleware import RequestInstrumentationMiddleware
+from app.core.request_context import request_id_ctx
+
+
+class LegacyRequestIDMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+        token = request_id_ctx.set(request_id)
+        try:
+            response = await call_next(request)
+            response.headers["X-Request-ID"] = request_id
+            return response
+        finally:
+            request_id_ctx.reset(token)
+
+
+class LegacyRequestLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start_time = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            RequestInstrumentationMiddleware._log_request(
+                request.method,
+                request.url.path,
+                status_code,
+                time.perf_counter() - start_time,
+            )
+
+
+class LegacySentryMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        RequestInstrumentationMiddleware._set_sentry_context(
+            request.scope, request_id_ctx.get("-") or "-"
+        )
+        return await call_next(request)
+
+
+class LegacyMetricsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start_time = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            RequestInstrumentationMiddleware._record_metrics(
+                request.scope,
+                request.method,
+                status_code,
+                time.perf_counter() - start_time,
+            )
+
+
+STACKS = {
+    "none": [],
+    "legacy": [
+        Middleware(LegacyRequestIDMiddleware),
+        Middleware(LegacyRequestLoggingMiddleware),
+        Middleware(LegacySentryMiddleware),
+        Middleware(LegacyMetricsMiddleware),
+    ],
+    "asgi": [Middleware(RequestInstrumentationMiddleware)],
+}
+
+
+async def health(_request):
+    return PlainTextResponse("ok")
+
+
+def build_app(stack: str) -> Starlette:
+    return Starlette(routes=[Route("/health", health)], middleware=STACKS[stack])
+
+
+async def call(app: Starlette) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/health",
+        "raw_path": b"/health",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_message):
+        return None
+
+    await app(scope, receive, send)
+
+
+async def measure(stack: str, requests: int) -> float:
+    app = build_app(stack)
+    for _ in range(min(requests, 1000)):
+        await call(app)
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await call(app)
+    return (time.perf_counter() - started) / requests
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Compare per-request overhead of the middleware stacks."
+    )
+    parser.add_argument("--requests", type=int, default=20000)
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    logging.disable(logging.CRITICAL)
+    sentry_sdk.init()
+
+    results = {stack: asyncio.run(measure(stack, args.requests)) for stack in STACKS}
+
+    print("Middleware overhead benchmark")
+    print("=============================")
+    print(f"Requests per stack: {args.requests}")
+    for stack, per_request in results.items():
+        overhead = per_request - results["none"]
+        print(
+            f"{stack:<7} {per_request * 1e6:8.1f} us/request "
+            f"(+{overhead * 1e6:.1f} us middleware)"
+        )
+
+
+if __name__ == "__main__":
+    main()
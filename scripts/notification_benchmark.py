@@ -0,0 +1,143 @@
+"""Measure notification deliveries per second in a single worker process.
+
+Starts a local stub webhook endpoint that answers after a fixed delay, then
+delivers the same number of notifications twice:
+
+- ``blocking``: one delivery at a time, like a prefork child calling a slow
+  downstream synchronously;
+- ``engine``: worker threads submitting to the shared asyncio delivery engine,
+  like ``celery worker --pool threads``.
+
+Examples:
+    python scripts/notification_benchmark.py
+    python scripts/notification_benchmark.py --notifications 2000 --threads 200
+"""
+
+# ruff: noqa: E402 -- project imports require the repository root on sys.path.
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("RABBITMQ_URL", "memory://")
+os.environ.setdefault("WEBHOOK_ALLOW_PRIVATE_ADDRESSES", "true")
+
+from app.tasks.delivery import DeliveryEngine, deliver_notification
+
+STUB_RESPONSE = b"HTTP/1.1 204 No Content\r\nContent-Length: 0\r\n\r\n"
+
+
+class StubEndpoint:
+    """Minimal keep-alive HTTP server that answers every request after a delay."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.port = 0
+        self._ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            while True:
+                headers = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in headers.split(b"\r\n"):
+                    name, _, value = line.partition(b":")
+                    if name.strip().lower() == b"content-length":
+                        length = int(value)
+                await reader.readexactly(length)
+                await asyncio.sleep(self.delay)
+                writer.write(STUB_RESPONSE)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=1024)
+        )
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    def start(self) -> str:
+        self._thread.start()
+        self._ready.wait()
+        return f"http://127.0.0.1:{self.port}/notify"
+
+
+def run_blocking(url: str, notifications: int) -> float:
+    started = time.perf_counter()
+    with httpx.Client() as client:
+        for index in range(notifications):
+            client.post(url, json={"transfer_id": index}).raise_for_status()
+    return time.perf_counter() - started
+
+
+def run_engine(url: str, notifications: int, threads: int, concurrency: int) -> float:
+    engine = DeliveryEngine(concurrency=concurrency, timeout=30.0)
+
+    def deliver(index: int) -> None:
+        engine.run(deliver_notification(engine, {"transfer_id": index}, url))
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(deliver, range(notifications)))
+        return time.perf_counter() - started
+    finally:
+        engine.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Compare blocking and asyncio notification delivery."
+    )
+    parser.add_argument("--notifications", type=int, default=500)
+    parser.add_argument("--blocking-notifications", type=int, default=50)
+    parser.add_argument("--stub-delay", type=float, default=0.05)
+    parser.add_argument("--threads", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=100)
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    url = StubEndpoint(args.stub_delay).start()
+
+    blocking = run_blocking(url, args.blocking_notifications)
+    engine = run_engine(url, args.notifications, args.threads, args.concurrency)
+
+    print("Notification delivery benchmark")
+    print("===============================")
+    print(f"Stub endpoint delay: {args.stub_delay * 1000:.0f} ms")
+    print(
+        f"blocking: {args.blocking_notifications / blocking:10.1f} notifications/s "
+        f"({args.blocking_notifications} in {blocking:.2f}s)"
+    )
+    print(
+        f"engine:   {args.notifications / engine:10.1f} notifications/s "
+        f"({args.notifications} in {engine:.2f}s, threads={args.threads}, "
+        f"concurrency={args.concurrency})"
+    )
+
+
+if __name__ == "__main__":
+    main()
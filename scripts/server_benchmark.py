@@ -0,0 +1,228 @@
+"""Compare memory per worker and throughput of the API server launchers.
+
+Starts the API on a temporary SQLite database with each launcher:
+
+- ``uvicorn``: ``uvicorn app.main:app --workers N``, where every worker imports
+  the application itself;
+- ``prefork``: ``python -m app.server --workers N``, where the workers are forked
+  from a master that imported the application once.
+
+For each, it reports the RSS and PSS of every worker (PSS splits shared pages
+between the processes sharing them), then drives ``GET /health`` over keep-alive
+connections and reports requests per second overall and per worker.
+
+Examples:
+    python scripts/server_benchmark.py
+    python scripts/server_benchmark.py --workers 4 --duration 20 --connections 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+REQUEST = b"GET /health HTTP/1.1\r\nHost: bench\r\n\r\n"
+
+
+def server_command(launcher: str, workers: int, port: int) -> list[str]:
+    if launcher == "uvicorn":
+        return [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--no-access-log",
+        ]
+    return [
+        sys.executable,
+        "-m",
+        "app.server",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+    ]
+
+
+def wait_until_ready(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+def worker_pids(pid: int) -> list[int]:
+    children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+    # uvicorn --workers also starts a multiprocessing resource tracker.
+    return [
+        int(child)
+        for child in children
+        if b"resource_tracker" not in Path(f"/proc/{child}/cmdline").read_bytes()
+    ]
+
+
+def memory_kib(pid: int) -> tuple[int, int]:
+    """Returns (RSS, PSS) of a process in KiB."""
+    values = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value, *_ = line.split()
+        values[name.rstrip(":")] = int(value)
+    return values["Rss"], values["Pss"]
+
+
+def worker_memory(pid: int, attempts: int = 10) -> list[tuple[int, int]]:
+    # uvicorn's supervisor may be replacing a worker that missed a health check.
+    for _ in range(attempts):
+        try:
+            return [memory_kib(worker) for worker in worker_pids(pid)]
+        except (FileNotFoundError, ProcessLookupError):
+            time.sleep(0.5)
+    raise RuntimeError("workers kept restarting")
+
+
+async def _drive_connection(port: int, stop_at: float) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    completed = 0
+    try:
+        while time.monotonic() < stop_at:
+            writer.write(REQUEST)
+            await writer.drain()
+            headers = await reader.readuntil(b"\r\n\r\n")
+            length = next(
+                int(line.split(b":", 1)[1])
+                for line in headers.split(b"\r\n")
+                if line.lower().startswith(b"content-length:")
+            )
+            await reader.readexactly(length)
+            completed += 1
+    finally:
+        writer.close()
+    return completed
+
+
+async def _drive(port: int, connections: int, duration: float) -> int:
+    stop_at = time.monotonic() + duration
+    results = await asyncio.gather(
+        *(_drive_connection(port, stop_at) for _ in range(connections))
+    )
+    return sum(results)
+
+
+def _load_process(port: int, connections: int, duration: float, queue) -> None:
+    queue.put(asyncio.run(_drive(port, connections, duration)))
+
+
+def generate_load(
+    port: int,
+    connections: int,
+    duration: float,
+    processes: int,
+) -> float:
+    queue: multiprocessing.Queue = multiprocessing.Queue()
+    per_process = max(connections // processes, 1)
+    workers = [
+        multiprocessing.Process(
+            target=_load_process,
+            args=(port, per_process, duration, queue),
+        )
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    total = sum(queue.get() for _ in workers)
+    for worker in workers:
+        worker.join()
+    return total / duration
+
+
+def run_launcher(launcher: str, args: argparse.Namespace, database: Path) -> None:
+    env = {
+        **os.environ,
+        "ENV_FILE": os.devnull,
+        "DATABASE_URL": f"sqlite+pysqlite:///{database}",
+        "REDIS_URL": "redis://localhost:6379/0",
+        "RABBITMQ_URL": "memory://",
+        "SYSTEM_METRICS_INTERVAL_SEC": "0",
+        "LOG_LEVEL": "WARNING",
+    }
+    server = subprocess.Popen(
+        server_command(launcher, args.workers, args.port),
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_ready(args.port)
+        # Worker memory after a light warm-up, not right after the fork; full load
+        # can starve uvicorn's worker health checks and get workers replaced.
+        generate_load(args.port, args.workers, 2.0, 1)
+        memory = worker_memory(server.pid)
+        rps = generate_load(
+            args.port,
+            args.connections,
+            args.duration,
+            args.load_processes,
+        )
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    rss = sum(value for value, _ in memory) / len(memory) / 1024
+    pss = sum(value for _, value in memory) / len(memory) / 1024
+    print(
+        f"{launcher:<8} workers={len(memory)} "
+        f"rss/worker={rss:6.1f} MiB pss/worker={pss:6.1f} MiB "
+        f"{rps:8.0f} req/s ({rps / args.workers:.0f} req/s per worker)"
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Compare uvicorn --workers with the preforking app.server."
+    )
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--load-processes", type=int, default=2)
+    parser.add_argument(
+        "--launcher",
+        choices=("uvicorn", "prefork"),
+        action="append",
+        help="Launcher to measure; defaults to both.",
+    )
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+
+    print("API server benchmark")
+    print("====================")
+    print(f"CPUs: {os.cpu_count()}, duration: {args.duration}s")
+    with tempfile.TemporaryDirectory() as directory:
+        for launcher in args.launcher or ("uvicorn", "prefork"):
+            run_launcher(launcher, args, Path(directory) / f"{launcher}.db")
+
+
+if __name__ == "__main__":
+    main()
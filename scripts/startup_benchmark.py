@@ -0,0 +1,114 @@
+"""Measure API cold-start time.
+
+Reports, for a fresh interpreter each run:
+
+- ``import``: time to ``import app.main``;
+- ``first request``: time from starting ``python -m app.server --workers 1`` until
+  ``GET /health`` first succeeds, as seen by a pod during HPA scale-out.
+
+The database is a temporary SQLite file, bootstrapped once before the runs.
+
+Examples:
+    python scripts/startup_benchmark.py
+    python scripts/startup_benchmark.py --runs 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def measure_import(env: dict[str, str]) -> float:
+    code = "import time; s = time.perf_counter(); import app.main; print(time.perf_counter() - s)"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure_first_request(
+    env: dict[str, str], port: int, timeout: float = 30.0
+) -> float:
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", "1", "--port", str(port)],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                urllib.request.urlopen(
+                    f"http://127.0.0.1:{port}/health", timeout=1
+                ).read()
+                return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("server did not become ready")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Measure API cold-start time.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            **os.environ,
+            "ENV_FILE": os.devnull,
+            "DATABASE_URL": f"sqlite+pysqlite:///{Path(directory) / 'startup.db'}",
+            "REDIS_URL": "redis://localhost:6379/0",
+            "RABBITMQ_URL": "memory://",
+            "SYSTEM_METRICS_INTERVAL_SEC": "0",
+            "LOG_LEVEL": "WARNING",
+        }
+        subprocess.run(
+            [sys.executable, "-m", "app.db.bootstrap"],
+            cwd=PROJECT_ROOT,
+            env=env,
+            capture_output=True,
+            check=True,
+        )
+
+        imports = [measure_import(env) for _ in range(args.runs)]
+        first_requests = [
+            measure_first_request(env, args.port) for _ in range(args.runs)
+        ]
+
+    print("API startup benchmark")
+    print("=====================")
+    print(f"Runs: {args.runs}")
+    for name, samples in (("import", imports), ("first request", first_requests)):
+        print(
+            f"{name:<14} median {statistics.median(samples) * 1000:7.1f} ms "
+            f"(min {min(samples) * 1000:.1f}, max {max(samples) * 1000:.1f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.core.celery_app import celery_app
+from app.core.metrics.db.instrumentation import register_db_metrics
+from app.db.bootstrap import bootstrap_schema
 from app.db.models import Base, User, Wallet
 from app.db.session import get_db
 from app.main import app
@@ -41,14 +43,24 @@ celery_app.conf.update(
 )
 
 
+@pytest.fixture(scope="session", autouse=True)
+def app_schema():
+    # The app engine's schema is created the way a deploy does it, not on import.
+    bootstrap_schema()
+
+
 @pytest.fixture()
 def engine():
-    return create_engine(
+    engine = create_engine(
         "sqlite+pysqlite:///:memory:",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
         future=True,
     )
+    # Counts statements per request, so the query budget in .env.test is
+    # enforced on every route the tests hit.
+    register_db_metrics(engine)
+    return engine
 
 
 @pytest.fixture()
@@ -0,0 +1,173 @@
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+import app.usecases.transfers as transfers_usecase
+from app.api.routes import build_router
+from app.db.async_session import async_database_url, get_async_db
+from app.db.models import Base, Transaction, User, Wallet
+from app.idempotency import AsyncIdempotencyManager
+from app.main import app as main_app
+
+
+class AsyncFakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+        return 1
+
+
+@pytest.fixture()
+def database_path(tmp_path):
+    path = tmp_path / "async.db"
+    engine = create_engine(f"sqlite+pysqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    yield path
+    engine.dispose()
+
+
+@pytest.fixture()
+def async_client(database_path):
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+    session_local = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with session_local() as db:
+            yield db
+
+    test_app = FastAPI()
+    test_app.include_router(build_router(async_db=True))
+    test_app.exception_handlers.update(main_app.exception_handlers)
+    test_app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(test_app) as client:
+        yield client
+        client.portal.call(async_engine.dispose)
+
+
+@pytest.fixture()
+def async_wallets(database_path):
+    engine = create_engine(f"sqlite+pysqlite:///{database_path}")
+    with Session(engine, expire_on_commit=False) as db:
+        users = [User(), User()]
+        db.add_all(users)
+        db.flush()
+        wallets = [
+            Wallet(user_id=users[0].id, balance=Decimal("1000.00")),
+            Wallet(user_id=users[1].id, balance=Decimal("0.00")),
+        ]
+        db.add_all(wallets)
+        db.commit()
+    yield wallets
+    engine.dispose()
+
+
+def _database_totals(database_path, wallet_ids):
+    engine = create_engine(f"sqlite+pysqlite:///{database_path}")
+    try:
+        with Session(engine) as db:
+            count = db.execute(select(func.count(Transaction.id))).scalar_one()
+            balances = [db.get(Wallet, wallet_id).balance for wallet_id in wallet_ids]
+        return count, balances
+    finally:
+        engine.dispose()
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("postgresql://u:p@db/app", "postgresql+psycopg://u:p@db/app"),
+        ("postgresql+psycopg://u:p@db/app", "postgresql+psycopg://u:p@db/app"),
+        ("sqlite:///./app.db", "sqlite+aiosqlite:///./app.db"),
+        ("sqlite+pysqlite:///:memory:", "sqlite+aiosqlite:///:memory:"),
+    ],
+)
+def test_async_database_url_uses_asyncio_driver(url, expected):
+    assert async_database_url(url) == expected
+
+
+def test_async_routes_create_and_read_user(async_client):
+    created = async_client.post("/users")
+    user_id = created.json()["id"]
+    fetched = async_client.get(f"/users/{user_id}")
+    wallet = async_client.get(f"/wallets/{fetched.json()['wallet']['id']}")
+
+    assert created.status_code == 200
+    assert created.json()["wallet"]["balance"] == 100.0
+    assert fetched.status_code == 200
+    assert fetched.json()["wallet"]["balance"] == 100.0
+    assert wallet.json()["user_id"] == user_id
+
+
+def test_async_routes_map_service_errors(async_client):
+    missing_user = async_client.get("/users/999")
+    missing_wallet = async_client.get("/wallets/999")
+
+    assert missing_user.status_code == 404
+    assert missing_wallet.status_code == 404
+
+
+def test_async_transfer_is_idempotent(
+    async_client, async_wallets, database_path, monkeypatch
+):
+    redis = AsyncFakeRedis()
+    monkeypatch.setattr(
+        transfers_usecase,
+        "get_async_idempotency_manager",
+        lambda: AsyncIdempotencyManager(redis),
+    )
+    monkeypatch.setattr(
+        transfers_usecase, "enqueue_transfer_notification", lambda *args: None
+    )
+    w1, w2 = async_wallets
+    params = {"from_wallet_id": w1.id, "to_wallet_id": w2.id, "amount": "10.00"}
+
+    first = async_client.post(
+        "/transfers", params=params, headers={"Idempotency-Key": "async-1"}
+    )
+    replay = async_client.post(
+        "/transfers", params=params, headers={"Idempotency-Key": "async-1"}
+    )
+
+    assert first.status_code == 200
+    assert replay.status_code == 409
+    assert _database_totals(database_path, [w1.id, w2.id]) == (
+        1,
+        [Decimal("990.00"), Decimal("10.00")],
+    )
+
+
+def test_async_transfer_rejects_insufficient_funds(
+    async_client, async_wallets, database_path, monkeypatch
+):
+    monkeypatch.setattr(
+        transfers_usecase,
+        "get_async_idempotency_manager",
+        lambda: AsyncIdempotencyManager(AsyncFakeRedis()),
+    )
+    w1, w2 = async_wallets
+
+    response = async_client.post(
+        "/transfers",
+        params={"from_wallet_id": w2.id, "to_wallet_id": w1.id, "amount": "5.00"},
+        headers={"Idempotency-Key": "async-2"},
+    )
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Insufficient funds"
+    assert _database_totals(database_path, [w1.id, w2.id])[0] == 0
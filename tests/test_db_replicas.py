@@ -0,0 +1,141 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.db.session as db_session
+from app.cache import Cache
+from app.db.models import Base, User, Wallet
+from app.idempotency import IdempotencyManager
+from app.usecases import replicas
+from app.usecases import transfers as transfers_usecase
+from app.usecases import users as users_usecase
+from app.usecases import wallets as wallets_usecase
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return False
+        self.data[key] = value
+        self.expiry[key] = ex
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+        return 1
+
+    def exists(self, key):
+        return int(key in self.data)
+
+
+@pytest.fixture()
+def redis_client(monkeypatch):
+    client = FakeRedis()
+    for module in (replicas, wallets_usecase):
+        monkeypatch.setattr(module, "get_cache", lambda: Cache(client))
+    return client
+
+
+@pytest.fixture()
+def replica(monkeypatch):
+    """A second database standing in for a replica that lags behind the primary."""
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    session_local = sessionmaker(bind=engine, autoflush=False)
+
+    with session_local() as db:
+        user = User(id=1)
+        db.add(user)
+        db.flush()
+        db.add(Wallet(id=1, user_id=user.id, balance=Decimal("1.00")))
+        db.commit()
+
+    monkeypatch.setattr(db_session, "has_replicas", lambda: True)
+    monkeypatch.setattr(db_session, "replica_session", session_local)
+    yield session_local
+    engine.dispose()
+
+
+@pytest.fixture()
+def primary_wallet(db):
+    user = User(id=1)
+    db.add(user)
+    db.flush()
+    wallet = Wallet(id=1, user_id=user.id, balance=Decimal("500.00"))
+    db.add(wallet)
+    db.commit()
+    return wallet
+
+
+def test_reads_stay_on_primary_without_replicas(redis_client):
+    assert replicas.read_from_replica("wallet", 1) is False
+
+
+def test_reads_stay_on_primary_when_redis_is_unavailable(monkeypatch, replica):
+    monkeypatch.setattr(replicas, "get_cache", lambda: Cache(None))
+
+    assert replicas.read_from_replica("wallet", 1) is False
+
+
+def test_wallet_read_goes_to_replica(db, primary_wallet, replica, redis_client):
+    result = wallets_usecase.get_wallet_cached(db, 1)
+
+    assert result["balance"] == "1.00"
+
+
+def test_wallet_read_after_own_write_goes_to_primary(
+    db, primary_wallet, replica, redis_client
+):
+    replicas.remember_writes(wallet_ids=[1])
+
+    result = wallets_usecase.get_wallet_cached(db, 1)
+
+    assert result["balance"] == "500.00"
+    assert redis_client.expiry["recent_write:wallet:1"] == (
+        replicas.settings.DB_READ_YOUR_WRITES_SEC
+    )
+
+
+def test_user_read_from_replica_loads_wallet(db, replica, redis_client):
+    user = users_usecase.get_user(db, 1)
+
+    assert user.wallet.balance == Decimal("1.00")
+
+
+def test_transfer_pins_both_wallets_and_users_to_primary(
+    db, seeded_wallets, replica, redis_client, monkeypatch
+):
+    monkeypatch.setattr(
+        transfers_usecase, "enqueue_transfer_notification", lambda *args: None
+    )
+    monkeypatch.setattr(
+        transfers_usecase,
+        "get_idempotency_manager",
+        lambda: IdempotencyManager(redis_client),
+    )
+    w1, w2 = seeded_wallets
+
+    transfers_usecase.create_transfer_idempotent(
+        db, w1.id, w2.id, Decimal("10.00"), "replica-key"
+    )
+
+    assert {
+        f"recent_write:wallet:{w1.id}",
+        f"recent_write:wallet:{w2.id}",
+        f"recent_write:user:{w1.user_id}",
+        f"recent_write:user:{w2.user_id}",
+    } <= set(redis_client.data)
@@ -0,0 +1,123 @@
+import sqlite3
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from app.core.metrics.collectors import (
+    DB_POOL_CHECKED_OUT_CONNECTIONS,
+    DB_POOL_CHECKOUT_WAIT_SECONDS,
+    DB_POOL_CONNECT_SECONDS,
+    DB_POOL_CONNECTION_EVENTS_TOTAL,
+    DB_POOL_OVERFLOW_CONNECTIONS,
+)
+from app.core.metrics.db.instrumentation import instrument_engine
+from app.core.settings import settings
+from app.db.pool import TimedAsyncQueuePool, TimedQueuePool
+from app.db.session import engine_options
+
+POSTGRES_URL = "postgresql+psycopg://postgres:postgres@db:5432/transfer_db"
+
+
+def test_engine_options_apply_pool_settings():
+    config = settings.model_copy(
+        update={
+            "DB_POOL_SIZE": 20,
+            "DB_MAX_OVERFLOW": 5,
+            "DB_POOL_TIMEOUT_SEC": 2.5,
+            "DB_POOL_RECYCLE_SEC": 600,
+            "DB_POOL_PRE_PING": False,
+        }
+    )
+
+    assert engine_options(POSTGRES_URL, config) == {
+        "poolclass": TimedQueuePool,
+        "pool_pre_ping": False,
+        "pool_size": 20,
+        "max_overflow": 5,
+        "pool_timeout": 2.5,
+        "pool_recycle": 600,
+    }
+
+
+def test_engine_options_use_async_adapted_pool_for_async_engine():
+    options = engine_options(POSTGRES_URL, is_async=True)
+
+    assert options["poolclass"] is TimedAsyncQueuePool
+
+
+def test_engine_options_pgbouncer_mode_disables_prepared_statements():
+    config = settings.model_copy(
+        update={"DB_PGBOUNCER_MODE": True, "DB_NULL_POOL": True}
+    )
+
+    options = engine_options(POSTGRES_URL, config)
+
+    assert options["connect_args"] == {"prepare_threshold": None}
+    assert options["poolclass"] is NullPool
+    assert "pool_size" not in options
+
+
+def test_engine_options_skip_pool_sizing_for_sqlite():
+    assert engine_options("sqlite+pysqlite:///:memory:") == {
+        "connect_args": {"check_same_thread": False}
+    }
+
+
+def _count(histogram, **labels):
+    return sum(bucket.get() for bucket in histogram.labels(**labels)._buckets)
+
+
+def test_pool_metrics_track_checkouts_wait_and_churn(tmp_path):
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+    )
+    instrument_engine(engine, "test")
+    checked_out = DB_POOL_CHECKED_OUT_CONNECTIONS.labels(pool="test")
+    waits_before = _count(DB_POOL_CHECKOUT_WAIT_SECONDS, pool="test")
+
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("select 1"))
+        second.execute(text("select 1"))
+        assert checked_out._value.get() == 2
+        assert DB_POOL_OVERFLOW_CONNECTIONS.labels(pool="test")._value.get() == 1
+
+    engine.dispose()
+
+    assert checked_out._value.get() == 0
+    assert _count(DB_POOL_CHECKOUT_WAIT_SECONDS, pool="test") == waits_before + 2
+    assert (
+        DB_POOL_CONNECTION_EVENTS_TOTAL.labels(
+            pool="test", event="connect"
+        )._value.get()
+        == 2
+    )
+    assert (
+        DB_POOL_CONNECTION_EVENTS_TOTAL.labels(pool="test", event="close")._value.get()
+        >= 1
+    )
+
+
+def test_pool_checkout_wait_excludes_connect_time():
+    def slow_connect():
+        time.sleep(0.05)
+        return sqlite3.connect(":memory:", check_same_thread=False)
+
+    engine = create_engine(
+        "sqlite+pysqlite://",
+        creator=slow_connect,
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    instrument_engine(engine, "slow-connect")
+
+    with engine.connect() as connection:
+        connection.execute(text("select 1"))
+    engine.dispose()
+
+    assert DB_POOL_CHECKOUT_WAIT_SECONDS.labels(pool="slow-connect")._sum.get() < 0.05
+    assert DB_POOL_CONNECT_SECONDS.labels(pool="slow-connect")._sum.get() >= 0.05
@@ -0,0 +1,249 @@
+import json
+
+import pytest
+
+from app.core.celery_app import BULK_PRIORITY, BULK_QUEUE, celery_app
+from app.tasks import notifications
+from app.tasks.dead_letter import (
+    DEAD_LETTER_KEY,
+    REPLAYING_KEY,
+    DeadLetterQueue,
+    _publish,
+    replay_dead_letters,
+)
+
+
+class FakeListRedis:
+    def __init__(self):
+        self.lists: dict[str, list[str]] = {}
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(values)
+        return len(self.lists[key])
+
+    def lpush(self, key, *values):
+        for value in values:
+            self.lists.setdefault(key, []).insert(0, value)
+        return len(self.lists[key])
+
+    def ltrim(self, key, start, end):
+        items = self.lists.get(key, [])
+        end = len(items) if end == -1 else end + 1
+        self.lists[key] = items[start:end] if start >= 0 else items[start:]
+        return True
+
+    def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def lrange(self, key, start, end):
+        return self.lists.get(key, [])[start : end + 1]
+
+    def lmove(self, source, destination, src="LEFT", dest="RIGHT"):
+        items = self.lists.get(source, [])
+        if not items:
+            return None
+        value = items.pop(0 if src == "LEFT" else -1)
+        target = self.lists.setdefault(destination, [])
+        target.insert(0 if dest == "LEFT" else len(target), value)
+        return value
+
+    def lrem(self, key, count, value):
+        items = self.lists.get(key, [])
+        if value in items:
+            items.remove(value)
+            return 1
+        return 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self._client = client
+        self._calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        return [
+            getattr(self._client, name)(*args, **kwargs)
+            for name, args, kwargs in self._calls
+        ]
+
+
+@pytest.fixture()
+def dead_letters(monkeypatch):
+    queue = DeadLetterQueue(FakeListRedis(), max_size=100)
+    monkeypatch.setattr(notifications, "get_dead_letter_queue", lambda: queue)
+    return queue
+
+
+def _fill(queue, count):
+    for transfer_id in range(count):
+        queue.push(
+            "app.tasks.notifications.send_transaction_notification",
+            [transfer_id, None, 7, "fp"],
+            {},
+            "RuntimeError: down",
+        )
+
+
+def test_notification_exhausting_retries_is_dead_lettered(dead_letters, monkeypatch):
+    attempts = []
+
+    def failing_deliver(event, user_id):
+        attempts.append(event["transfer_id"])
+        raise RuntimeError("downstream unavailable")
+
+    monkeypatch.setattr(notifications, "_deliver", failing_deliver)
+
+    result = notifications.send_transaction_notification.apply(
+        args=(42, "req-1", 7, "fp"), retries=5, throw=False
+    )
+
+    entries = dead_letters.peek(10)
+    assert result.failed()
+    assert attempts == [42]
+    assert len(entries) == 1
+    assert entries[0]["task"] == "app.tasks.notifications.send_transaction_notification"
+    assert entries[0]["args"] == [42, "req-1", 7, "fp"]
+    assert entries[0]["reason"] == "RuntimeError: downstream unavailable"
+
+
+def test_dead_letter_queue_keeps_newest_entries_up_to_max_size():
+    queue = DeadLetterQueue(FakeListRedis(), max_size=3)
+
+    _fill(queue, 5)
+
+    assert queue.size() == 3
+    assert [entry["args"][0] for entry in queue.peek(10)] == [2, 3, 4]
+
+
+def test_replay_publishes_oldest_first_in_rate_limited_batches(dead_letters):
+    _fill(dead_letters, 5)
+    published = []
+    sleeps = []
+
+    replayed = replay_dead_letters(
+        dead_letters,
+        batch_size=2,
+        rate=10.0,
+        publish=lambda task, args, kwargs: published.append(args[0]),
+        sleep=sleeps.append,
+    )
+
+    assert replayed == 5
+    assert published == [0, 1, 2, 3, 4]
+    assert dead_letters.size() == 0
+    assert len(sleeps) == 3
+    assert all(0 < delay <= 0.2 for delay in sleeps)
+
+
+def test_replay_respects_limit(dead_letters):
+    _fill(dead_letters, 5)
+
+    replayed = replay_dead_letters(
+        dead_letters,
+        batch_size=10,
+        rate=1000.0,
+        limit=3,
+        publish=lambda *args: None,
+        sleep=lambda _delay: None,
+    )
+
+    assert replayed == 3
+    assert dead_letters.size() == 2
+
+
+def test_replay_stops_and_requeues_on_publish_failure(dead_letters):
+    _fill(dead_letters, 4)
+    published = []
+
+    def flaky_publish(task, args, kwargs):
+        if args[0] == 2:
+            raise ConnectionError("broker unavailable")
+        published.append(args[0])
+
+    replayed = replay_dead_letters(
+        dead_letters,
+        batch_size=10,
+        rate=1000.0,
+        publish=flaky_publish,
+        sleep=lambda _delay: None,
+    )
+
+    assert replayed == 2
+    assert published == [0, 1]
+    assert [entry["args"][0] for entry in dead_letters.peek(10)] == [2, 3]
+
+
+def test_replay_requeues_unpublished_entries_when_interrupted(dead_letters):
+    _fill(dead_letters, 4)
+
+    def interrupted_publish(task, args, kwargs):
+        if args[0] == 1:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        replay_dead_letters(
+            dead_letters,
+            batch_size=10,
+            rate=1000.0,
+            publish=interrupted_publish,
+            sleep=lambda _delay: None,
+        )
+
+    assert [entry["args"][0] for entry in dead_letters.peek(10)] == [1, 2, 3]
+    assert dead_letters._client.llen(REPLAYING_KEY) == 0
+
+
+def test_replay_first_restores_entries_left_by_a_killed_replay(dead_letters):
+    _fill(dead_letters, 3)
+    dead_letters.claim_batch(2)
+    published = []
+
+    replay_dead_letters(
+        dead_letters,
+        batch_size=10,
+        rate=1000.0,
+        publish=lambda task, args, kwargs: published.append(args[0]),
+        sleep=lambda _delay: None,
+    )
+
+    assert published == [0, 1, 2]
+    assert dead_letters._client.llen(REPLAYING_KEY) == 0
+
+
+def test_dead_letter_entries_are_json(dead_letters):
+    _fill(dead_letters, 1)
+
+    raw = dead_letters._client.lists[DEAD_LETTER_KEY][0]
+
+    assert json.loads(raw)["failed_at"]
+
+
+def test_replayed_tasks_are_published_to_bulk_queue(monkeypatch):
+    sent = []
+    monkeypatch.setattr(
+        celery_app, "send_task", lambda name, **options: sent.append((name, options))
+    )
+
+    _publish("app.tasks.notifications.send_transaction_notification", [1], {})
+
+    assert sent == [
+        (
+            "app.tasks.notifications.send_transaction_notification",
+            {
+                "args": [1],
+                "kwargs": {},
+                "queue": BULK_QUEUE,
+                "priority": BULK_PRIORITY,
+            },
+        )
+    ]
@@ -1,24 +1,44 @@
+import io
 import json
 import logging
+import logging.handlers
+import queue
+import subprocess
 import sys
+import threading
 from datetime import datetime, timezone
 from decimal import Decimal
+from pathlib import Path
 
+from app.core import logging as app_logging
 from app.core.celery_app import celery_app
-from app.core.logging import JsonFormatter, RequestIDFilter
+from app.core.logging import (
+    BoundedQueueHandler,
+    JsonFormatter,
+    LogVolumeFilter,
+    RequestIDFilter,
+)
+from app.core.metrics.collectors import LOG_RECORDS_DROPPED_TOTAL
 from app.core.request_context import request_id_ctx
 
 
-def _record(message: str = "test_event") -> logging.LogRecord:
-    return logging.LogRecord(
+def _record(
+    message: str = "test_event",
+    level: int = logging.INFO,
+    **extra_fields,
+) -> logging.LogRecord:
+    record = logging.LogRecord(
         name="app.test",
-        level=logging.INFO,
+        level=level,
         pathname=__file__,
         lineno=1,
         msg=message,
         args=(),
         exc_info=None,
     )
+    if extra_fields:
+        record.extra_fields = extra_fields
+    return record
 
 
 def test_json_formatter_includes_request_id_and_extra_fields():
@@ -72,6 +92,33 @@ def test_json_formatter_stringifies_non_serializable_extra_fields():
     assert payload["model"] == "ExampleModel(id=7)"
 
 
+def test_json_formatter_uses_record_creation_time():
+    formatter = JsonFormatter()
+    record = _record()
+    record.created = datetime(2026, 7, 31, 12, 30, 5, 500_000, timezone.utc).timestamp()
+    later = _record()
+    later.created = datetime(2026, 7, 31, 12, 30, 6, tzinfo=timezone.utc).timestamp()
+
+    assert json.loads(formatter.format(record))["timestamp"] == (
+        "2026-07-31T12:30:05.500000+00:00"
+    )
+    assert json.loads(formatter.format(later))["timestamp"] == (
+        "2026-07-31T12:30:06.000000+00:00"
+    )
+
+
+def test_json_encoders_produce_identical_output():
+    log_data = {
+        "message": "transfer_created",
+        "amount": Decimal("10.25"),
+        "created_at": datetime(2026, 7, 31, 12, 30, tzinfo=timezone.utc),
+        "note": "грн",
+        "large": 2**70,
+    }
+
+    assert app_logging._dumps(log_data) == app_logging._dumps_stdlib(log_data)
+
+
 def test_json_formatter_includes_concrete_exception_details():
     record = _record("operation_failed")
     try:
@@ -86,6 +133,184 @@ def test_json_formatter_includes_concrete_exception_details():
     assert "ValueError: invalid value" in payload["exception"]
 
 
+def test_queue_handler_formats_records_on_listener_thread():
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter())
+    handler = BoundedQueueHandler(queue.Queue(maxsize=10))
+    handler.addFilter(RequestIDFilter())
+    listener = logging.handlers.QueueListener(handler.queue, output)
+    logger = logging.getLogger("app.test.queue")
+    logger.propagate = False
+    logger.addHandler(handler)
+    listener.start()
+
+    token = request_id_ctx.set("request-456")
+    try:
+        logger.warning(
+            "transfer_%s",
+            "failed",
+            extra={"extra_fields": {"transfer_id": 7}},
+        )
+    finally:
+        request_id_ctx.reset(token)
+        listener.stop()
+        logger.removeHandler(handler)
+        logger.propagate = True
+
+    payload = json.loads(stream.getvalue())
+    assert payload["message"] == "transfer_failed"
+    assert payload["request_id"] == "request-456"
+    assert payload["transfer_id"] == 7
+
+
+def test_shutdown_logging_writes_queued_records_before_os_exit():
+    # Forked server workers end with os._exit, which skips atexit handlers.
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import logging, os; "
+            "from app.core.logging import setup_logging, shutdown_logging; "
+            "setup_logging(); "
+            "logging.getLogger('app.server').error('server_worker_failed'); "
+            "shutdown_logging(); "
+            "os._exit(1)",
+        ],
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 1
+    assert json.loads(result.stdout)["message"] == "server_worker_failed"
+
+
+def test_queue_handler_drops_and_counts_records_when_full():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1))
+    dropped = LOG_RECORDS_DROPPED_TOTAL.labels(level="INFO")
+    before = dropped._value.get()
+
+    handler.handle(_record("first"))
+    handler.handle(_record("second"))
+
+    assert handler.queue.qsize() == 1
+    assert handler.queue.get_nowait().msg == "first"
+    assert dropped._value.get() == before + 1
+
+
+def test_queue_handler_blocks_when_full_with_block_policy():
+    log_queue: queue.Queue = queue.Queue(maxsize=1)
+    handler = BoundedQueueHandler(log_queue, block_on_full=True)
+    handler.handle(_record("first"))
+
+    released = []
+    waiter = threading.Thread(
+        target=lambda: (handler.handle(_record("second")), released.append(True))
+    )
+    waiter.start()
+    waiter.join(timeout=0.1)
+    assert not released
+
+    assert log_queue.get().msg == "first"
+    waiter.join(timeout=1)
+    assert released
+    assert log_queue.get_nowait().msg == "second"
+
+
+def _volume_filter(sample: float = 0.5, clock=lambda: 0.0) -> LogVolumeFilter:
+    return LogVolumeFilter(
+        sample_rates={"http_request_completed": 0.01},
+        slow_ms=1000.0,
+        rate_limited_events={"redis_get_failed", "redis_set_failed"},
+        rate_per_sec=1.0,
+        burst=2,
+        clock=clock,
+        sample=lambda: sample,
+    )
+
+
+def test_volume_filter_samples_successful_requests():
+    record = _record("http_request_completed", status=200, duration_ms=5.0)
+
+    assert _volume_filter(sample=0.5).filter(record) is False
+    assert _volume_filter(sample=0.001).filter(record) is True
+    assert _volume_filter(sample=0.5).filter(_record("transfer_created")) is True
+
+
+def test_volume_filter_keeps_error_and_slow_requests():
+    log_filter = _volume_filter(sample=0.99)
+
+    assert log_filter.filter(
+        _record("http_request_completed", status=503, duration_ms=5.0)
+    )
+    assert log_filter.filter(
+        _record("http_request_completed", status=200, duration_ms=1500.0)
+    )
+
+
+def test_volume_filter_rate_limits_repeated_warnings():
+    now = [0.0]
+    log_filter = _volume_filter(clock=lambda: now[0])
+
+    def warning():
+        return _record("redis_get_failed", logging.WARNING, key="wallet:1")
+
+    assert [log_filter.filter(warning()) for _ in range(4)] == [
+        True,
+        True,
+        False,
+        False,
+    ]
+    assert log_filter.filter(_record("redis_set_failed", logging.WARNING))
+
+    now[0] = 1.0
+    record = warning()
+    assert log_filter.filter(record) is True
+    assert record.extra_fields == {"key": "wallet:1", "suppressed": 2}
+    assert log_filter.filter(warning()) is False
+
+
+def test_volume_filter_keeps_warnings_that_are_not_rate_limited():
+    log_filter = _volume_filter()
+
+    assert all(
+        log_filter.filter(_record(event, logging.WARNING))
+        for event in ("slow_query", "notification_dead_lettered")
+        for _ in range(5)
+    )
+
+
+def test_volume_filter_never_drops_errors():
+    log_filter = _volume_filter()
+
+    assert all(
+        log_filter.filter(_record("unhandled_exception", level))
+        for level in (logging.ERROR, logging.CRITICAL)
+        for _ in range(5)
+    )
+
+
+def test_volume_filter_evicts_least_recently_used_buckets():
+    log_filter = LogVolumeFilter(
+        sample_rates={},
+        slow_ms=1000.0,
+        rate_limited_events={"first", "second", "third"},
+        rate_per_sec=1.0,
+        burst=1,
+        max_buckets=2,
+    )
+
+    def warning(message):
+        return log_filter.filter(_record(message, logging.WARNING))
+
+    assert warning("first") and warning("second")
+    assert not warning("first")
+    assert warning("third")
+
+    assert list(log_filter._buckets) == [("app.test", "first"), ("app.test", "third")]
+
+
 def test_celery_preserves_root_logger_configuration():
     assert celery_app.conf.worker_hijack_root_logger is False
 
@@ -1,12 +1,29 @@
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from pathlib import Path
 
+import pytest
+from redis import Redis
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker
 
 import app.core.metrics as metrics
 import app.db.session as db_session
+from app.cache import TimedRedis
+from app.core.celery_app import stamp_enqueued_at, track_received_task
 from app.core.metrics import system as system_metrics
+from app.core.metrics import tasks as task_metrics
+from app.core.metrics.periodic import PeriodicTask
+from app.core.request_context import RequestTimings, request_timings_ctx
+from app.core.settings import settings
 from app.db.models import Transaction, User, Wallet
+from app.tasks import notifications
 
 
 def test_refresh_system_metrics_collects_real_totals(monkeypatch, engine, tables):
@@ -48,6 +65,7 @@ def test_refresh_system_metrics_collects_real_totals(monkeypatch, engine, tables
         )
         db.commit()
 
+    system_metrics.LEDGER_BALANCE.reset()
     metrics.refresh_system_metrics()
 
     assert metrics.WALLET_COUNT._value.get() == 3
@@ -78,3 +96,357 @@ def test_refresh_system_metrics_logs_database_error(monkeypatch, caplog):
     assert record.exc_info is not None
     assert record.exc_info[0] is SQLAlchemyError
     assert str(record.exc_info[1]) == "metrics database unavailable"
+
+
+def test_ledger_balance_adds_only_new_wallets_between_reconciles(db):
+    ledger = system_metrics.LedgerBalance(reconcile_interval=60, overlap=300)
+    first_user, second_user = User(), User()
+    db.add_all([first_user, second_user])
+    db.flush()
+    db.add(Wallet(user_id=first_user.id, balance=Decimal("100.00")))
+    db.commit()
+
+    assert ledger.refresh(db, now=0) == Decimal("100.00")
+
+    db.add(Wallet(user_id=second_user.id, balance=Decimal("50.00")))
+    db.commit()
+    assert ledger.refresh(db, now=10) == Decimal("150.00")
+    assert ledger.refresh(db, now=20) == Decimal("150.00")
+
+    # Only a full reconcile sees a balance changed outside of transfers.
+    db.query(Wallet).update({Wallet.balance: Decimal("1.00")})
+    db.commit()
+    assert ledger.refresh(db, now=30) == Decimal("150.00")
+    assert ledger.refresh(db, now=61) == Decimal("2.00")
+
+
+def test_ledger_balance_counts_wallets_committed_late_once(db):
+    ledger = system_metrics.LedgerBalance(reconcile_interval=3600, overlap=300)
+    users = [User() for _ in range(3)]
+    db.add_all(users)
+    db.flush()
+    started = datetime(2026, 1, 1, 12, 0)
+    db.add(
+        Wallet(
+            id=1000,
+            user_id=users[0].id,
+            balance=Decimal("100.00"),
+            created_at=started + timedelta(minutes=10),
+        )
+    )
+    db.commit()
+    assert ledger.refresh(db, now=0) == Decimal("100.00")
+
+    # Its ID and transaction came before the newest wallet's, but it committed
+    # after it.
+    db.add(
+        Wallet(
+            id=500,
+            user_id=users[1].id,
+            balance=Decimal("50.00"),
+            created_at=started + timedelta(minutes=8),
+        )
+    )
+    db.commit()
+    assert ledger.refresh(db, now=10) == Decimal("150.00")
+    assert ledger.refresh(db, now=20) == Decimal("150.00")
+
+    db.add(
+        Wallet(
+            user_id=users[2].id,
+            balance=Decimal("25.00"),
+            created_at=started + timedelta(minutes=30),
+        )
+    )
+    db.commit()
+    assert ledger.refresh(db, now=30) == Decimal("175.00")
+    assert ledger.refresh(db, now=40) == Decimal("175.00")
+
+
+def test_ledger_balance_ignores_transfers_into_new_wallets(db):
+    ledger = system_metrics.LedgerBalance(reconcile_interval=3600, overlap=300)
+    first_user, second_user = User(), User()
+    db.add_all([first_user, second_user])
+    db.flush()
+    old = Wallet(user_id=first_user.id, balance=Decimal("100.00"))
+    db.add(old)
+    db.commit()
+    assert ledger.refresh(db, now=0) == Decimal("100.00")
+
+    new = Wallet(user_id=second_user.id, balance=Decimal("100.00"))
+    db.add(new)
+    db.flush()
+    old.balance -= Decimal("50.00")
+    new.balance += Decimal("50.00")
+    db.commit()
+
+    assert ledger.refresh(db, now=10) == Decimal("200.00")
+
+
+def test_count_rows_is_exact_outside_postgresql(db):
+    db.add_all([User(), User()])
+    db.commit()
+
+    assert system_metrics.count_rows(db, User) == 2
+
+
+def test_periodic_task_runs_until_stopped():
+    refreshed = threading.Event()
+    calls = []
+
+    def refresh():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("first refresh fails")
+        refreshed.set()
+
+    task = PeriodicTask("test-refresh", interval=0.01, task=refresh)
+    task.start()
+    try:
+        assert refreshed.wait(1)
+    finally:
+        task.stop()
+
+    assert len(calls) >= 2
+
+
+def _sample(histogram, **labels):
+    child = histogram.labels(**labels)
+    return child._sum.get(), sum(bucket.get() for bucket in child._buckets)
+
+
+def test_published_tasks_are_stamped_with_enqueue_time():
+    headers = {"enqueued_at": 1.0}
+
+    stamp_enqueued_at(headers=headers)
+
+    assert abs(headers["enqueued_at"] - time.time()) < 1
+
+
+def test_queue_wait_excludes_countdown():
+    eta = datetime.fromtimestamp(130.0, tz=timezone.utc).isoformat()
+
+    assert task_metrics.queue_wait_seconds(100.0, now=105.0) == 5.0
+    assert task_metrics.queue_wait_seconds(100.0, eta, now=135.0) == 5.0
+    assert task_metrics.queue_wait_seconds(100.0, eta, now=120.0) == 0.0
+
+
+def test_in_flight_tasks_report_oldest_age(monkeypatch):
+    tracker = task_metrics.InFlightTasks()
+    monkeypatch.setattr(task_metrics.time, "time", lambda: 110.0)
+
+    assert tracker.oldest_age() == 0.0
+
+    tracker.add("a", 100.0)
+    tracker.add("b", 105.0)
+    assert tracker.oldest_age() == 10.0
+
+    tracker.discard("a")
+    assert tracker.oldest_age() == 5.0
+
+
+def test_received_task_with_countdown_is_aged_from_its_eta(monkeypatch):
+    tracker = task_metrics.InFlightTasks()
+    monkeypatch.setattr("app.core.celery_app.IN_FLIGHT_TASKS", tracker)
+    monkeypatch.setattr(task_metrics.time, "time", lambda: 120.0)
+    request = type(
+        "Request",
+        (),
+        {
+            "id": "delayed",
+            "request_dict": {task_metrics.ENQUEUED_AT_HEADER: 100.0},
+            "eta": datetime.fromtimestamp(130.0, tz=timezone.utc).isoformat(),
+        },
+    )()
+
+    track_received_task(request=request)
+
+    assert tracker.oldest_age() == 0.0
+
+
+def test_task_execution_records_queue_wait_duration_and_retries(monkeypatch):
+    task = notifications.flush_coalesced_notifications
+    monkeypatch.setattr(
+        notifications,
+        "get_notification_coalescer",
+        lambda: type("Idle", (), {"due_users": lambda self: []})(),
+    )
+    wait_before = _sample(task_metrics.CELERY_TASK_QUEUE_WAIT_SECONDS, task=task.name)
+    duration_before = _sample(
+        task_metrics.CELERY_TASK_DURATION_SECONDS, task=task.name, state="SUCCESS"
+    )
+    retries_before = _sample(task_metrics.CELERY_TASK_RETRIES, task=task.name)
+
+    task.apply(headers={"enqueued_at": time.time() - 3})
+
+    wait_sum, wait_count = _sample(
+        task_metrics.CELERY_TASK_QUEUE_WAIT_SECONDS, task=task.name
+    )
+    assert wait_count == wait_before[1] + 1
+    assert 3 <= wait_sum - wait_before[0] < 4
+    assert (
+        _sample(
+            task_metrics.CELERY_TASK_DURATION_SECONDS, task=task.name, state="SUCCESS"
+        )[1]
+        == duration_before[1] + 1
+    )
+    assert _sample(task_metrics.CELERY_TASK_RETRIES, task=task.name) == (
+        retries_before[0],
+        retries_before[1] + 1,
+    )
+
+
+def test_http_metrics_use_route_template_once_per_request(client, seeded_wallets):
+    labels = {"method": "GET", "path": "/wallets/{wallet_id}", "status": "200"}
+    before = metrics.HTTP_REQUESTS_TOTAL.labels(**labels)._value.get()
+
+    response = client.get(f"/wallets/{seeded_wallets[0].id}")
+
+    assert response.status_code == 200
+    assert metrics.HTTP_REQUESTS_TOTAL.labels(**labels)._value.get() == before + 1
+
+
+def test_unmatched_requests_are_counted_with_request_id_header(client):
+    labels = {"method": "GET", "path": "__unmatched__", "outcome": "client_error"}
+    before = metrics.HTTP_REQUEST_OUTCOMES_TOTAL.labels(**labels)._value.get()
+
+    response = client.get("/missing", headers={"X-Request-ID": "missing-123"})
+
+    assert response.headers["X-Request-ID"] == "missing-123"
+    assert metrics.HTTP_REQUEST_OUTCOMES_TOTAL.labels(**labels)._value.get() == (
+        before + 1
+    )
+
+
+def _server_timing(response) -> dict[str, float]:
+    phases = {}
+    for entry in response.headers["Server-Timing"].split(", "):
+        name, duration = entry.split(";dur=")
+        phases[name] = float(duration)
+    return phases
+
+
+def test_server_timing_breaks_down_request_time(
+    client, db, engine, seeded_wallets, caplog
+):
+    # Force a query instead of an identity map hit.
+    db.expunge_all()
+
+    with caplog.at_level(logging.INFO, logger="app.core.middleware"):
+        response = client.get(f"/wallets/{seeded_wallets[0].id}")
+
+    phases = _server_timing(response)
+    assert response.status_code == 200
+    assert {"db", "app", "total"} <= phases.keys()
+    assert phases["db"] + phases["app"] == pytest.approx(phases["total"], abs=0.01)
+
+    record = next(
+        record
+        for record in caplog.records
+        if record.message == "http_request_completed"
+    )
+    assert record.extra_fields["db_count"] >= 1
+    assert record.extra_fields["db_ms"] >= 0
+
+
+def test_server_timing_header_can_be_disabled(client, monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", False)
+
+    response = client.get("/health")
+
+    assert "Server-Timing" not in response.headers
+
+
+def test_timed_redis_adds_commands_to_request_timings(monkeypatch):
+    monkeypatch.setattr(Redis, "execute_command", lambda self, *args, **kw: "OK")
+    client = TimedRedis()
+    timings = RequestTimings()
+    token = request_timings_ctx.set(timings)
+    try:
+        client.set("key", "value")
+        client.get("key")
+    finally:
+        request_timings_ctx.reset(token)
+
+    assert timings.counts == {"redis": 2}
+    assert timings.breakdown().keys() == {"redis", "app", "total"}
+
+
+def _run_worker(code, multiproc_dir, extra_env=None):
+    env = {
+        **os.environ,
+        "PROMETHEUS_MULTIPROC_DIR": str(multiproc_dir),
+        **(extra_env or {}),
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return result.stdout
+
+
+def test_multiprocess_metrics_merge_worker_processes(tmp_path):
+    # prometheus_client picks multiprocess storage at import, so each worker is
+    # a fresh interpreter sharing the directory.
+    for wallet_count in (3, 5):
+        _run_worker(
+            "from app.core import metrics; "
+            "metrics.TRANSFERS_CREATED_TOTAL.inc(); "
+            f"metrics.WALLET_COUNT.set({wallet_count})",
+            tmp_path,
+        )
+
+    output = _run_worker(
+        "from app.core.metrics.multiprocess import render_metrics; "
+        "print(render_metrics().decode())",
+        tmp_path,
+    )
+
+    assert "transfers_created_total 2.0" in output
+    assert "wallet_count 5.0" in output
+
+
+def test_multiprocess_query_stats_are_merged_at_scrape(tmp_path):
+    env = {"DB_QUERY_STATS_EXPORT_INTERVAL_SEC": "15", "DB_QUERY_STATS_TOP_K": "1"}
+    for duration in (0.1, 0.2):
+        _run_worker(
+            "from app.core.metrics.db.queries import QUERY_STATS, "
+            "publish_query_stats; "
+            f"QUERY_STATS.record('SELECT 1 FROM users', 'select', {duration}, 1); "
+            "QUERY_STATS.record('SELECT 1 FROM wallets', 'select', 0.05, 1); "
+            "publish_query_stats()",
+            tmp_path,
+            env,
+        )
+    # A worker that exited no longer contributes, however slow its queries.
+    _run_worker(
+        "from app.core.metrics.db.queries import QUERY_STATS, "
+        "publish_query_stats; "
+        "from app.core.metrics.multiprocess import mark_worker_exited; "
+        "QUERY_STATS.record('SELECT 1 FROM transactions', 'select', 9.0, 1); "
+        "publish_query_stats(); mark_worker_exited()",
+        tmp_path,
+        env,
+    )
+
+    output = _run_worker(
+        "import app.core.metrics.db.queries; "
+        "from app.core.metrics.multiprocess import render_metrics; "
+        "print(render_metrics().decode())",
+        tmp_path,
+        env,
+    )
+
+    lines = [
+        line
+        for line in output.splitlines()
+        if line.startswith("db_query_fingerprint_calls{")
+    ]
+    assert len(lines) == 1
+    assert lines[0].endswith(" 2.0")
+    assert "db_query_fingerprint_seconds{" in output
+    assert 'operation="select"} 0.3' in output
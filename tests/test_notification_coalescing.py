@@ -0,0 +1,171 @@
+import redis
+
+from app.tasks import coalescing, notifications, transfer_notifications
+from app.tasks.coalescing import PENDING_USERS_KEY, NotificationCoalescer
+
+
+class FakeSortedSetRedis:
+    def __init__(self, fail=False):
+        self.zsets: dict[str, dict[str, float]] = {}
+        self.fail = fail
+
+    def _check(self):
+        if self.fail:
+            raise redis.RedisError("redis unavailable")
+
+    def zadd(self, key, mapping, nx=False):
+        self._check()
+        zset = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if nx and member in zset:
+                continue
+            zset[member] = score
+        return len(mapping)
+
+    def zrangebyscore(self, key, min_score, max_score, start=None, num=None):
+        self._check()
+        members = sorted(
+            (score, member)
+            for member, score in self.zsets.get(key, {}).items()
+            if score <= float(max_score)
+        )
+        return [member for _, member in members][start : start + num]
+
+    def zrange(self, key, start, end):
+        self._check()
+        zset = self.zsets.get(key, {})
+        return [member for member, _ in sorted(zset.items(), key=lambda i: i[1])]
+
+    def zrem(self, key, member):
+        self._check()
+        return int(self.zsets.get(key, {}).pop(member, None) is not None)
+
+    def delete(self, key):
+        self._check()
+        return int(self.zsets.pop(key, None) is not None)
+
+    def expire(self, key, seconds):
+        self._check()
+        return True
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self._client = client
+        self._calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        return [
+            getattr(self._client, name)(*args, **kwargs)
+            for name, args, kwargs in self._calls
+        ]
+
+
+def _age_pending_users(client, seconds):
+    for member in client.zsets[PENDING_USERS_KEY]:
+        client.zsets[PENDING_USERS_KEY][member] -= seconds
+
+
+def test_enqueue_coalesces_notifications_for_the_same_user(monkeypatch):
+    client = FakeSortedSetRedis()
+    coalescer = NotificationCoalescer(client, window=5.0)
+    delayed = []
+    monkeypatch.setattr(
+        transfer_notifications, "get_notification_coalescer", lambda: coalescer
+    )
+    monkeypatch.setattr(
+        transfer_notifications.send_transaction_notification,
+        "delay",
+        lambda *args: delayed.append(args),
+    )
+
+    for transfer_id in (1, 2, 3):
+        transfer_notifications.enqueue_transfer_notification(transfer_id, 7, "fp")
+
+    assert delayed == []
+    assert set(client.zsets[PENDING_USERS_KEY]) == {"7"}
+    assert set(client.zsets["notify:coalesce:user:7"]) == {"1", "2", "3"}
+
+
+def test_enqueue_falls_back_to_immediate_task_when_redis_fails(monkeypatch):
+    coalescer = NotificationCoalescer(FakeSortedSetRedis(fail=True), window=5.0)
+    delayed = []
+    monkeypatch.setattr(
+        transfer_notifications, "get_notification_coalescer", lambda: coalescer
+    )
+    monkeypatch.setattr(
+        transfer_notifications.send_transaction_notification,
+        "delay",
+        lambda *args: delayed.append(args),
+    )
+
+    transfer_notifications.enqueue_transfer_notification(1, 7, "fp")
+
+    assert delayed == [(1, None, 7, "fp")]
+
+
+def test_disabled_coalescer_does_not_hold_notifications():
+    assert NotificationCoalescer(None, window=5.0).add(7, 1) is False
+    assert NotificationCoalescer(FakeSortedSetRedis(), window=0.0).add(7, 1) is False
+
+
+def test_flush_sends_one_digest_per_due_user(monkeypatch):
+    client = FakeSortedSetRedis()
+    coalescer = NotificationCoalescer(client, window=5.0)
+    digests = []
+    monkeypatch.setattr(notifications, "get_notification_coalescer", lambda: coalescer)
+    monkeypatch.setattr(
+        notifications.send_transaction_digest_notification,
+        "delay",
+        lambda *args: digests.append(args),
+    )
+
+    coalescer.add(7, 1)
+    coalescer.add(7, 2)
+    coalescer.add(8, 3)
+    _age_pending_users(client, 10)
+    coalescer.add(9, 4)
+
+    flushed = notifications.flush_coalesced_notifications()
+
+    assert flushed == 2
+    assert sorted(digests) == [(7, [1, 2]), (8, [3])]
+    assert set(client.zsets[PENDING_USERS_KEY]) == {"9"}
+    assert "notify:coalesce:user:7" not in client.zsets
+
+
+def test_digest_notification_delivers_all_transfer_ids(monkeypatch):
+    events = []
+    monkeypatch.setattr(
+        notifications,
+        "_deliver",
+        lambda event, user_id: events.append((event, user_id)),
+    )
+
+    notifications.send_transaction_digest_notification.run(7, [1, 2, 3])
+
+    assert events == [
+        (
+            {"event": "transfer.digest", "user_id": 7, "transfer_ids": [1, 2, 3]},
+            7,
+        )
+    ]
+
+
+def test_coalescer_is_disabled_without_window(monkeypatch):
+    coalescing.get_notification_coalescer.cache_clear()
+    monkeypatch.setattr(coalescing.settings, "NOTIFY_COALESCE_WINDOW_SEC", 0.0)
+    try:
+        assert coalescing.get_notification_coalescer().enabled is False
+    finally:
+        coalescing.get_notification_coalescer.cache_clear()
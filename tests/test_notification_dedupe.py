@@ -0,0 +1,199 @@
+import pytest
+import redis
+
+from app.tasks import dedupe, notifications
+from app.tasks.dedupe import NotificationDedupeStore
+
+
+class FakeDedupeRedis:
+    def __init__(self, fail=False):
+        self.data = {}
+        self.fail = fail
+        self.round_trips = 0
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def delete(self, key):
+        return int(self.data.pop(key, None) is not None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, source):
+        return FakeScript(source)
+
+    def run_script(self, source, keys, args):
+        # Python equivalents of the Lua scripts, which need a real Redis.
+        (key,) = keys
+        value = self.data.get(key)
+        if source == dedupe.RELEASE_SCRIPT:
+            return self.delete(key) if value == args[0] else 0
+        if source == dedupe.MARK_DELIVERED_SCRIPT:
+            if value == args[0] or value is None:
+                self.data[key] = args[1]
+                return 1
+            return 0
+        raise AssertionError("unknown script")
+
+
+class FakeScript:
+    def __init__(self, source):
+        self.source = source
+
+    def __call__(self, keys, args, client):
+        return client.run_script(self.source, keys, args)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self._client = client
+        self._calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        self._client.round_trips += 1
+        if self._client.fail:
+            raise redis.RedisError("redis unavailable")
+        return [
+            getattr(self._client, name)(*args, **kwargs)
+            for name, args, kwargs in self._calls
+        ]
+
+
+@pytest.fixture()
+def dedupe_store(monkeypatch):
+    store = NotificationDedupeStore(FakeDedupeRedis(), ttl=3600, lease=60)
+    monkeypatch.setattr(notifications, "get_notification_dedupe_store", lambda: store)
+    return store
+
+
+@pytest.fixture()
+def delivered_events(monkeypatch):
+    events = []
+    monkeypatch.setattr(
+        notifications,
+        "_deliver",
+        lambda event, user_id: events.append(event),
+    )
+    return events
+
+
+def test_redelivered_notification_is_delivered_once(dedupe_store, delivered_events):
+    notifications.send_transaction_notification.run(42, "request-1", 7, "fp-1")
+    notifications.send_transaction_notification.run(42, "request-1", 7, "fp-1")
+
+    assert [event["transfer_id"] for event in delivered_events] == [42]
+    assert dedupe_store.claim((42, "fp-1"), "other") == "delivered"
+
+
+def test_failed_delivery_releases_claim_for_retry(dedupe_store, monkeypatch):
+    def failing_deliver(event, user_id):
+        raise RuntimeError("downstream unavailable")
+
+    monkeypatch.setattr(notifications, "_deliver", failing_deliver)
+
+    with pytest.raises(RuntimeError):
+        notifications.send_transaction_notification.run(42, None, 7, "fp-1")
+
+    assert dedupe_store.claim((42, "fp-1"), "other") == "claimed"
+
+
+def test_notification_in_progress_elsewhere_is_checked_again_later(
+    dedupe_store, delivered_events, monkeypatch
+):
+    dedupe_store.claim((42, "fp-1"), "other")
+    enqueued = []
+
+    def fake_apply_async(args=None, countdown=None, **_kwargs):
+        enqueued.append((args, countdown))
+
+    def fake_retry(**_kwargs):
+        raise AssertionError("a duplicate must not use up a retry")
+
+    task = notifications.send_transaction_notification
+    monkeypatch.setattr(task, "apply_async", fake_apply_async)
+    monkeypatch.setattr(task, "retry", fake_retry)
+
+    task.run(42, None, 7, "fp-1")
+
+    assert delivered_events == []
+    assert enqueued == [((42, None, 7, "fp-1"), 60)]
+
+
+def test_digest_in_progress_elsewhere_releases_its_claims(
+    dedupe_store, delivered_events, monkeypatch
+):
+    dedupe_store.claim((2, None), "other")
+    enqueued = []
+    task = notifications.send_transaction_digest_notification
+    monkeypatch.setattr(
+        task,
+        "apply_async",
+        lambda args=None, countdown=None, **_kwargs: enqueued.append(args),
+    )
+
+    task.run(7, [1, 2], "request-1")
+
+    assert delivered_events == []
+    assert enqueued == [(7, [1, 2], "request-1")]
+    assert dedupe_store.claim((1, None), "other") == "claimed"
+
+
+def test_digest_skips_already_delivered_transfers(dedupe_store, delivered_events):
+    dedupe_store.claim((2, None), "other")
+    dedupe_store.mark_delivered([(2, None)], "other")
+
+    notifications.send_transaction_digest_notification.run(7, [1, 2, 3])
+    notifications.send_transaction_digest_notification.run(7, [1, 2, 3])
+
+    assert [event["transfer_ids"] for event in delivered_events] == [[1, 3]]
+
+
+def test_expired_claim_cannot_touch_the_claim_that_replaced_it():
+    client = FakeDedupeRedis()
+    store = NotificationDedupeStore(client, ttl=3600, lease=60)
+    store.claim((1, None), "slow")
+    # The slow worker's lease expires and another worker claims the key.
+    client.data.clear()
+    store.claim((1, None), "fast")
+
+    store.release([(1, None)], "slow")
+    assert store.claim((1, None), "third") == "in_progress"
+    store.mark_delivered([(1, None)], "slow")
+    assert client.data == {"notify:sent:1:-": "in_progress:fast"}
+
+    store.mark_delivered([(1, None)], "fast")
+    assert store.claim((1, None), "third") == "delivered"
+
+
+def test_claim_many_checks_all_keys_in_one_round_trip():
+    client = FakeDedupeRedis()
+    store = NotificationDedupeStore(client, ttl=3600, lease=60)
+
+    states = store.claim_many([(1, None), (2, None), (1, None)], "owner")
+
+    assert states == ["claimed", "claimed", "in_progress"]
+    assert client.round_trips == 1
+
+
+def test_dedupe_store_fails_open_when_redis_is_unavailable(caplog):
+    store = NotificationDedupeStore(FakeDedupeRedis(fail=True), ttl=3600, lease=60)
+
+    with caplog.at_level("WARNING"):
+        states = store.claim_many([(1, "fp"), (2, "fp")], "owner")
+
+    assert states == ["claimed", "claimed"]
+    assert any(r.message == "notification_dedupe_failed" for r in caplog.records)
@@ -0,0 +1,490 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.core.celery_app import (
+    BULK_QUEUE,
+    DIGEST_PRIORITY,
+    LEGACY_QUEUE,
+    MAINTENANCE_QUEUE,
+    NOTIFICATIONS_QUEUE,
+    REALTIME_PRIORITY,
+    celery_app,
+)
+from app.core.settings import settings
+from app.db.models import User
+from app.services import webhooks as webhooks_service
+from app.services.webhooks import set_webhook_endpoint
+from app.tasks import delivery, notifications, webhooks
+from app.tasks.delivery import DeliveryEngine, deliver_notification
+from app.tasks.exceptions import CircuitOpenError, NotificationDeliveryError
+from app.tasks.webhooks import (
+    CircuitBreaker,
+    WebhookDispatcher,
+    WebhookEndpointRegistry,
+)
+
+
+class StubWebhookServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, status: int = 204, delay: float = 0.0):
+        self.status = status
+        self.delay = delay
+        self.received: list[dict] = []
+        self.active = 0
+        self.peak_active = 0
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), StubWebhookHandler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/notify"
+
+
+class StubWebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):  # noqa: N802
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        with server.lock:
+            server.received.append(json.loads(self.rfile.read(length)))
+            server.active += 1
+            server.peak_active = max(server.peak_active, server.active)
+        time.sleep(server.delay)
+        with server.lock:
+            server.active -= 1
+        self.send_response(server.status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *_args):
+        return None
+
+
+@pytest.fixture()
+def webhook_server():
+    server = StubWebhookServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture()
+def delivery_engine():
+    engine = DeliveryEngine(concurrency=50, timeout=5.0)
+    yield engine
+    engine.close()
+
+
+def test_delivery_engine_runs_deliveries_concurrently(delivery_engine):
+    async def slow_delivery():
+        await asyncio.sleep(0.1)
+
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=delivery_engine.run, args=(slow_delivery(),))
+        for _ in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert time.perf_counter() - started < 1.0
+
+
+def test_delivery_engine_caps_concurrency():
+    engine = DeliveryEngine(concurrency=2, timeout=5.0)
+    active = 0
+    peak = 0
+
+    async def tracked_delivery():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+
+    try:
+        threads = [
+            threading.Thread(target=engine.run, args=(tracked_delivery(),))
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        engine.close()
+
+    assert peak == 2
+
+
+def test_delivery_engine_times_out_slow_delivery():
+    engine = DeliveryEngine(concurrency=1, timeout=0.05)
+    try:
+        with pytest.raises(NotificationDeliveryError):
+            engine.run(asyncio.sleep(1))
+    finally:
+        engine.close()
+
+
+def test_deliver_notification_posts_payload_to_webhook(delivery_engine, webhook_server):
+    delivery_engine.run(
+        deliver_notification(delivery_engine, {"transfer_id": 42}, webhook_server.url)
+    )
+
+    assert webhook_server.received == [{"events": [{"transfer_id": 42}]}]
+
+
+def test_deliver_notification_raises_on_webhook_error(delivery_engine, webhook_server):
+    webhook_server.status = 503
+
+    with pytest.raises(NotificationDeliveryError):
+        delivery_engine.run(
+            deliver_notification(
+                delivery_engine, {"transfer_id": 42}, webhook_server.url
+            )
+        )
+
+
+def test_notification_task_delivers_to_configured_webhook(
+    monkeypatch, delivery_engine, webhook_server
+):
+    monkeypatch.setattr(notifications, "get_delivery_engine", lambda: delivery_engine)
+    monkeypatch.setattr(
+        notifications, "resolve_webhook_url", lambda user_id: webhook_server.url
+    )
+    monkeypatch.setattr(notifications.random, "random", lambda: 1.0)
+
+    notifications.send_transaction_notification.run(42, "request-1", 7)
+
+    assert webhook_server.received == [
+        {"events": [{"event": "transfer.created", "transfer_id": 42, "user_id": 7}]}
+    ]
+
+
+def test_delivery_engine_is_shared_per_process():
+    assert delivery.get_delivery_engine() is delivery.get_delivery_engine()
+
+
+@pytest.mark.parametrize(
+    ("task", "queue", "priority"),
+    [
+        (
+            notifications.send_transaction_notification,
+            NOTIFICATIONS_QUEUE,
+            REALTIME_PRIORITY,
+        ),
+        (
+            notifications.send_transaction_digest_notification,
+            NOTIFICATIONS_QUEUE,
+            DIGEST_PRIORITY,
+        ),
+        (notifications.flush_coalesced_notifications, MAINTENANCE_QUEUE, None),
+    ],
+)
+def test_notification_tasks_are_routed_to_dedicated_queues(task, queue, priority):
+    route = celery_app.amqp.router.route({}, task.name)
+
+    assert route["queue"].name == queue
+    assert route.get("priority") == priority
+
+
+def test_legacy_default_queue_is_still_declared():
+    queues = {queue.name: queue for queue in celery_app.conf.task_queues}
+
+    assert not queues[LEGACY_QUEUE].queue_arguments
+    assert celery_app.conf.task_default_queue == NOTIFICATIONS_QUEUE
+
+
+def test_realtime_notifications_outrank_digests():
+    assert REALTIME_PRIORITY > DIGEST_PRIORITY
+
+
+def test_explicit_bulk_queue_overrides_notification_route():
+    route = celery_app.amqp.router.route(
+        {"queue": BULK_QUEUE}, notifications.send_transaction_notification.name
+    )
+
+    assert route["queue"].name == BULK_QUEUE
+
+
+def _dispatcher(**overrides):
+    options = {
+        "timeout": 5.0,
+        "endpoint_concurrency": 10,
+        "batch_max_size": 50,
+        "max_connections_per_host": 10,
+        "failure_threshold": 5,
+        "reset_timeout": 30.0,
+        "max_clients": 256,
+        "allow_private_addresses": True,
+    }
+    options.update(overrides)
+    return WebhookDispatcher(**options)
+
+
+def _deliver_concurrently(engine, url, count):
+    errors = []
+
+    def deliver(index):
+        try:
+            engine.run(deliver_notification(engine, {"transfer_id": index}, url))
+        except NotificationDeliveryError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=deliver, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def test_dispatcher_limits_concurrency_and_batches_under_load(webhook_server):
+    webhook_server.delay = 0.05
+    engine = DeliveryEngine(
+        concurrency=50,
+        timeout=5.0,
+        webhooks=_dispatcher(endpoint_concurrency=2, batch_max_size=10),
+    )
+    try:
+        errors = _deliver_concurrently(engine, webhook_server.url, 30)
+    finally:
+        engine.close()
+
+    delivered = [
+        event["transfer_id"]
+        for payload in webhook_server.received
+        for event in payload["events"]
+    ]
+    assert errors == []
+    assert sorted(delivered) == list(range(30))
+    assert webhook_server.peak_active <= 2
+    assert len(webhook_server.received) < 30
+
+
+def test_dispatcher_reuses_one_client_per_host(delivery_engine, webhook_server):
+    other_path = webhook_server.url.replace("/notify", "/other")
+
+    delivery_engine.run(
+        deliver_notification(delivery_engine, {"transfer_id": 1}, webhook_server.url)
+    )
+    delivery_engine.run(
+        deliver_notification(delivery_engine, {"transfer_id": 2}, other_path)
+    )
+
+    assert len(delivery_engine.webhooks._clients) == 1
+
+
+def test_dispatcher_closes_least_recently_used_clients(webhook_server):
+    other_host = webhook_server.url.replace("127.0.0.1", "localhost")
+    engine = DeliveryEngine(
+        concurrency=10, timeout=5.0, webhooks=_dispatcher(max_clients=1)
+    )
+    try:
+        engine.run(deliver_notification(engine, {"transfer_id": 1}, webhook_server.url))
+        (first,) = engine.webhooks._clients.values()
+        engine.run(deliver_notification(engine, {"transfer_id": 2}, other_host))
+        engine.run(asyncio.sleep(0.05))
+
+        assert len(engine.webhooks._clients) == 1
+        assert first.client.is_closed
+    finally:
+        engine.close()
+
+
+def test_dispatcher_refuses_private_addresses_at_connect_time(webhook_server):
+    engine = DeliveryEngine(
+        concurrency=10,
+        timeout=5.0,
+        webhooks=_dispatcher(allow_private_addresses=False),
+    )
+    try:
+        with pytest.raises(NotificationDeliveryError):
+            engine.run(
+                deliver_notification(engine, {"transfer_id": 1}, webhook_server.url)
+            )
+    finally:
+        engine.close()
+
+    assert webhook_server.received == []
+
+
+def test_dispatcher_refuses_hosts_with_any_private_address(monkeypatch, webhook_server):
+    async def resolve(host, port):
+        return ["93.184.216.34", "127.0.0.1"]
+
+    monkeypatch.setattr(webhooks, "_resolve", resolve)
+    engine = DeliveryEngine(
+        concurrency=10,
+        timeout=5.0,
+        webhooks=_dispatcher(allow_private_addresses=False),
+    )
+    try:
+        with pytest.raises(NotificationDeliveryError):
+            engine.run(
+                deliver_notification(engine, {"transfer_id": 1}, webhook_server.url)
+            )
+    finally:
+        engine.close()
+
+    assert webhook_server.received == []
+
+
+def test_dispatcher_opens_circuit_after_consecutive_failures(webhook_server):
+    webhook_server.status = 500
+    engine = DeliveryEngine(
+        concurrency=10,
+        timeout=5.0,
+        webhooks=_dispatcher(failure_threshold=2),
+    )
+    try:
+        for _ in range(2):
+            with pytest.raises(NotificationDeliveryError):
+                engine.run(
+                    deliver_notification(engine, {"transfer_id": 1}, webhook_server.url)
+                )
+
+        with pytest.raises(CircuitOpenError):
+            engine.run(
+                deliver_notification(engine, {"transfer_id": 2}, webhook_server.url)
+            )
+    finally:
+        engine.close()
+
+    assert len(webhook_server.received) == 2
+
+
+def test_circuit_breaker_half_opens_after_reset_timeout(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr(webhooks.time, "monotonic", lambda: now)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0)
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.allow() is False
+
+    now = 111.0
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+@pytest.fixture()
+def public_dns(monkeypatch):
+    monkeypatch.setattr(
+        webhooks_service, "_resolve_addresses", lambda host, port: {"93.184.215.14"}
+    )
+
+
+@pytest.fixture()
+def webhook_token(monkeypatch):
+    monkeypatch.setattr(settings, "WEBHOOK_ADMIN_TOKEN", "secret")
+    return {"X-Webhook-Token": "secret"}
+
+
+def test_webhook_registry_caches_lookups(monkeypatch, engine, tables, public_dns):
+    session_local = sessionmaker(bind=engine, expire_on_commit=False)
+    monkeypatch.setattr(webhooks.db_session, "SessionLocal", session_local)
+    with session_local() as db:
+        user = User()
+        db.add(user)
+        db.commit()
+        set_webhook_endpoint(db, user.id, "https://hooks.example.com/transfers")
+
+    registry = WebhookEndpointRegistry(ttl=60.0)
+    assert registry.resolve(user.id) == "https://hooks.example.com/transfers"
+
+    monkeypatch.setattr(webhooks.db_session, "SessionLocal", None)
+    assert registry.resolve(user.id) == "https://hooks.example.com/transfers"
+
+
+def test_webhook_endpoint_api_registers_user_endpoint(
+    client, seeded_wallets, public_dns, webhook_token
+):
+    user_id = seeded_wallets[0].user_id
+
+    put = client.put(
+        f"/users/{user_id}/webhook",
+        json={"url": "https://hooks.example.com/transfers"},
+        headers=webhook_token,
+    )
+    get = client.get(f"/users/{user_id}/webhook", headers=webhook_token)
+    delete = client.delete(f"/users/{user_id}/webhook", headers=webhook_token)
+    missing = client.get(f"/users/{user_id}/webhook", headers=webhook_token)
+
+    assert put.status_code == 200
+    assert get.json() == {
+        "user_id": user_id,
+        "url": "https://hooks.example.com/transfers",
+    }
+    assert delete.status_code == 204
+    assert missing.status_code == 404
+
+
+def test_webhook_endpoint_api_rejects_unknown_user(
+    client, tables, public_dns, webhook_token
+):
+    response = client.put(
+        "/users/999/webhook",
+        json={"url": "https://hooks.example.com/transfers"},
+        headers=webhook_token,
+    )
+
+    assert response.status_code == 404
+
+
+def test_webhook_endpoint_api_requires_token(client, seeded_wallets, monkeypatch):
+    user_id = seeded_wallets[0].user_id
+    body = {"url": "https://hooks.example.com/transfers"}
+
+    disabled = client.put(f"/users/{user_id}/webhook", json=body)
+    monkeypatch.setattr(settings, "WEBHOOK_ADMIN_TOKEN", "secret")
+    missing = client.put(f"/users/{user_id}/webhook", json=body)
+    wrong = client.get(
+        f"/users/{user_id}/webhook", headers={"X-Webhook-Token": "guess"}
+    )
+
+    assert disabled.status_code == 404
+    assert missing.status_code == 403
+    assert wrong.status_code == 403
+
+
+@pytest.mark.parametrize(
+    ("url", "addresses"),
+    [
+        ("http://hooks.example.com/transfers", {"93.184.215.14"}),
+        ("https://127.0.0.1/transfers", {"127.0.0.1"}),
+        ("https://metadata.internal/latest", {"169.254.169.254"}),
+        ("https://hooks.example.com/transfers", {"93.184.215.14", "10.0.0.5"}),
+        ("https://[::ffff:192.168.0.1]/transfers", {"::ffff:192.168.0.1"}),
+        ("https://unresolvable.example/transfers", set()),
+    ],
+)
+def test_webhook_endpoint_api_rejects_internal_urls(
+    client, seeded_wallets, monkeypatch, webhook_token, url, addresses
+):
+    monkeypatch.setattr(
+        webhooks_service, "_resolve_addresses", lambda host, port: addresses
+    )
+
+    response = client.put(
+        f"/users/{seeded_wallets[0].user_id}/webhook",
+        json={"url": url},
+        headers=webhook_token,
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid webhook URL")
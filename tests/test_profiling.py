@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from app.core.celery_app import profile_worker, profile_worker_result
+from app.core.profiling import ProfilerBusy, StackSampler, profile
+from app.core.settings import settings
+
+
+@pytest.fixture()
+def busy_thread():
+    stop = threading.Event()
+
+    def spin_in_transfer():
+        while not stop.is_set():
+            sum(range(1000))
+
+    def wait_for_work():
+        stop.wait()
+
+    threads = [
+        threading.Thread(target=spin_in_transfer, name="ThreadPoolExecutor-0_3"),
+        threading.Thread(target=wait_for_work, name="idle-worker"),
+    ]
+    for thread in threads:
+        thread.start()
+    yield
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+
+@pytest.fixture()
+def fast_profiles(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_INTERVAL_MS", 1.0)
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", "secret")
+
+
+def _stacks(collapsed: str) -> dict[str, int]:
+    stacks = {}
+    for line in collapsed.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        stacks[stack] = int(count)
+    return stacks
+
+
+def test_sampler_collapses_stacks_of_other_threads(busy_thread, fast_profiles):
+    sampler = profile(0.05)
+
+    stacks = _stacks(sampler.collapsed())
+    busy = next(stack for stack in stacks if stack.endswith("spin_in_transfer"))
+    assert busy.startswith("ThreadPoolExecutor;threading:")
+    assert 0 < stacks[busy] <= sampler.samples
+    assert not any("test_sampler_collapses" in stack for stack in stacks)
+    assert not any(stack.startswith("idle-worker") for stack in stacks)
+
+
+def test_idle_threads_can_be_included(busy_thread, fast_profiles):
+    stacks = _stacks(profile(0.02, include_idle=True).collapsed())
+
+    assert any(
+        stack.startswith("idle-worker") and "wait_for_work;threading:" in stack
+        for stack in stacks
+    )
+
+
+def test_profile_length_is_capped(monkeypatch, fast_profiles):
+    monkeypatch.setattr(settings, "PROFILE_MAX_SECONDS", 0.01)
+
+    assert profile(3600).samples < 100
+
+
+def test_only_one_profile_runs_at_a_time(fast_profiles):
+    with StackSampler._running, pytest.raises(ProfilerBusy):
+        profile(0.01)
+
+
+def test_profile_endpoint_returns_collapsed_stacks(client, busy_thread, fast_profiles):
+    response = client.get(
+        "/debug/profile",
+        params={"seconds": 0.05},
+        headers={"X-Debug-Token": "secret"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    assert any(stack.endswith("spin_in_transfer") for stack in _stacks(response.text))
+
+
+def test_profile_endpoint_rejects_concurrent_profiles(client, fast_profiles):
+    with StackSampler._running:
+        response = client.get(
+            "/debug/profile",
+            params={"seconds": 0.01},
+            headers={"X-Debug-Token": "secret"},
+        )
+
+    assert response.status_code == 409
+
+
+def test_profile_endpoint_requires_token(client):
+    response = client.get("/debug/profile", params={"seconds": 0.01})
+
+    assert response.status_code == 404
+
+
+def test_worker_profile_command_samples_in_the_background(busy_thread, fast_profiles):
+    started = time.monotonic()
+    assert profile_worker(None, seconds=0.2) == {"started": True, "seconds": 0.2}
+    assert time.monotonic() - started < 0.2
+    assert profile_worker(None, seconds=0.2) == {
+        "error": "a profile is already running"
+    }
+    assert profile_worker_result(None) == {"running": True}
+
+    deadline = time.monotonic() + 5.0
+    while (reply := profile_worker_result(None)).get("running"):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    assert reply["samples"] > 0
+    assert any(stack.endswith("spin_in_transfer") for stack in _stacks(reply["stacks"]))
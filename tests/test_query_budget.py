@@ -0,0 +1,140 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.usecases.transfers as transfers_usecase
+from app.core.metrics.collectors import QUERY_BUDGET_VIOLATIONS_TOTAL
+from app.core.metrics.db.budget import QueryBudgetExceeded, check_query_budget
+from app.core.middleware import RequestInstrumentationMiddleware
+from app.core.request_context import RequestTimings, record_query, record_timing
+from app.core.settings import settings
+from app.idempotency import IdempotencyManager
+
+
+@pytest.fixture()
+def query_budget(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_BUDGET_PER_REQUEST", 3)
+    monkeypatch.setattr(settings, "QUERY_REPEAT_LIMIT", 1)
+    monkeypatch.setattr(settings, "QUERY_BUDGET_ACTION", "raise")
+
+
+def _timings(queries: dict[str, int]) -> RequestTimings:
+    timings = RequestTimings()
+    for fingerprint, executions in queries.items():
+        for _ in range(executions):
+            timings.add("db", 0.001)
+        timings.queries[fingerprint] = executions
+    return timings
+
+
+def _violations(reason: str) -> float:
+    return QUERY_BUDGET_VIOLATIONS_TOTAL.labels(
+        method="GET", path="/wallets", reason=reason
+    )._value.get()
+
+
+def test_requests_within_budget_pass(query_budget):
+    check_query_budget("GET", "/wallets", _timings({"a1": 1, "b2": 1}))
+
+
+def test_repeated_query_is_logged_and_counted(monkeypatch, query_budget, caplog):
+    monkeypatch.setattr(settings, "QUERY_BUDGET_ACTION", "log")
+    before = _violations("repeated_query")
+
+    with caplog.at_level(logging.WARNING, logger="app.core.metrics.db.budget"):
+        check_query_budget("GET", "/wallets", _timings({"a1": 1, "b2": 2}))
+
+    record = next(
+        record for record in caplog.records if record.message == "query_budget_exceeded"
+    )
+    assert record.extra_fields["repeated_query"] == {
+        "fingerprint": "b2",
+        "executions": 2,
+        "limit": 1,
+    }
+    assert "over_budget" not in record.extra_fields
+    assert _violations("repeated_query") == before + 1
+
+
+def test_request_over_budget_raises_in_raise_mode(monkeypatch, query_budget):
+    monkeypatch.setattr(settings, "QUERY_REPEAT_LIMIT", 0)
+    before = _violations("over_budget")
+
+    with pytest.raises(QueryBudgetExceeded, match="over_budget"):
+        check_query_budget("GET", "/wallets", _timings({"a1": 1, "b2": 1, "c3": 2}))
+
+    assert _violations("over_budget") == before + 1
+
+
+def test_checks_are_disabled_by_default(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_BUDGET_PER_REQUEST", 0)
+    monkeypatch.setattr(settings, "QUERY_REPEAT_LIMIT", 0)
+    monkeypatch.setattr(settings, "QUERY_BUDGET_ACTION", "raise")
+
+    check_query_budget("GET", "/wallets", _timings({"a1": 500}))
+
+
+def test_user_and_wallet_are_loaded_in_one_statement(
+    client, db, engine, seeded_wallets, query_budget, caplog
+):
+    db.expunge_all()
+
+    with caplog.at_level(logging.INFO, logger="app.core.middleware"):
+        response = client.get(f"/users/{seeded_wallets[0].user_id}")
+
+    assert response.status_code == 200
+    record = next(
+        record
+        for record in caplog.records
+        if record.message == "http_request_completed"
+    )
+    assert record.extra_fields["db_count"] == 1
+
+
+def test_transfer_does_not_reload_wallets_for_side_effects(
+    client, db, engine, seeded_wallets, monkeypatch, fake_redis, query_budget, caplog
+):
+    monkeypatch.setattr(
+        transfers_usecase,
+        "get_idempotency_manager",
+        lambda: IdempotencyManager(fake_redis),
+    )
+    w1, w2 = seeded_wallets
+    db.expunge_all()
+
+    with caplog.at_level(logging.INFO, logger="app.core.middleware"):
+        response = client.post(
+            "/transfers",
+            params={"from_wallet_id": w1.id, "to_wallet_id": w2.id, "amount": "10.00"},
+            headers={"Idempotency-Key": "budget-1"},
+        )
+
+    assert response.status_code == 200
+    record = next(
+        record
+        for record in caplog.records
+        if record.message == "http_request_completed"
+    )
+    # Lock both wallets, then insert the transaction and update the balances.
+    assert record.extra_fields["db_lock_count"] == 1
+    assert record.extra_fields["db_count"] == 2
+
+
+def test_request_over_budget_is_replaced_with_an_error(query_budget):
+    app = FastAPI()
+    app.add_middleware(RequestInstrumentationMiddleware)
+
+    @app.get("/wallets")
+    def list_wallets():
+        for fingerprint in ("a1", "b2", "c3", "d4"):
+            record_timing("db", 0.001)
+            record_query(fingerprint)
+        return {"wallets": ["leaked"]}
+
+    response = TestClient(app).get("/wallets", headers={"X-Request-ID": "req-1"})
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Query budget exceeded", "request_id": "req-1"}
+    assert response.headers["X-Request-ID"] == "req-1"
@@ -0,0 +1,161 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from app.core.metrics.db.queries import (
+    OTHER_FINGERPRINT,
+    QueryStatsCollector,
+    QueryStatsRegistry,
+    fingerprint_statement,
+    normalize_statement,
+    redact_parameters,
+)
+from app.core.settings import settings
+
+
+@pytest.mark.parametrize(
+    ("statement", "expected"),
+    [
+        (
+            "SELECT wallets.id FROM wallets\n  WHERE wallets.id = %(id_1)s",
+            "SELECT wallets.id FROM wallets WHERE wallets.id = ?",
+        ),
+        (
+            "SELECT * FROM wallets WHERE id IN (?, ?, ?) /* hot */ LIMIT 10",
+            "SELECT * FROM wallets WHERE id IN (?...) LIMIT ?",
+        ),
+        (
+            "INSERT INTO users (name) VALUES ('a'), ('it''s'), ($1)",
+            "INSERT INTO users (name) VALUES (?), ...",
+        ),
+        (
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)",
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(? AS regclass)",
+        ),
+    ],
+)
+def test_normalize_statement_strips_literals(statement, expected):
+    assert normalize_statement(statement) == expected
+
+
+def test_fingerprint_is_shared_by_executions_with_different_literals():
+    first, _ = fingerprint_statement("SELECT * FROM wallets WHERE id = 1")
+    second, _ = fingerprint_statement("SELECT * FROM wallets  WHERE id = 42")
+    other, _ = fingerprint_statement("SELECT * FROM users WHERE id = 1")
+
+    assert first == second
+    assert first != other
+
+
+def test_registry_ranks_fingerprints_by_total_time():
+    registry = QueryStatsRegistry(max_fingerprints=10)
+    for wallet_id in range(3):
+        registry.record(
+            f"SELECT * FROM wallets WHERE id = {wallet_id}", "select", 0.01, 1
+        )
+    registry.record("UPDATE wallets SET balance = 0", "update", 0.05, 2)
+
+    slowest, wallet_reads = registry.top(2)
+
+    assert slowest.operation == "update"
+    assert slowest.rows == 2
+    assert wallet_reads.calls == 3
+    assert wallet_reads.total_time == pytest.approx(0.03)
+    assert wallet_reads.max_time == pytest.approx(0.01)
+
+
+def test_registry_groups_fingerprints_beyond_its_capacity():
+    registry = QueryStatsRegistry(max_fingerprints=2)
+    registry.record("SELECT 1 FROM users", "select", 0.001, 1)
+    registry.record("SELECT 1 FROM wallets", "select", 0.001, 1)
+    registry.record("SELECT 1 FROM transactions", "select", 0.001, 1)
+    registry.record("SELECT 1 FROM webhook_endpoints", "select", 0.001, 1)
+
+    stats = {stat.fingerprint: stat for stat in registry.top(10)}
+
+    assert len(stats) == 3
+    assert stats[OTHER_FINGERPRINT].calls == 2
+
+
+def _collected(collector) -> dict[str, dict[tuple[str, ...], float]]:
+    return {
+        family.name: {
+            tuple(sample.labels.values()): sample.value for sample in family.samples
+        }
+        for family in collector.collect()
+    }
+
+
+def test_collector_exports_only_the_current_top_fingerprints(monkeypatch):
+    monkeypatch.setattr(settings, "DB_QUERY_STATS_EXPORT_INTERVAL_SEC", 15.0)
+    monkeypatch.setattr(settings, "DB_QUERY_STATS_TOP_K", 1)
+    registry = QueryStatsRegistry(max_fingerprints=10)
+    collector = QueryStatsCollector(registry)
+    registry.record("SELECT 1 FROM users", "select", 0.01, 1)
+    first = registry.top(1)[0]
+    assert _collected(collector)["db_query_fingerprint_calls"] == {
+        (first.fingerprint, "select"): 1
+    }
+
+    registry.record("SELECT 1 FROM wallets", "select", 0.5, 1)
+    second = registry.top(1)[0]
+
+    metrics = _collected(collector)
+    assert metrics["db_query_fingerprint_max_seconds"] == {
+        (second.fingerprint, "select"): pytest.approx(0.5)
+    }
+    assert (first.fingerprint, "select") not in metrics["db_query_fingerprint_calls"]
+
+
+def test_collector_is_disabled_with_zero_interval(monkeypatch):
+    monkeypatch.setattr(settings, "DB_QUERY_STATS_EXPORT_INTERVAL_SEC", 0.0)
+    registry = QueryStatsRegistry(max_fingerprints=10)
+    registry.record("SELECT 1 FROM users", "select", 0.01, 1)
+
+    assert _collected(QueryStatsCollector(registry)) == {}
+
+
+def test_redact_parameters_keeps_only_types():
+    assert redact_parameters({"amount": 10, "note": "secret"}) == {
+        "amount": "int",
+        "note": "str",
+    }
+    assert redact_parameters((1, "secret")) == ["int", "str"]
+    assert redact_parameters([(1,), (2,)], executemany=True) == {"executions": 2}
+
+
+def test_slow_statements_are_logged_with_redacted_parameters(
+    engine, tables, monkeypatch, caplog
+):
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 0.000001)
+
+    with (
+        caplog.at_level(logging.WARNING, logger="app.core.metrics.db.instrumentation"),
+        engine.connect() as connection,
+    ):
+        connection.execute(
+            text("SELECT id FROM wallets WHERE user_id = :user_id"),
+            {"user_id": 123456},
+        )
+
+    record = next(record for record in caplog.records if record.message == "slow_query")
+    assert record.extra_fields["statement"] == (
+        "SELECT id FROM wallets WHERE user_id = ?"
+    )
+    assert record.extra_fields["parameters"] == ["int"]
+    assert "123456" not in str(record.extra_fields)
+    assert "plan" not in record.extra_fields
+
+
+def test_debug_queries_endpoint_lists_top_fingerprints(client, monkeypatch):
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", "secret")
+    registry = QueryStatsRegistry(max_fingerprints=10)
+    monkeypatch.setattr("app.api.debug.QUERY_STATS", registry)
+    registry.record("SELECT 1 FROM users WHERE id = 7", "select", 0.03, 1)
+
+    response = client.get("/debug/queries?limit=1", headers={"X-Debug-Token": "secret"})
+
+    (query,) = response.json()["queries"]
+    assert query["statement"] == "SELECT ? FROM users WHERE id = ?"
+    assert query["calls"] == 1
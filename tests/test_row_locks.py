@@ -0,0 +1,132 @@
+import pytest
+
+import app.usecases.transfers as transfers_usecase
+from app.core.metrics.collectors import DB_ROW_LOCK_CONTENDED_TOTAL
+from app.core.metrics.db.locks import (
+    ROW_LOCKS,
+    RowLockCollector,
+    RowLockContention,
+    SpaceSavingSketch,
+    merge_row_locks,
+)
+from app.core.settings import settings
+from app.idempotency import IdempotencyManager
+
+
+@pytest.fixture()
+def row_locks(monkeypatch):
+    monkeypatch.setattr(settings, "DB_ROW_LOCK_CONTENDED_MS", 0.0)
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", "secret")
+    ROW_LOCKS.reset()
+    yield ROW_LOCKS
+    ROW_LOCKS.reset()
+
+
+def test_sketch_keeps_heavy_keys_in_fixed_memory():
+    sketch = SpaceSavingSketch(capacity=3)
+    for cold_key in range(100):
+        sketch.add("hot", 1.0)
+        sketch.add(cold_key, 0.1)
+
+    hot, *rest = sketch.top(10)
+    assert len(rest) == 2
+    assert hot.key == "hot"
+    assert hot.count == 100
+    assert hot.weight - hot.error <= 100.0 <= hot.weight
+
+
+def test_sketch_evicted_key_inherits_weight_as_error():
+    sketch = SpaceSavingSketch(capacity=2)
+    sketch.add("a", 5.0)
+    sketch.add("b", 2.0)
+    sketch.add("c", 1.0)
+
+    assert [(hitter.key, hitter.weight, hitter.error) for hitter in sketch.top(2)] == [
+        ("a", 5.0, 0.0),
+        ("c", 3.0, 2.0),
+    ]
+
+
+def test_short_waits_are_not_counted_as_contention(monkeypatch):
+    monkeypatch.setattr(settings, "DB_ROW_LOCK_CONTENDED_MS", 5.0)
+    contention = RowLockContention(capacity=10)
+    before = DB_ROW_LOCK_CONTENDED_TOTAL.labels(table="wallets")._value.get()
+
+    contention.record("wallets", (1, 2), 0.001)
+    contention.record("wallets", (1, 3), 0.010)
+
+    assert DB_ROW_LOCK_CONTENDED_TOTAL.labels(table="wallets")._value.get() == (
+        before + 1
+    )
+    assert [hitter.key for hitter in contention.top(10)["wallets"]] == [1, 3]
+
+
+def test_collector_exports_only_the_current_top_rows(monkeypatch):
+    monkeypatch.setattr(settings, "DB_ROW_LOCK_EXPORT_INTERVAL_SEC", 15.0)
+    monkeypatch.setattr(settings, "DB_ROW_LOCK_TOP_K", 2)
+    contention = RowLockContention(capacity=10)
+    collector = RowLockCollector(contention)
+    contention.record("test_rows", (1,), 3.0)
+    contention.record("test_rows", (2,), 2.0)
+    contention.record("test_rows", (3,), 5.0)
+
+    (family,) = collector.collect()
+
+    assert {
+        (sample.labels["table"], sample.labels["row_id"]): sample.value
+        for sample in family.samples
+    } == {("test_rows", "3"): 5.0, ("test_rows", "1"): 3.0}
+
+
+def test_collector_is_disabled_with_zero_interval(monkeypatch):
+    monkeypatch.setattr(settings, "DB_ROW_LOCK_EXPORT_INTERVAL_SEC", 0.0)
+    contention = RowLockContention(capacity=10)
+    contention.record("test_rows", (1,), 3.0)
+
+    assert list(RowLockCollector(contention).collect()) == []
+
+
+def test_worker_snapshots_are_merged_per_row():
+    first = RowLockContention(capacity=10)
+    first.record("wallets", (1, 2), 0.5)
+    second = RowLockContention(capacity=10)
+    second.record("wallets", (1, 3), 0.2)
+    snapshots = [
+        {table: [vars(hitter) for hitter in hitters]}
+        for contention in (first, second)
+        for table, hitters in contention.top(10).items()
+    ]
+
+    merged = merge_row_locks(snapshots, limit=2)["wallets"]
+
+    assert [(hitter.key, hitter.count) for hitter in merged] == [(1, 2), (2, 1)]
+    assert merged[0].weight == pytest.approx(0.7)
+
+
+def test_transfer_lock_wait_is_recorded_per_wallet(
+    client, db, engine, seeded_wallets, monkeypatch, fake_redis, row_locks
+):
+    monkeypatch.setattr(
+        transfers_usecase,
+        "get_idempotency_manager",
+        lambda: IdempotencyManager(fake_redis),
+    )
+    w1, w2 = seeded_wallets
+
+    response = client.post(
+        "/transfers",
+        params={"from_wallet_id": w1.id, "to_wallet_id": w2.id, "amount": "10.00"},
+        headers={"Idempotency-Key": "row-locks-1"},
+    )
+    assert response.status_code == 200
+    assert "db_lock;dur=" in response.headers["Server-Timing"]
+
+    response = client.get(
+        "/debug/row-locks",
+        headers={"X-Debug-Token": "secret"},
+    )
+
+    assert response.status_code == 200
+    rows = response.json()["tables"]["wallets"]
+    assert {row["row_id"] for row in rows} == {w1.id, w2.id}
+    assert all(row["contended"] == 1 for row in rows)
@@ -240,7 +240,7 @@ def test_idempotent_transfer_passes_fingerprint_to_transfer(monkeypatch):
         "raw-secret-key",
     )
 
-    assert captured["side_effects"][2] == idempotency_key_fingerprint("raw-secret-key")
+    assert captured["side_effects"][1] == idempotency_key_fingerprint("raw-secret-key")
 
 
 def test_transfer_propagates_business_context_to_celery(
@@ -0,0 +1,128 @@
+import os
+import signal
+import subprocess
+import sys
+from pathlib import Path
+
+from app import server
+
+
+def make_master(**overrides):
+    options = {
+        "app": None,
+        "sock": None,
+        "workers": 2,
+        "max_requests": 0,
+        "max_requests_jitter": 0,
+        "graceful_timeout": 30,
+    }
+    options.update(overrides)
+    return server.Master(**options)
+
+
+def test_request_limit_is_disabled_by_default():
+    assert make_master()._request_limit() is None
+
+
+def test_request_limit_adds_jitter():
+    master = make_master(max_requests=1000, max_requests_jitter=50)
+
+    limits = {master._request_limit() for _ in range(200)}
+
+    assert min(limits) >= 1000
+    assert max(limits) <= 1050
+    assert len(limits) > 1
+
+
+def test_reload_starts_replacements_before_stopping_old_workers(monkeypatch):
+    master = make_master()
+    master._children = {101, 102}
+    events = []
+
+    def spawn():
+        events.append("spawn")
+        master._children.add(200 + len(events))
+
+    monkeypatch.setattr(master, "spawn", spawn)
+    monkeypatch.setattr(
+        server.os, "kill", lambda pid, signum: events.append((pid, signum))
+    )
+
+    master._reload()
+
+    assert events.count("spawn") == 2
+    assert events.index("spawn") < events.index((101, signal.SIGTERM))
+    assert master._retiring == {101, 102}
+
+
+def _exit_workers(master, monkeypatch, pids, lifetime):
+    exited = list(pids)
+    master._children = set(pids)
+    master._started_at = {pid: 1000.0 - lifetime for pid in pids}
+    monkeypatch.setattr(server.time, "monotonic", lambda: 1000.0)
+    monkeypatch.setattr(
+        server.os,
+        "waitpid",
+        lambda pid, options: (exited.pop(), 256) if exited else (0, 0),
+    )
+    master._reap()
+
+
+def test_workers_exiting_early_are_respawned_with_backoff(monkeypatch):
+    master = make_master()
+
+    _exit_workers(master, monkeypatch, [101, 102], lifetime=1.0)
+
+    assert master._respawn_at == [1000.0 + server.RESPAWN_BACKOFF_SEC, 1001.0]
+    assert not master._stopping
+
+
+def test_long_running_worker_is_respawned_immediately(monkeypatch):
+    master = make_master()
+    master._early_exits = 3
+
+    _exit_workers(master, monkeypatch, [101], lifetime=server.EARLY_EXIT_SEC)
+
+    assert master._respawn_at == [1000.0]
+    assert master._early_exits == 0
+
+
+def test_master_stops_after_repeated_early_exits(monkeypatch):
+    master = make_master()
+    pids = list(range(100, 100 + server.MAX_EARLY_EXITS))
+
+    _exit_workers(master, monkeypatch, pids, lifetime=1.0)
+
+    assert master._stopping
+    assert master._failed
+
+
+def test_master_imports_celery_before_freezing():
+    code = """
+import sys
+
+from app import server
+
+preloaded = []
+server.gc.freeze = lambda: preloaded.append(
+    "app.core.celery_app" in sys.modules
+)
+server.Master.run = lambda self: None
+server.main(["--host", "127.0.0.1", "--port", "0"])
+print(preloaded)
+"""
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key != "PROMETHEUS_MULTIPROC_DIR"
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**env, "ENV_FILE": ".env.test"},
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    assert result.stdout.splitlines()[-1] == "[True]"
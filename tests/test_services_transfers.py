@@ -1,3 +1,4 @@
+import asyncio
 from decimal import Decimal
 from types import SimpleNamespace
 
@@ -23,8 +24,13 @@ def test_post_transfer_side_effects_logs_broker_error(
     monkeypatch,
     caplog,
 ):
-    transfer = SimpleNamespace(id=7, from_wallet_id=1, to_wallet_id=2)
-    db = SimpleNamespace(get=lambda *_args: SimpleNamespace(user_id=3))
+    transfer = SimpleNamespace(
+        id=7,
+        from_wallet_id=1,
+        to_wallet_id=2,
+        from_wallet=SimpleNamespace(user_id=3),
+        to_wallet=SimpleNamespace(user_id=4),
+    )
 
     monkeypatch.setattr(transfers_usecase, "invalidate_wallet_cache", lambda *_: None)
 
@@ -38,7 +44,7 @@ def test_post_transfer_side_effects_logs_broker_error(
     )
 
     with caplog.at_level("ERROR"):
-        transfers_usecase._post_transfer_side_effects(db, transfer, "fingerprint")
+        transfers_usecase._post_transfer_side_effects(transfer, "fingerprint")
 
     record = next(
         record
@@ -51,8 +57,13 @@ def test_post_transfer_side_effects_logs_broker_error(
 
 
 def test_post_transfer_side_effects_does_not_hide_programming_error(monkeypatch):
-    transfer = SimpleNamespace(id=7, from_wallet_id=1, to_wallet_id=2)
-    db = SimpleNamespace(get=lambda *_args: SimpleNamespace(user_id=3))
+    transfer = SimpleNamespace(
+        id=7,
+        from_wallet_id=1,
+        to_wallet_id=2,
+        from_wallet=SimpleNamespace(user_id=3),
+        to_wallet=SimpleNamespace(user_id=4),
+    )
 
     monkeypatch.setattr(transfers_usecase, "invalidate_wallet_cache", lambda *_: None)
 
@@ -66,7 +77,57 @@ def test_post_transfer_side_effects_does_not_hide_programming_error(monkeypatch)
     )
 
     with pytest.raises(RuntimeError, match="unexpected bug"):
-        transfers_usecase._post_transfer_side_effects(db, transfer, "fingerprint")
+        transfers_usecase._post_transfer_side_effects(transfer, "fingerprint")
+
+
+def test_post_transfer_side_effects_pin_reads_before_invalidating(monkeypatch):
+    transfer = SimpleNamespace(
+        id=7,
+        from_wallet_id=1,
+        to_wallet_id=2,
+        from_wallet=SimpleNamespace(user_id=3),
+        to_wallet=SimpleNamespace(user_id=4),
+    )
+    calls = []
+
+    async def remember_writes_async(**writes):
+        calls.append(("remember_writes", writes["wallet_ids"]))
+
+    async def invalidate_wallet_cache_async(wallet_id):
+        calls.append(("invalidate", wallet_id))
+
+    monkeypatch.setattr(transfers_usecase.db_session, "has_replicas", lambda: True)
+    monkeypatch.setattr(
+        transfers_usecase,
+        "remember_writes",
+        lambda **writes: calls.append(("remember_writes", writes["wallet_ids"])),
+    )
+    monkeypatch.setattr(
+        transfers_usecase,
+        "invalidate_wallet_cache",
+        lambda wallet_id: calls.append(("invalidate", wallet_id)),
+    )
+    monkeypatch.setattr(
+        transfers_usecase, "remember_writes_async", remember_writes_async
+    )
+    monkeypatch.setattr(
+        transfers_usecase,
+        "invalidate_wallet_cache_async",
+        invalidate_wallet_cache_async,
+    )
+    monkeypatch.setattr(
+        transfers_usecase, "enqueue_transfer_notification", lambda *_args: None
+    )
+    expected = [("remember_writes", [1, 2]), ("invalidate", 1), ("invalidate", 2)]
+
+    transfers_usecase._post_transfer_side_effects(transfer, "fingerprint")
+    assert calls == expected
+
+    calls.clear()
+    asyncio.run(
+        transfers_usecase._post_transfer_side_effects_async(transfer, "fingerprint")
+    )
+    assert calls == expected
 
 
 def _mk_user_and_wallet(db, balance: Decimal) -> Wallet:
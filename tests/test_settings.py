@@ -110,3 +110,50 @@ def test_critical_urls_are_required(field):
 
     with pytest.raises(ValidationError):
         Settings(_env_file=None, **data)
+
+
+def test_replica_urls_parse_comma_separated_list():
+    settings = make_settings(
+        DATABASE_REPLICA_URLS=(
+            "postgresql+psycopg://app@replica-1/transfer_db, "
+            "postgresql+psycopg://app@replica-2/transfer_db"
+        )
+    )
+
+    assert settings.DATABASE_REPLICA_URLS == [
+        "postgresql+psycopg://app@replica-1/transfer_db",
+        "postgresql+psycopg://app@replica-2/transfer_db",
+    ]
+
+
+def test_invalid_replica_url_fails_fast():
+    with pytest.raises(ValidationError):
+        make_settings(DATABASE_REPLICA_URLS="mysql://replica/transfer_db")
+
+
+def test_log_sample_rates_parse_event_rate_pairs():
+    settings = make_settings(
+        LOG_SAMPLE_RATES="http_request_completed=0.01, cache_miss=0"
+    )
+
+    assert settings.LOG_SAMPLE_RATES == {
+        "http_request_completed": 0.01,
+        "cache_miss": 0.0,
+    }
+
+
+@pytest.mark.parametrize("value", ["http_request_completed", "cache_miss=1.5"])
+def test_invalid_log_sample_rates_fail_fast(value):
+    with pytest.raises(ValidationError):
+        make_settings(LOG_SAMPLE_RATES=value)
+
+
+def test_log_rate_limited_events_parse_comma_separated_names():
+    settings = make_settings(LOG_RATE_LIMITED_EVENTS="redis_get_failed, slow_query,")
+
+    assert {"redis_get_failed", "slow_query"} == settings.LOG_RATE_LIMITED_EVENTS
+
+
+def test_dedupe_lease_shorter_than_delivery_timeout_fails_fast():
+    with pytest.raises(ValidationError):
+        make_settings(NOTIFY_DEDUPE_LEASE_SEC="10", NOTIFY_TIMEOUT_SEC="10.0")
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy import inspect
+
+from app.db.bootstrap import bootstrap_schema
+
+
+def test_importing_app_has_no_database_or_celery_side_effects(tmp_path):
+    database = tmp_path / "startup.db"
+    code = (
+        "import sys; import app.main; "
+        "print(sorted(name for name in sys.modules "
+        "if name.split('.')[0] in {'celery', 'kombu'}))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "DATABASE_URL": f"sqlite+pysqlite:///{database}"},
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    assert result.stdout.strip() == "[]"
+    assert not database.exists() or database.stat().st_size == 0
+
+
+def test_bootstrap_schema_creates_tables(engine):
+    bootstrap_schema(engine)
+
+    assert {"users", "wallets", "transactions", "webhook_endpoints"} <= set(
+        inspect(engine).get_table_names()
+    )
@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.middleware import RequestInstrumentationMiddleware
+from app.core.settings import settings
+from app.core.tracing import (
+    SLOW_REQUESTS,
+    RequestTrace,
+    SlowRequestLog,
+    current_span_ctx,
+    record_span,
+    span,
+    traced,
+)
+
+
+@pytest.fixture()
+def trace():
+    trace = RequestTrace("http.request", {"path": "/test"}, max_spans=10)
+    token = current_span_ctx.set(trace.root)
+    yield trace
+    current_span_ctx.reset(token)
+
+
+@pytest.fixture()
+def slow_requests(monkeypatch):
+    monkeypatch.setattr(settings, "SLOW_REQUEST_THRESHOLD_MS", 0.001)
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", "secret")
+    SLOW_REQUESTS.clear()
+    yield SLOW_REQUESTS
+    SLOW_REQUESTS.clear()
+
+
+def test_spans_nest_under_the_current_span(trace):
+    @traced("usecase.sync")
+    def use_case():
+        record_span("db.query", 0.002, statement="SELECT 1")
+
+    @traced("usecase.async")
+    async def async_use_case():
+        with span("redis", command="GET"):
+            pass
+
+    use_case()
+    asyncio.run(async_use_case())
+    with pytest.raises(ValueError), span("broker.publish"):
+        raise ValueError("broker down")
+
+    root = trace.to_dict()["root"]
+    sync_span, async_span, failed_span = root["children"]
+    assert sync_span["name"] == "usecase.sync"
+    assert sync_span["children"][0]["name"] == "db.query"
+    assert sync_span["children"][0]["duration_ms"] == pytest.approx(2.0)
+    assert sync_span["children"][0]["attributes"] == {"statement": "SELECT 1"}
+    assert async_span["children"][0]["attributes"] == {"command": "GET"}
+    assert failed_span["error"] == "ValueError"
+
+
+def test_spans_are_not_recorded_without_a_trace():
+    with span("redis") as recorded:
+        record_span("db.query", 0.001)
+
+    assert recorded is None
+
+
+def test_trace_caps_the_number_of_spans():
+    trace = RequestTrace("http.request", {}, max_spans=3)
+    token = current_span_ctx.set(trace.root)
+    try:
+        for _ in range(5):
+            record_span("db.query", 0.001)
+    finally:
+        current_span_ctx.reset(token)
+
+    data = trace.to_dict()
+    assert len(data["root"]["children"]) == 2
+    assert data["dropped_spans"] == 3
+
+
+def test_slow_request_log_keeps_newest_traces_first():
+    log = SlowRequestLog(size=2)
+    for path in ("/first", "/second", "/third"):
+        log.add(RequestTrace("http.request", {"path": path}, max_spans=10))
+
+    paths = [trace["root"]["attributes"]["path"] for trace in log.snapshot()]
+    assert paths == ["/third", "/second"]
+
+
+def test_slow_request_is_served_with_its_span_tree(
+    client, db, engine, seeded_wallets, slow_requests
+):
+    db.expunge_all()
+
+    client.get(
+        f"/wallets/{seeded_wallets[0].id}",
+        headers={"X-Request-ID": "slow-request-1"},
+    )
+    response = client.get(
+        "/debug/slow-requests",
+        headers={"X-Debug-Token": "secret"},
+    )
+
+    assert response.status_code == 200
+    trace = next(
+        trace
+        for trace in response.json()["requests"]
+        if trace["root"]["attributes"]["request_id"] == "slow-request-1"
+    )
+    root = trace["root"]
+    assert root["attributes"]["status"] == 200
+    use_case = root["children"][0]
+    assert use_case["name"] == "usecase.get_wallet"
+    assert any(child["name"] == "db.query" for child in use_case["children"])
+
+
+def test_fast_requests_are_not_kept(client, monkeypatch, slow_requests):
+    monkeypatch.setattr(settings, "SLOW_REQUEST_THRESHOLD_MS", 60_000.0)
+
+    client.get("/health")
+
+    assert slow_requests.snapshot() == []
+
+
+def test_failed_requests_are_kept_regardless_of_latency(monkeypatch, slow_requests):
+    monkeypatch.setattr(settings, "SLOW_REQUEST_THRESHOLD_MS", 60_000.0)
+
+    async def unavailable(_request):
+        with span("redis", command="GET"):
+            return PlainTextResponse("unavailable", status_code=503)
+
+    app = Starlette(
+        routes=[Route("/unavailable", unavailable)],
+        middleware=[Middleware(RequestInstrumentationMiddleware)],
+    )
+    with TestClient(app) as test_client:
+        test_client.get("/unavailable")
+
+    (trace,) = slow_requests.snapshot()
+    assert trace["root"]["attributes"]["status"] == 503
+    assert trace["root"]["children"][0]["name"] == "redis"
+
+
+@pytest.mark.parametrize(
+    ("token", "headers", "status_code"),
+    [
+        ("", {"X-Debug-Token": "secret"}, 404),
+        ("secret", {}, 403),
+        ("secret", {"X-Debug-Token": "wrong"}, 403),
+    ],
+)
+def test_debug_endpoint_requires_token(
+    client, monkeypatch, token, headers, status_code
+):
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", token)
+
+    response = client.get("/debug/slow-requests", headers=headers)
+
+    assert response.status_code == status_code